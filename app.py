@@ -11,11 +11,7 @@ from flask import (
 from flask_cors import CORS
 from flask_session import Session
 from dotenv import load_dotenv
-from openai import OpenAI
-from pydub import AudioSegment
-from shutil import which
 from io import BytesIO
-from elevenlabs.client import ElevenLabs
 import os
 import re
 import requests
@@ -23,21 +19,52 @@ import base64
 import math
 import numbers
 import secrets
-from firebase_admin import firestore
+import hashlib
+import importlib
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta, timezone
 import jwt
-from firebase_init import db
-from PIL import Image, UnidentifiedImageError
 import json
 import html
 import traceback
 from urllib.parse import quote, urlparse
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 
-print("DEBUG in app.py:", db)
+from services.lazy import LazyObject, lazy_import
+from services.tracing import span
+from wecast_core import chapters as core_chapters
+from wecast_core.script import (
+    build_speaker_voice_map,
+    detect_language,
+    is_arabic,
+    is_music_tag,
+    is_section_header,
+    parse_script_into_segments,
+    validate_roles,
+)
+from wecast_core.storage import (
+    generate_r2_signed_url,
+    get_storage,
+    upload_bytes_to_r2,
+    upload_stream_to_r2,
+)
+from wecast_core.timeline import build_transcript_text_with_speakers
+from wecast_core.tts import render_segments
+
+# Heavy SDKs (firebase_admin/grpc, pydub, openai, elevenlabs, boto3) load on
+# first use so importing this module stays fast; see create_app().
+firestore = lazy_import("firebase_admin.firestore")
+
+
+def _load_firestore_db():
+    handle = importlib.import_module("firebase_init").db
+    if METRICS_ENABLED:
+        from services.metrics import instrument_firestore
+
+        instrument_firestore()
+    return handle
+
+
+db = LazyObject(_load_firestore_db, name="firestore db")
 
 SHOW_TITLE_PLACEHOLDER = "{{SHOW_TITLE}}"
 ARABIC_SECTION_HEADERS = {
@@ -47,14 +74,6 @@ ARABIC_SECTION_HEADERS = {
 }
 ARABIC_MUSIC_TAG = "[فاصل موسيقي]"
 
-def is_music_tag(text: str) -> bool:
-    stripped = str(text or "").strip().lower()
-    return stripped in {"[music]", "[موسيقى]", "[فاصل موسيقي]"}
-
-def is_section_header(text: str) -> bool:
-    stripped = str(text or "").strip()
-    return bool(re.match(r"^(INTRO|BODY|OUTRO|مقدمة|النص|الخاتمة)\s*:?$", stripped, re.IGNORECASE))
-
 UNTITLED_EPISODE_FALLBACKS = {
     "Untitled Episode",
     "\u062d\u0644\u0642\u0629 \u0628\u062f\u0648\u0646 \u0639\u0646\u0648\u0627\u0646",
@@ -272,6 +291,66 @@ def add_cors_headers(response):
     return response
 
 
+# Per-endpoint latency and external-call timers (services/metrics.py), served
+# at /api/metrics. WECAST_SLOW_REQUEST_MS > 0 logs slower requests with a
+# breakdown of their Firestore/R2/OpenAI/ElevenLabs calls.
+from services.metrics import METRICS_ENABLED, track
+
+METRICS_TOKEN = (os.getenv("WECAST_METRICS_TOKEN") or "").strip()
+SLOW_REQUEST_MS = int(os.getenv("WECAST_SLOW_REQUEST_MS", "0"))
+
+if METRICS_ENABLED:
+    from services.metrics import install_request_metrics
+
+    install_request_metrics(app, slow_request_ms=SLOW_REQUEST_MS)
+
+# Billable usage (services/usage.py): ElevenLabs characters, OpenAI tokens and
+# image generations, rolled up per podcast, user and day in batched Firestore
+# writes. /api/admin/usage reads them with `Authorization: Bearer <WECAST_ADMIN_TOKEN>`.
+USAGE_METERING_ENABLED = os.getenv("WECAST_USAGE_METERING", "1").strip().lower() not in {"0", "false", "no", "off"}
+USAGE_FLUSH_SECONDS = int(os.getenv("WECAST_USAGE_FLUSH_SECONDS", "30"))
+USAGE_FLUSH_EVENTS = int(os.getenv("WECAST_USAGE_FLUSH_EVENTS", "50"))
+ADMIN_TOKEN = (os.getenv("WECAST_ADMIN_TOKEN") or "").strip()
+
+if USAGE_METERING_ENABLED:
+    from services.usage import configure_usage, install_usage_scope, prices_from_env
+
+    configure_usage(
+        lambda: db,
+        prices=prices_from_env(),
+        flush_seconds=USAGE_FLUSH_SECONDS,
+        flush_events=USAGE_FLUSH_EVENTS,
+        resolve_user=lambda: get_current_podcast_owner_id(),
+    )
+    install_usage_scope(app)
+
+# Opt-in request profiling (services/profiling.py). WECAST_PROFILE=on profiles
+# every request and keeps those slower than WECAST_PROFILE_THRESHOLD_MS;
+# =header profiles only requests sending `X-WeCast-Profile: <WECAST_ADMIN_TOKEN>`.
+# Output goes to WECAST_PROFILE_OUTPUT (a directory, or r2:<prefix>). Unset,
+# no hook is installed at all.
+PROFILE_MODE = (os.getenv("WECAST_PROFILE") or "off").strip().lower()
+if PROFILE_MODE in {"on", "1", "true", "header"}:
+    from services.profiling import DEFAULT_MEMORY_ENDPOINTS, install_request_profiler
+
+    if PROFILE_MODE == "header" and not ADMIN_TOKEN:
+        print("WECAST_PROFILE=header needs WECAST_ADMIN_TOKEN; no request will be profiled.")
+    install_request_profiler(
+        app,
+        mode="header" if PROFILE_MODE == "header" else "on",
+        admin_token=ADMIN_TOKEN,
+        threshold_ms=int(os.getenv("WECAST_PROFILE_THRESHOLD_MS", "2000")),
+        engine=(os.getenv("WECAST_PROFILE_ENGINE") or "sample").strip().lower(),
+        interval_ms=int(os.getenv("WECAST_PROFILE_INTERVAL_MS", "5")),
+        output=(os.getenv("WECAST_PROFILE_OUTPUT") or "./.wecast_profiles").strip(),
+        memory_endpoints=[
+            rule.strip()
+            for rule in (os.getenv("WECAST_PROFILE_MEMORY_ENDPOINTS") or ",".join(DEFAULT_MEMORY_ENDPOINTS)).split(",")
+            if rule.strip()
+        ],
+    )
+
+
 def _load_flask_secret_key():
     secret = (os.getenv("FLASK_SECRET_KEY") or "").strip()
     if secret:
@@ -281,7 +360,14 @@ def _load_flask_secret_key():
     return "dev-only-change-me"
 
 
-# Server-side sessions 
+# Server-side sessions.
+# "filesystem" (default) keeps the single-instance Flask-Session setup; "redis"
+# or "sqlite" store sessions in services.session_store so several gunicorn
+# workers/instances can share them.
+SESSION_BACKEND = (os.getenv("WECAST_SESSION_BACKEND") or "filesystem").strip().lower()
+SESSION_TTL_SECONDS = int(os.getenv("WECAST_SESSION_TTL_SECONDS", str(14 * 24 * 3600)))
+SESSION_MAX_BYTES = int(os.getenv("WECAST_SESSION_MAX_BYTES", str(256 * 1024)))
+
 app.config.update(
     SECRET_KEY=_load_flask_secret_key(), 
     SESSION_TYPE="filesystem", 
@@ -290,44 +376,61 @@ app.config.update(
     SESSION_COOKIE_SAMESITE="Lax",
     SESSION_COOKIE_SECURE=False,  
 )
-Session(app)
 
-# .env is already loaded above so security-sensitive config is available early.
 
-import boto3
-from botocore.client import Config
+def _shrink_session(data):
+    """Drop pre-draft-store keys (now kept in Firestore) when a session is over the size limit."""
+    dropped = False
+    for key in ("create_draft", "last_word_timeline"):
+        if data.pop(key, None) is not None:
+            dropped = True
+    return dropped
+
+
+if SESSION_BACKEND == "filesystem":
+    Session(app)
+else:
+    from services.session_store import StoreSessionInterface, session_store_from_env
+
+    app.session_interface = StoreSessionInterface(
+        session_store_from_env(SESSION_BACKEND),
+        ttl_seconds=SESSION_TTL_SECONDS,
+        max_bytes=SESSION_MAX_BYTES,
+        shrink=_shrink_session,
+    )
+    print(f"Sessions stored in {SESSION_BACKEND}")
+
+# .env is already loaded above so security-sensitive config is available early.
 
 # Get ffmpeg & ffprobe paths from .env
 ffmpeg_path = os.getenv("FFMPEG_PATH")
 ffprobe_path = os.getenv("FFPROBE_PATH")
 
-print("DEBUG ffmpeg_path:", ffmpeg_path)
-print("DEBUG ffprobe_path:", ffprobe_path)
-
-# If the paths exist, configure pydub AND PATH
+# If the paths exist, put them on PATH now (cheap) so pydub finds them when it loads.
 if ffmpeg_path and os.path.exists(ffmpeg_path):
-    AudioSegment.converter = ffmpeg_path
-    ffmpeg_dir = os.path.dirname(ffmpeg_path)
-    os.environ["PATH"] = ffmpeg_dir + os.pathsep + os.environ.get("PATH", "")
-else:
-    print("WARNING: ffmpeg_path missing or invalid")
-
+    os.environ["PATH"] = os.path.dirname(ffmpeg_path) + os.pathsep + os.environ.get("PATH", "")
 if ffprobe_path and os.path.exists(ffprobe_path):
-    AudioSegment.ffprobe = ffprobe_path
     ffprobe_dir = os.path.dirname(ffprobe_path)
     if ffprobe_dir not in os.environ.get("PATH", ""):
         os.environ["PATH"] = ffprobe_dir + os.pathsep + os.environ.get("PATH", "")
-else:
-    print("WARNING: ffprobe_path missing or invalid")
 
-print("DEBUG AudioSegment.converter:", getattr(AudioSegment, "converter", None))
-print("DEBUG AudioSegment.ffprobe:", getattr(AudioSegment, "ffprobe", None))
-print("DEBUG PATH starts with:", os.environ["PATH"].split(os.pathsep)[0])
+
+def _configure_pydub(audio_segment):
+    if ffmpeg_path and os.path.exists(ffmpeg_path):
+        audio_segment.converter = ffmpeg_path
+    if ffprobe_path and os.path.exists(ffprobe_path):
+        audio_segment.ffprobe = ffprobe_path
+
+
+AudioSegment = lazy_import("pydub", "AudioSegment", on_load=_configure_pydub)
 
 
 app.secret_key = app.config["SECRET_KEY"]
 RECYCLE_BIN_RETENTION_DAYS = int(os.getenv("RECYCLE_BIN_RETENTION_DAYS", "30"))
 USERNAME_RESERVATIONS_COLLECTION = "username_reservations"
+USERNAME_LEGACY_SCAN_ENABLED = (
+    (os.getenv("WECAST_USERNAME_LEGACY_SCAN") or "").strip().lower() in {"1", "true", "yes", "on"}
+)
 
 
 
@@ -380,52 +483,48 @@ R2_ENDPOINT = (
     if R2_ACCOUNT_ID else None
 )
 
-r2_client = None
-if all([R2_ACCOUNT_ID, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_BUCKET_NAME]):
-    r2_client = boto3.client(
-        "s3",
-        endpoint_url=R2_ENDPOINT,
-        aws_access_key_id=R2_ACCESS_KEY_ID,
-        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        config=Config(signature_version="s3v4"),
-        region_name="auto",
+def _r2_configured():
+    return all(
+        (os.getenv(name) or "").strip()
+        for name in ("R2_ACCOUNT_ID", "R2_ACCESS_KEY_ID", "R2_SECRET_ACCESS_KEY", "R2_BUCKET_NAME")
     )
-else:
-    print("WARNING: R2 environment variables are missing. R2 client not initialized.")
 
 
-def upload_bytes_to_r2(file_bytes: bytes, object_key: str, content_type: str):
-    if not r2_client:
-        raise RuntimeError("R2 client is not configured.")
+def _build_r2_storage():
+    return get_storage(required=False)
 
-    r2_client.put_object(
-        Bucket=R2_BUCKET_NAME,
-        Key=object_key,
-        Body=file_bytes,
-        ContentType=content_type,
-    )
-    return object_key
 
+# Shared, tuned client (sized connection pool, adaptive retries); see services/storage.py.
+# boto3 is imported and the client built on first use; `if not r2_storage` stays cheap.
+r2_storage = LazyObject(_build_r2_storage, available=_r2_configured, name="r2 storage")
+r2_client = LazyObject(lambda: r2_storage.client, available=_r2_configured, name="r2 client")
 
-def generate_r2_signed_url(object_key: str, expires_in: int = 3600):
-    if not r2_client:
+
+def _require_r2_storage():
+    if not r2_storage:
         raise RuntimeError("R2 client is not configured.")
+    return r2_storage
 
-    return r2_client.generate_presigned_url(
-        "get_object",
-        Params={
-            "Bucket": R2_BUCKET_NAME,
-            "Key": object_key,
-        },
-        ExpiresIn=expires_in,
-    )
 
+_signed_url_cache = None
 
-def delete_from_r2(object_key: str):
-    if not r2_client:
-        raise RuntimeError("R2 client is not configured.")
 
-    r2_client.delete_object(Bucket=R2_BUCKET_NAME, Key=object_key)
+def _get_signed_url_cache():
+    global _signed_url_cache
+    if _signed_url_cache is None:
+        from services.signed_url_cache import SignedUrlCache
+
+        _signed_url_cache = SignedUrlCache(
+            lambda key, expires_in: generate_r2_signed_url(key, expires_in=expires_in),
+            max_entries=int(os.getenv("WECAST_SIGNED_URL_CACHE_SIZE", "4096")),
+        )
+    return _signed_url_cache
+
+
+def delete_from_r2(object_key: str):
+    _require_r2_storage().delete(object_key)
+    if _signed_url_cache is not None:
+        _signed_url_cache.invalidate(str(object_key or "").strip().lstrip("/"))
 
 
 def build_r2_asset_url(object_key: str, expires_in: int = 3600):
@@ -436,7 +535,22 @@ def build_r2_asset_url(object_key: str, expires_in: int = 3600):
     if R2_PUBLIC_BASE_URL:
         return f"{R2_PUBLIC_BASE_URL}/{quote(normalized_key, safe='/')}"
 
-    return generate_r2_signed_url(normalized_key, expires_in=expires_in)
+    # Presigning is pure CPU work but adds up on list views; reuse URLs until near expiry.
+    return _get_signed_url_cache().get(normalized_key, expires_in=expires_in)
+
+
+def resolve_r2_asset_urls(object_keys, expires_in: int = 3600):
+    """Batch form of build_r2_asset_url for list views: {key: url}, failures omitted."""
+    urls = {}
+    for raw_key in object_keys or []:
+        normalized_key = str(raw_key or "").strip().lstrip("/")
+        if not normalized_key or normalized_key in urls:
+            continue
+        try:
+            urls[normalized_key] = build_r2_asset_url(normalized_key, expires_in=expires_in)
+        except Exception as exc:
+            print(f"Asset URL generation failed for key '{normalized_key}': {exc}")
+    return urls
 
 
 def delete_from_r2_quietly(object_key: str, label: str = "R2 cleanup"):
@@ -494,7 +608,40 @@ def _safe_audio_filename(title: str, podcast_id: str):
     return base[:140]
 
 
+AUDIO_DOWNLOAD_REDIRECT = (
+    (os.getenv("WECAST_AUDIO_DOWNLOAD_REDIRECT") or "").strip().lower() in {"1", "true", "yes", "on"}
+)
+AUDIO_DOWNLOAD_CHUNK_BYTES = 1024 * 64
+
+
+def _audio_download_redirect_requested() -> bool:
+    flag = (request.args.get("redirect") or "").strip().lower()
+    if flag in {"0", "false", "no"}:
+        return False
+    return AUDIO_DOWNLOAD_REDIRECT or flag in {"1", "true", "yes"}
+
+
+def _audio_download_conditional_params() -> dict:
+    """Map the client's Range / validators onto get_object arguments."""
+    params = {}
+    range_header = (request.headers.get("Range") or "").strip()
+    # R2 serves a single byte range. Multi-range requests and If-Range (which we
+    # cannot evaluate before fetching) fall back to a full 200, as the RFC allows.
+    if range_header.startswith("bytes=") and "," not in range_header and not request.headers.get("If-Range"):
+        params["Range"] = range_header
+    if request.headers.get("If-None-Match"):
+        params["IfNoneMatch"] = request.headers["If-None-Match"]
+    elif request.if_modified_since:
+        params["IfModifiedSince"] = request.if_modified_since
+    return params
+
+
 def _stream_audio_download_response(podcast_id: str, podcast: dict):
+    """
+    Download an episode's audio. Proxies R2 with Range (206), ETag/Last-Modified
+    and 304 support, or redirects to a presigned URL when ?redirect=1 or
+    WECAST_AUDIO_DOWNLOAD_REDIRECT is set, which keeps the bytes off our worker.
+    """
     audio_key = str((podcast or {}).get("audioKey") or "").strip().lstrip("/")
     audio_url = str((podcast or {}).get("audioUrl") or "").strip()
 
@@ -508,34 +655,78 @@ def _stream_audio_download_response(podcast_id: str, podcast: dict):
             return redirect(audio_url)
         return jsonify(error="Audio storage is not configured"), 500
 
-    try:
-        obj = r2_client.get_object(Bucket=R2_BUCKET_NAME, Key=audio_key)
-        body = obj["Body"]
-        filename = _safe_audio_filename((podcast or {}).get("title"), podcast_id)
-        content_type = obj.get("ContentType") or "audio/mpeg"
+    filename = _safe_audio_filename((podcast or {}).get("title"), podcast_id)
+    content_disposition = f'attachment; filename="{filename}"'
 
-        def generate():
-            try:
-                while True:
-                    chunk = body.read(1024 * 64)
-                    if not chunk:
-                        break
-                    yield chunk
-            finally:
-                body.close()
-
-        headers = {
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Cache-Control": "private, max-age=0, no-store",
-        }
-        if obj.get("ContentLength"):
-            headers["Content-Length"] = str(obj["ContentLength"])
+    if _audio_download_redirect_requested():
+        try:
+            signed_url = r2_storage.presign(
+                audio_key,
+                expires_in=3600,
+                ResponseContentDisposition=content_disposition,
+            )
+            return redirect(signed_url)
+        except Exception as exc:
+            print(f"Audio download presign failed for {podcast_id}, proxying instead: {exc}")
+
+    from botocore.exceptions import ClientError
 
-        return Response(generate(), mimetype=content_type, headers=headers)
+    try:
+        with track("r2", "get"):
+            obj = r2_client.get_object(Bucket=R2_BUCKET_NAME, Key=audio_key, **_audio_download_conditional_params())
+    except ClientError as exc:
+        error = exc.response.get("Error") or {}
+        status = int((exc.response.get("ResponseMetadata") or {}).get("HTTPStatusCode") or 0)
+        if status == 304 or error.get("Code") in {"304", "NotModified"}:
+            resp = Response(status=304)
+            etag = (exc.response.get("ResponseMetadata", {}).get("HTTPHeaders") or {}).get("etag")
+            if etag:
+                resp.headers["ETag"] = etag
+            resp.headers["Cache-Control"] = "private, max-age=0, must-revalidate"
+            return resp
+        if status == 416 or error.get("Code") == "InvalidRange":
+            return Response(status=416, headers={"Content-Range": "bytes */*", "Accept-Ranges": "bytes"})
+        print(f"Audio download failed for {podcast_id}: {exc}")
+        return jsonify(error="Failed to download audio"), 500
     except Exception as exc:
         print(f"Audio download failed for {podcast_id}: {exc}")
         return jsonify(error="Failed to download audio"), 500
 
+    body = obj["Body"]
+    content_type = obj.get("ContentType") or "audio/mpeg"
+
+    def generate():
+        try:
+            while True:
+                chunk = body.read(AUDIO_DOWNLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    headers = {
+        "Content-Disposition": content_disposition,
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Accept-Ranges": "bytes",
+        "Access-Control-Expose-Headers": "Content-Disposition, Content-Range, Accept-Ranges, ETag",
+    }
+    if obj.get("ContentLength") is not None:
+        headers["Content-Length"] = str(obj["ContentLength"])
+    if obj.get("ETag"):
+        headers["ETag"] = obj["ETag"]
+    if obj.get("LastModified"):
+        from werkzeug.http import http_date
+
+        headers["Last-Modified"] = http_date(obj["LastModified"])
+
+    status = 200
+    if obj.get("ContentRange"):
+        status = 206
+        headers["Content-Range"] = obj["ContentRange"]
+
+    return Response(generate(), status=status, mimetype=content_type, headers=headers)
+
 
 def _normalize_public_url(value: str) -> str:
     src = (value or "").strip()
@@ -597,16 +788,33 @@ def _json_safe_firestore_value(value):
     return str(value)
 
 
-def _delete_podcast_assets(data):
-    delete_from_r2_quietly((data or {}).get("audioKey") or "", label="Audio delete")
-    delete_from_r2_quietly((data or {}).get("coverPath") or "", label="Cover delete")
+def _purge_podcast_snapshots(snapshots, extra_r2_keys=()):
+    from services.podcast_purge import purge_podcasts
 
-print("DEBUG R2_ACCOUNT_ID present:", bool(R2_ACCOUNT_ID))
-print("DEBUG R2_ACCESS_KEY_ID present:", bool(R2_ACCESS_KEY_ID))
-print("DEBUG R2_SECRET_ACCESS_KEY present:", bool(R2_SECRET_ACCESS_KEY))
-print("DEBUG R2_BUCKET_NAME:", R2_BUCKET_NAME)
-print("DEBUG R2_ENDPOINT:", R2_ENDPOINT)
-print("DEBUG R2_PUBLIC_BASE_URL:", R2_PUBLIC_BASE_URL or "(signed URLs)")
+    return purge_podcasts(
+        db,
+        snapshots,
+        r2_client=r2_client,
+        bucket_name=R2_BUCKET_NAME,
+        extra_r2_keys=extra_r2_keys,
+    )
+
+def _log_startup_diagnostics():
+    print("DEBUG ffmpeg_path:", ffmpeg_path)
+    print("DEBUG ffprobe_path:", ffprobe_path)
+    if not (ffmpeg_path and os.path.exists(ffmpeg_path)):
+        print("WARNING: ffmpeg_path missing or invalid")
+    if not (ffprobe_path and os.path.exists(ffprobe_path)):
+        print("WARNING: ffprobe_path missing or invalid")
+    print("DEBUG PATH starts with:", os.environ["PATH"].split(os.pathsep)[0])
+    print("DEBUG R2_ACCOUNT_ID present:", bool(R2_ACCOUNT_ID))
+    print("DEBUG R2_ACCESS_KEY_ID present:", bool(R2_ACCESS_KEY_ID))
+    print("DEBUG R2_SECRET_ACCESS_KEY present:", bool(R2_SECRET_ACCESS_KEY))
+    print("DEBUG R2_BUCKET_NAME:", R2_BUCKET_NAME)
+    print("DEBUG R2_ENDPOINT:", R2_ENDPOINT)
+    print("DEBUG R2_PUBLIC_BASE_URL:", R2_PUBLIC_BASE_URL or "(signed URLs)")
+    if not r2_storage:
+        print("WARNING: R2 environment variables are missing. R2 client not initialized.")
 
 
 def is_reasonably_valid_email(email: str) -> bool:
@@ -672,31 +880,12 @@ def _normalize_username(value):
 
 
 def _validate_username_for_reservation(username):
+    from services.usernames import username_reservation_problem
+
     cleaned = _clean_username(username)
-    if not cleaned:
-        raise AuthFlowError(
-            "invalid_username",
-            "Username is required.",
-            400,
-        )
-    if len(cleaned) > 60:
-        raise AuthFlowError(
-            "invalid_username",
-            "Username must be 60 characters or fewer.",
-            400,
-        )
-    if "/" in cleaned or "\\" in cleaned:
-        raise AuthFlowError(
-            "invalid_username",
-            "Username cannot contain slashes.",
-            400,
-        )
-    if any(ord(ch) < 32 or ord(ch) == 127 for ch in cleaned):
-        raise AuthFlowError(
-            "invalid_username",
-            "Username contains unsupported characters.",
-            400,
-        )
+    problem = username_reservation_problem(cleaned)
+    if problem:
+        raise AuthFlowError("invalid_username", problem, 400)
     return cleaned
 
 
@@ -840,7 +1029,46 @@ def _purge_firebase_auth_user(firebase_uid="", email=""):
     return deleted
 
 
+def _login_names_lower(data):
+    """Every legacy login name of a user doc: its name and its displayName."""
+    names = {_normalize_username(data.get(field)) for field in ("name", "displayName")}
+    return sorted(name for name in names if name)
+
+
+def _with_login_name_index(payload, existing_data=None):
+    """
+    Keep loginNames_lower in sync whenever a write touches name/displayName.
+    Merge-writes may carry only one of the two, so the index is computed from
+    the stored doc with the payload applied.
+    """
+    if "displayName" in payload or "name" in payload:
+        payload["loginNames_lower"] = _login_names_lower({**(existing_data or {}), **payload})
+    return payload
+
+
+def _is_legacy_username_match(data, normalized_username):
+    if _is_user_account_deleted(data):
+        return False
+    if not (
+        data.get("password_hash")
+        or data.get("username")
+        or data.get("username_lower")
+    ):
+        return False
+    return normalized_username in {
+        _normalize_username(data.get("username")),
+        _normalize_username(data.get("name")),
+        _normalize_username(data.get("displayName")),
+    }
+
+
 def get_user_docs_by_username(username):
+    """
+    Resolve up to two active user docs for a username with bounded reads:
+    the reservation doc, then indexed username_lower / loginNames_lower
+    queries. The full users scan only runs when WECAST_USERNAME_LEGACY_SCAN
+    is enabled by an admin (e.g. before the index backfill has been run).
+    """
     normalized_username = _normalize_username(username)
     if not normalized_username:
         return []
@@ -899,24 +1127,27 @@ def get_user_docs_by_username(username):
         if len(matches) >= 2:
             break
 
-    for doc in db.collection("users").stream():
-        if doc.reference.path in seen_paths:
-            continue
-        data = doc.to_dict() or {}
-        if _is_user_account_deleted(data):
-            continue
-        if not (
-            data.get("password_hash")
-            or data.get("username")
-            or data.get("username_lower")
-        ):
-            continue
-        legacy_candidates = {
-            _normalize_username(data.get("username")),
-            _normalize_username(data.get("name")),
-            _normalize_username(data.get("displayName")),
-        }
-        if normalized_username in legacy_candidates:
+    # Legacy accounts logged in with their name or display name;
+    # loginNames_lower is backfilled by scripts/backfill_username_index.py so
+    # this stays indexed.
+    if len(matches) < 2:
+        login_query = db.collection("users").where("loginNames_lower", "array_contains", normalized_username)
+        for doc in login_query.limit(4).stream():
+            if doc.reference.path in seen_paths:
+                continue
+            if not _is_legacy_username_match(doc.to_dict() or {}, normalized_username):
+                continue
+            matches.append(doc)
+            seen_paths.add(doc.reference.path)
+            if len(matches) >= 2:
+                break
+
+    if len(matches) < 2 and USERNAME_LEGACY_SCAN_ENABLED:
+        for doc in db.collection("users").stream():
+            if doc.reference.path in seen_paths:
+                continue
+            if not _is_legacy_username_match(doc.to_dict() or {}, normalized_username):
+                continue
             matches.append(doc)
             seen_paths.add(doc.reference.path)
             if len(matches) >= 2:
@@ -1045,10 +1276,12 @@ def _write_user_profile_with_username(
     email="",
     firebase_uid="",
     delete_ref=None,
+    existing_data=None,
 ):
     cleaned_username = _clean_username(username)
     normalized_username = _normalize_username(cleaned_username)
     current_username_lower = _normalize_username(current_username)
+    _with_login_name_index(payload, existing_data)
 
     if cleaned_username:
         payload["username"] = cleaned_username
@@ -2018,9 +2251,10 @@ def _upsert_firebase_user_profile(
             email=normalized_email,
             firebase_uid=firebase_uid,
             delete_ref=delete_ref,
+            existing_data=existing_data,
         )
     else:
-        user_ref.set(payload, merge=True)
+        user_ref.set(_with_login_name_index(payload, existing_data), merge=True)
         if delete_ref and delete_ref.path != user_ref.path:
             delete_ref.delete()
     final_doc = user_ref.get()
@@ -2909,7 +3143,19 @@ def _apply_email_change_to_records(doc, data, firebase_uid, old_email, new_email
 # ------------------------------------------------------------
 # OpenAI client for script + title generation
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+
+
+def _build_openai_client():
+    from openai import OpenAI
+
+    if METRICS_ENABLED:
+        from services.metrics import instrument_openai
+
+        instrument_openai()
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+client = LazyObject(_build_openai_client, available=lambda: True, name="openai client")
 # ElevenLabs client for multi speaker TTS
 ELEVENLABS_API_KEY = (os.getenv("ELEVENLABS_API_KEY") or "").strip()
 
@@ -2925,11 +3171,18 @@ def _elevenlabs_headers(extra=None):
         headers.update(extra)
     return headers
 
-voice_client = ElevenLabs(api_key=ELEVENLABS_API_KEY) if _elevenlabs_key_ready() else None
+def _build_elevenlabs_client():
+    from elevenlabs.client import ElevenLabs
+
+    return ElevenLabs(api_key=ELEVENLABS_API_KEY)
+
 
-def _chat_completion_with_fallback(messages, temperature=0.7, models=None):
+voice_client = LazyObject(_build_elevenlabs_client, name="elevenlabs client") if _elevenlabs_key_ready() else None
+
+def _chat_completion_with_fallback(messages, temperature=0.7, models=None, operation="chat"):
     """
     Try multiple OpenAI chat models in order and return the first success.
+    `operation` labels its tokens in the usage rollups.
     """
     model_candidates = models or [
         os.getenv("OPENAI_CHAT_MODEL", "").strip() or "gpt-4o",
@@ -2946,13 +3199,18 @@ def _chat_completion_with_fallback(messages, temperature=0.7, models=None):
     errors = []
     for model in ordered:
         try:
-            return client.chat.completions.create(
+            response = client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
             )
         except Exception as e:
             errors.append(f"{model}: {e}")
+            continue
+        from services.usage import record_chat
+
+        record_chat(response, operation=operation)
+        return response
 
     raise RuntimeError(" | ".join(errors) if errors else "No OpenAI chat model configured")
 
@@ -2961,89 +3219,24 @@ def _chat_completion_with_fallback(messages, temperature=0.7, models=None):
 # Helpers
 # ------------------------------------------------------------
 
-def is_arabic(text: str) -> bool:
-    """
-    Detect if text is *mostly* Arabic.
-    Returns True only if a reasonable percentage of letters are Arabic.
-    """
-    if not text:
-        return False
-
-    arabic_letters = 0
-    total_letters = 0
-
-    for c in text:
-        if c.isalpha():
-            total_letters += 1
-            if "\u0600" <= c <= "\u06FF" or "\u0750" <= c <= "\u08FF":
-                arabic_letters += 1
-
-    if total_letters == 0:
-        return False
-
-    return (arabic_letters / total_letters) >= 0.30
-
+def _firestore_unit_of_work():
+    from services.firestore_writes import FirestoreUnitOfWork
 
-def detect_language(description: str) -> str:
-    return "ar" if is_arabic(description) else "en"
+    return FirestoreUnitOfWork(db)
 
-def norm_token(s: str) -> str:
-    s = (s or "").lower().strip()
-    s = re.sub(r"[^\w\u0600-\u06FF]+", "", s)  # keep arabic letters too
-    return s
-
-def timeline_tokens(word_timeline):
-    return [norm_token(w.get("w", "")) for w in word_timeline]
-
-def find_anchor_start_sec(word_timeline, anchor: str):
-    tokens = timeline_tokens(word_timeline)
-    anchor_tokens = [norm_token(t) for t in anchor.split() if norm_token(t)]
-    if len(anchor_tokens) < 2:
-        return None
-
-    n = len(tokens)
-    m = len(anchor_tokens)
-
-    for i in range(0, n - m + 1):
-        if tokens[i:i+m] == anchor_tokens:
-            return float(word_timeline[i]["start"])
-    return None
-
-def build_transcript_text_with_speakers(words):
-    """
-    Build a readable transcript with speaker labels in-line.
-    Example:
-      Bob: Hello there ...
-      Alice: Hi Bob ...
-    """
-    if not words:
-        return ""
-
-    parts = []
-    last_speaker = None
-
-    for w in words:
-        token = (w.get("w") or "").strip()
-        if not token:
-            continue
-
-        speaker = (w.get("speaker") or "").strip()
-        if speaker and speaker != last_speaker:
-            if parts:
-                parts.append("\n")
-            parts.append(f"{speaker}: ")
-            last_speaker = speaker
-
-        parts.append(token + " ")
-
-    return "".join(parts).strip()
 
 def save_generated_podcast_to_firestore(user_id: str, title: str, script_style: str,
                                        description: str, script: str, speakers_info: list,
-                                       language: str = ""):
+                                       language: str = "", unit_of_work=None):
+    """
+    Queue the podcast doc, its speakers and the main script as one atomic batch.
+    Pass unit_of_work to add more writes before committing; otherwise the
+    batch is committed here.
+    """
     # 1) Create the podcast doc with an auto-ID
     podcast_ref = db.collection("podcasts").document()
     podcast_id = podcast_ref.id
+    uow = unit_of_work if unit_of_work is not None else _firestore_unit_of_work()
 
     now = firestore.SERVER_TIMESTAMP
     lang = (language or "").strip().lower()
@@ -3053,7 +3246,7 @@ def save_generated_podcast_to_firestore(user_id: str, title: str, script_style:
     # Podcast doc
     resolved_title = resolve_episode_title({"title": title})
     print(f"[WeCast guest restore] title saved in Firestore: {resolved_title}")
-    podcast_ref.set({
+    uow.set(podcast_ref, {
         "userId": user_id,
         "title": resolved_title,
         "description": description,
@@ -3064,12 +3257,12 @@ def save_generated_podcast_to_firestore(user_id: str, title: str, script_style:
         "hasEditDraft": False,
         "createdAt": now,
         "lastEditedAt": now,
-    })
+    }, merge=True)
 
     # 2) Speakers subcollection
     speakers_col = podcast_ref.collection("speakers")
     for s in speakers_info or []:
-        speakers_col.document().set({
+        uow.set(speakers_col.document(), {
             "name": (s.get("name") or "").strip(),
             "gender": (s.get("gender") or "").strip(),
             "role": (s.get("role") or "").strip(),
@@ -3080,7 +3273,7 @@ def save_generated_podcast_to_firestore(user_id: str, title: str, script_style:
 
     # 3) Script doc (single doc, id = "main")
     script_ref = podcast_ref.collection("scripts").document("main")
-    script_ref.set({
+    uow.set(script_ref, {
         "sourceText": description,
         "finalScriptText": script,
         "wordCount": len((script or "").split()),
@@ -3088,6 +3281,9 @@ def save_generated_podcast_to_firestore(user_id: str, title: str, script_style:
         "lastEditedAt": now,
     })
 
+    if unit_of_work is None:
+        uow.commit()
+
     return podcast_id
 
 def generate_podcast_script(description: str, speakers_info: list, script_style: str, language: str = ""):
@@ -3294,6 +3490,7 @@ Transform the following text into a structured podcast script:
             {"role": "user", "content": prompt},
         ],
         temperature=0.75,
+        operation="script",
     )
 
     raw_script = response.choices[0].message.content.strip()
@@ -3404,6 +3601,7 @@ Script:
             {"role": "user", "content": prompt},
         ],
         temperature=0.7,
+        operation="title",
     )
 
     title = (resp.choices[0].message.content or "").strip()
@@ -3415,290 +3613,116 @@ Script:
     return title
 
 
-def fallback_time_split_chapters(word_timeline, language: str = "en"):
-    if not word_timeline:
-        return []
-
-    duration = float(word_timeline[-1]["end"])
-    cuts = [0.0, duration * 0.22, duration * 0.45, duration * 0.7, duration * 0.88]
-
-    if language == "ar":
-        titles = [
-            "\u0627\u0644\u0645\u0642\u062f\u0645\u0629",
-            "\u0627\u0644\u062e\u0644\u0641\u064a\u0629",
-            "\u0623\u0647\u0645 \u0627\u0644\u0646\u0642\u0627\u0634\u0627\u062a",
-            "\u0646\u0642\u0627\u0637 \u062a\u062d\u0648\u0644",
-            "\u0627\u0644\u062e\u0627\u062a\u0645\u0629",
-        ]
-    else:
-        titles = ["Opening", "Background", "Key Discussion", "Turning Points", "Wrap-Up"]
-    out = [{"title": t, "startSec": float(c)} for t, c in zip(titles, cuts)]
-    return out
+def build_chapters(word_timeline, transcript_text, language="en"):
+    return core_chapters.build_chapters(word_timeline, transcript_text, language=language, client=client)
 
-def sanitize_chapter_titles(chapters, language: str = "en"):
-    items = list(chapters or [])
-    if language != "ar" or not items:
-        return items
-
-    fallback_titles = [c["title"] for c in fallback_time_split_chapters(
-        [{"end": float(idx + 1)} for idx in range(max(len(items), 5))], language="ar"
-    )]
-
-    sanitized = []
-    for idx, chapter in enumerate(items):
-        title = str((chapter or {}).get("title") or "").strip()
-        start_sec = float((chapter or {}).get("startSec") or 0.0)
-        looks_broken = (
-            not title
-            or re.fullmatch(r"[\?\u061F\s]+", title) is not None
-            or ("?" in title and not is_arabic(title))
-        )
-        sanitized.append({
-            "title": fallback_titles[idx] if looks_broken and idx < len(fallback_titles) else title,
-            "startSec": start_sec,
-        })
 
-    return sanitized
+@app.get("/api/health")
+def health():
+    return jsonify(status="ok")
 
-def generate_chapters_from_transcript(transcript_text: str, language: str = "en"):
-    if language == "ar":
-        user_prompt = f"""
-Split this podcast transcript into podcast chapters for a player.
-Return 5 to 7 chapters.
-For each chapter:
-- title: short (2-6 words) in Arabic.
-- anchor: a short phrase (4-12 words) that appears in the transcript and starts that section (must be nearly exact text). Keep the anchor in the transcript's original language.
 
-Return JSON only:
-{{"chapters":[{{"title":"...","anchor":"..."}}, ...]}}
+@app.get("/api/metrics")
+def api_metrics():
+    """Prometheus text exposition; needs `Authorization: Bearer <WECAST_METRICS_TOKEN>` when that is set."""
+    if not METRICS_ENABLED:
+        return jsonify(error="Metrics are disabled."), 404
+    if METRICS_TOKEN:
+        supplied = (request.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+        if not secrets.compare_digest(supplied, METRICS_TOKEN):
+            return jsonify(error="Unauthorized"), 401
 
-Transcript:
-\"\"\"{transcript_text[:12000]}\"\"\"
-"""
-    else:
-        user_prompt = f"""
-Split this podcast transcript into podcast chapters for a player.
-Return 5 to 7 chapters.
-For each chapter:
-- title: short (2-6 words)
-- anchor: a short phrase (4-12 words) that appears in the transcript and starts that section (must be nearly exact text)
-
-Return JSON only:
-{{"chapters":[{{"title":"...","anchor":"..."}}, ...]}}
-
-Transcript:
-\"\"\"{transcript_text[:12000]}\"\"\"
-"""
+    from services.metrics import REGISTRY
 
-    resp = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "Return strict JSON only. No markdown."},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.3,
-    )
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
 
-    raw = (resp.choices[0].message.content or "").strip()
-    # naive JSON parse
-    try:
-        data = __import__("json").loads(raw)
-        return data.get("chapters") or []
-    except Exception:
-        return []
 
-def build_chapters(word_timeline, transcript_text, language="en"):
+@app.get("/api/admin/usage")
+def api_admin_usage():
+    """
+    Spend rollups; needs `Authorization: Bearer <WECAST_ADMIN_TOKEN>`.
+    ?podcastId= or ?userId= returns that rollup; otherwise daily totals for
+    the last ?days= (default 30) and the top ?limit= users and podcasts by cost.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify(error="Not found"), 404
+    supplied = (request.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+    if not secrets.compare_digest(supplied, ADMIN_TOKEN):
+        return jsonify(error="Unauthorized"), 401
+
+    from services.usage import get_meter, usage_report
+
+    meter = get_meter()
+    if meter is None:
+        return jsonify(error="Usage metering is disabled."), 404
+    # Include calls still waiting for the next batched write.
+    meter.flush()
     try:
-        proposed = generate_chapters_from_transcript(transcript_text, language=language)
-    except Exception as exc:
-        print(f"Chapter generation failed, using fallback: {exc}")
-        proposed = []
-
-    chapters = []
-    used = set()
+        days = min(max(int(request.args.get("days") or 30), 1), 366)
+        limit = min(max(int(request.args.get("limit") or 20), 1), 200)
+    except ValueError:
+        return jsonify(error="days and limit must be integers"), 400
+    report = usage_report(
+        db,
+        podcast_id=(request.args.get("podcastId") or "").strip(),
+        user_id=(request.args.get("userId") or "").strip(),
+        days=days,
+        limit=limit,
+    )
+    return jsonify(report)
 
-    for ch in proposed:
-        title = (ch.get("title") or "").strip()
-        anchor = (ch.get("anchor") or "").strip()
-        if not title or not anchor:
-            continue
 
-        start = find_anchor_start_sec(word_timeline, anchor)
-        if start is None:
+def _json_safe_voice_labels(labels: dict) -> dict:
+    """Serialize ElevenLabs-style labels for API clients (JSON-friendly)."""
+    out: dict = {}
+    for k, raw in (labels or {}).items():
+        if raw is None or k is None:
             continue
-
-        # avoid duplicates / too-close chapters
-        key = round(start, 2)
-        if key in used:
+        key = str(k)
+        if isinstance(raw, dict):
             continue
-        used.add(key)
+        if isinstance(raw, list):
+            out[key] = [str(x) for x in raw if x is not None]
+        else:
+            out[key] = str(raw)
+    return out
 
-        chapters.append({"title": title, "startSec": start})
 
-    chapters.sort(key=lambda x: x["startSec"])
+def _coerce_voice_language_list(labels: dict, legacy_langs=None) -> list:
+    """Build a deduped language list from ElevenLabs labels.language / labels.languages and legacy fields."""
+    langs: list = []
 
-    # Guardrails: must be actual chapters‌
-    # If fewer than 5 chapters, fallback to deterministic time split
-    if len(chapters) < 5:
-        chapters = fallback_time_split_chapters(word_timeline, language=language)
+    def _add_many(val):
+        if val is None:
+            return
+        if isinstance(val, list):
+            for x in val:
+                if x is not None:
+                    langs.append(str(x).strip())
+        elif isinstance(val, str):
+            for part in val.replace(";", ",").replace("|", ",").split(","):
+                p = part.strip()
+                if p:
+                    langs.append(p)
 
-    return sanitize_chapter_titles(chapters, language=language)
+    _add_many(legacy_langs)
 
+    if isinstance(labels, dict):
+        _add_many(labels.get("languages"))
+        one = labels.get("language") or labels.get("Language")
+        _add_many(one)
 
-def validate_roles(style: str, speakers_info: list):
-    roles = [s["role"] for s in speakers_info]
-
-    if style == "Interview":
-        return (
-            roles in [["host", "guest"], ["host", "host", "guest"]],
-            "For 'Interview' style, valid setups: 1 host â†’ 1 guest or 2 hosts â†’ 1 guest.",
-        )
-
-    if style == "Storytelling":
-        return (
-            roles in [["host"], ["host", "guest"], ["host", "guest", "guest"]],
-            "For 'Storytelling' style, valid setups: 1 host solo, 1 host â†’ 1 guest, or 1 host â†’ 2 guests.",
-        )
-
-    if style == "Educational":
-        return (
-            roles in [["host"], ["host", "guest"], ["host", "guest", "guest"]],
-            "For 'Educational' style, valid setups: 1 host solo, 1 host â†’ 1 guest, or 1 host â†’ 2 guests.",
-        )
-
-    if style == "Conversational":
-        return (
-            roles in [["host", "host"], ["host", "host", "host"]],
-            "For 'Conversational', use 2â€“3 hosts (no guests).",
-        )
-
-    return (True, "")
-
-def chars_to_words(text: str, ch_starts: list, ch_ends: list):
-    """
-    Convert character-level timestamps to word-level.
-    Returns list of dicts: {w, start, end}
-    """
-    words = []
-    if not text:
-        return words
-
-    n = min(len(text), len(ch_starts), len(ch_ends))
-    i = 0
-
-    while i < n:
-        if text[i].isspace():
-            i += 1
-            continue
-
-        start_i = i
-        start_t = ch_starts[i]
-
-        while i < n and not text[i].isspace():
-            i += 1
-
-        end_i = i - 1
-        end_t = ch_ends[end_i]
-
-        token = text[start_i:i].strip()
-        if token:
-            words.append({"w": token, "start": float(start_t), "end": float(end_t)})
-
-    return words
-
-def eleven_tts_with_timestamps(text: str, voice_id: str, model_id: str = "eleven_multilingual_v2"):
-    """
-    Returns: (audio_bytes, word_timings_for_this_segment)
-    word timings are relative to segment start (0.0)
-    """
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/with-timestamps"
-    headers = {
-        "xi-api-key": ELEVENLABS_API_KEY,
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
-    body = {
-        "text": text,
-        "model_id": model_id,
-        "output_format": "mp3_44100_128",
-    }
-
-    r = requests.post(url, headers=headers, json=body, timeout=120)
-    if not r.ok:
-        raise RuntimeError(f"ElevenLabs error {r.status_code}: {r.text[:300]}")
-
-    data = r.json()
-    audio_b64 = data.get("audio_base64")
-    if not audio_b64:
-        raise RuntimeError("Missing audio_base64 in ElevenLabs response.")
-
-    audio_bytes = base64.b64decode(audio_b64)
-
-    alignment = data.get("alignment") or {}
-    ch_starts = alignment.get("character_start_times_seconds") or []
-    ch_ends = alignment.get("character_end_times_seconds") or []
-
-    # Convert char timings to words using the exact same text we sent
-    words = chars_to_words(text, ch_starts, ch_ends)
-
-    return audio_bytes, words
-
-@app.get("/api/health")
-def health():
-    return jsonify(status="ok")
-
-
-def _json_safe_voice_labels(labels: dict) -> dict:
-    """Serialize ElevenLabs-style labels for API clients (JSON-friendly)."""
-    out: dict = {}
-    for k, raw in (labels or {}).items():
-        if raw is None or k is None:
-            continue
-        key = str(k)
-        if isinstance(raw, dict):
-            continue
-        if isinstance(raw, list):
-            out[key] = [str(x) for x in raw if x is not None]
-        else:
-            out[key] = str(raw)
-    return out
-
-
-def _coerce_voice_language_list(labels: dict, legacy_langs=None) -> list:
-    """Build a deduped language list from ElevenLabs labels.language / labels.languages and legacy fields."""
-    langs: list = []
-
-    def _add_many(val):
-        if val is None:
-            return
-        if isinstance(val, list):
-            for x in val:
-                if x is not None:
-                    langs.append(str(x).strip())
-        elif isinstance(val, str):
-            for part in val.replace(";", ",").replace("|", ",").split(","):
-                p = part.strip()
-                if p:
-                    langs.append(p)
-
-    _add_many(legacy_langs)
-
-    if isinstance(labels, dict):
-        _add_many(labels.get("languages"))
-        one = labels.get("language") or labels.get("Language")
-        _add_many(one)
-
-    seen: set = set()
-    out: list = []
-    for x in langs:
-        if not x:
-            continue
-        key = x.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(x)
-    return out
+    seen: set = set()
+    out: list = []
+    for x in langs:
+        if not x:
+            continue
+        key = x.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(x)
+    return out
 
 
 def _voice_language_accent_profiles(v: dict, labels: dict | None = None) -> list:
@@ -3907,11 +3931,70 @@ def _shared_voices_query_params_from_request():
     return params, page, page_size
 
 
+SHARED_VOICE_MIRROR_PATH = os.getenv("WECAST_SHARED_VOICE_MIRROR_PATH", "./.shared_voices.json")
+SHARED_VOICE_SYNC_INTERVAL_MINUTES = int(os.getenv("WECAST_SHARED_VOICE_SYNC_INTERVAL_MINUTES", "0"))
+_shared_voice_mirror = None
+
+
+def get_shared_voice_mirror():
+    global _shared_voice_mirror
+    if _shared_voice_mirror is None:
+        from services.shared_voice_library import SharedVoiceMirror
+
+        _shared_voice_mirror = SharedVoiceMirror(
+            SHARED_VOICE_MIRROR_PATH,
+            normalize=_normalize_shared_library_voice,
+        )
+    return _shared_voice_mirror
+
+
+def _query_shared_voice_mirror_from_request(index):
+    """Answer a shared-voices request from the local mirror, same payload shape as upstream."""
+    qparams, page, page_size = _shared_voices_query_params_from_request()
+    filters: dict = {}
+    any_of: dict = {"use_case": [], "descriptive": []}
+    search = ""
+    for name, value in qparams:
+        if name in ("page", "page_size"):
+            continue
+        if name == "search":
+            search = value
+        elif name == "use_cases":
+            any_of["use_case"].append(value)
+        elif name == "descriptives":
+            any_of["descriptive"].append(value)
+        else:
+            filters[name] = value
+
+    items, total_count = index.query(
+        filters=filters,
+        search=search,
+        any_of=any_of,
+        page=page,
+        page_size=page_size,
+    )
+    return dict(
+        count=len(items),
+        items=items,
+        has_more=(page + 1) * page_size < total_count,
+        total_count=total_count,
+        page=page,
+        page_size=page_size,
+        source="mirror",
+        syncedAt=index.synced_at,
+    )
+
+
 def _fetch_elevenlabs_shared_voices_from_request():
-    """Fetch shared voice library page from ElevenLabs using backend key only."""
+    """Fetch a shared voice library page, from the local mirror when synced, else ElevenLabs."""
     if not get_current_podcast_owner_id():
         return None, None, None, (jsonify(error="Not logged in"), 401)
 
+    mirror_index = get_shared_voice_mirror().get()
+    if mirror_index is not None:
+        payload = _query_shared_voice_mirror_from_request(mirror_index)
+        return payload, payload["page"], payload["page_size"], None
+
     if not _elevenlabs_key_ready():
         return None, None, None, _elevenlabs_not_configured_response()
 
@@ -3982,10 +4065,30 @@ def api_voices_elevenlabs():
 
 @app.get("/api/voices/library-options")
 def api_voices_library_options():
-    """Sample shared voices (paginated) to build filter dropdown options — no API key in response."""
+    """Filter dropdown options: exact facets from the mirror, else a sample of shared voices."""
     if not get_current_podcast_owner_id():
         return jsonify(error="Not logged in"), 401
 
+    mirror_index = get_shared_voice_mirror().get()
+    if mirror_index is not None:
+        facets = mirror_index.facets()
+
+        def _facet_values(field: str):
+            return sorted(facets.get(field, {}), key=lambda x: x.lower())
+
+        return jsonify(
+            languages=_facet_values("language"),
+            locales=_facet_values("locale"),
+            accents=_facet_values("accent"),
+            ages=_facet_values("age"),
+            use_cases=_facet_values("use_case"),
+            categories=_facet_values("category"),
+            counts=facets,
+            total_count=len(mirror_index),
+            source="mirror",
+            syncedAt=mirror_index.synced_at,
+        )
+
     if not _elevenlabs_key_ready():
         return _elevenlabs_not_configured_response()
     headers = _elevenlabs_headers()
@@ -4046,10 +4149,142 @@ def api_voices_library_options():
     )
 
 
+def _normalize_firestore_voice_doc(doc_id: str, v: dict) -> dict:
+    """Map a Firestore voices doc (either field casing) to /api/voices item shape."""
+    name = v.get("name") or v.get("Name") or ""
+    gender = v.get("gender") or v.get("Gender") or ""
+    description = v.get("description") or v.get("Description") or ""
+    provider = v.get("provider") or v.get("Provider") or "ElevenLabs"
+    pitch = v.get("pitch") or v.get("Pitch") or ""
+    languages = v.get("languages") or v.get("Languages") or []
+    tone = v.get("tone") or v.get("Tone") or []
+    stored_labels = v.get("labels") or v.get("Labels") or {}
+    if not isinstance(stored_labels, dict):
+        stored_labels = {}
+
+    provider_voice_id = (
+        v.get("providerVoiceId")
+        or v.get("provider_voice_id")
+        or v.get("voiceId")
+        or v.get("VoiceId")
+        or v.get("id")
+        or doc_id
+    )
+
+    labels_out = _json_safe_voice_labels(stored_labels)
+    if gender:
+        labels_out["gender"] = gender
+    if isinstance(languages, str) and languages.strip():
+        lang_legacy: list = [languages.strip()]
+    elif isinstance(languages, list):
+        lang_legacy = languages
+    else:
+        lang_legacy = []
+    lang_list = _coerce_voice_language_list(stored_labels, lang_legacy)
+    if not lang_list:
+        top_lang = v.get("language") or v.get("Language")
+        if isinstance(top_lang, str) and top_lang.strip():
+            lang_list = _coerce_voice_language_list(stored_labels, [top_lang.strip()])
+        elif isinstance(top_lang, list):
+            lang_list = _coerce_voice_language_list(stored_labels, top_lang)
+    if isinstance(tone, list):
+        tone_list = [str(x) for x in tone if x is not None]
+    elif isinstance(tone, str) and tone.strip():
+        tone_list = [tone.strip()]
+    else:
+        tone_list = []
+    language_accents = _voice_language_accent_profiles(v, labels_out)
+
+    return {
+        "docId": doc_id,
+        "id": provider_voice_id,
+        "providerVoiceId": provider_voice_id,
+        "provider": provider,
+        "name": name,
+        "gender": gender,
+        "description": description,
+        "pitch": pitch,
+        "languages": lang_list,
+        "languageAccents": language_accents,
+        "languageAccentPairs": language_accents,
+        "tone": tone_list,
+        "labels": labels_out,
+        "category": str(v.get("category") or v.get("Category") or ""),
+        "preview_url": v.get("preview_url") or "",
+    }
+
+
+VOICE_CATALOG_TTL_SECONDS = int(os.getenv("WECAST_VOICE_CATALOG_TTL_SECONDS", "300"))
+VOICE_CATALOG_WATCH = os.getenv("WECAST_VOICE_CATALOG_WATCH", "1").strip().lower() not in ("0", "false", "no")
+
+_firestore_voice_catalog = None
+_elevenlabs_voice_catalog = None
+
+
+def _load_firestore_voice_items():
+    items = [_normalize_firestore_voice_doc(d.id, d.to_dict() or {}) for d in db.collection("voices").stream()]
+    if VOICE_CATALOG_WATCH:
+        # Started on first load rather than at import so scripts importing app stay listener-free.
+        _firestore_voice_catalog.watch(db.collection("voices"))
+    return items
+
+
+def _load_elevenlabs_account_voice_items():
+    r = requests.get(
+        "https://api.elevenlabs.io/v1/voices",
+        headers=_elevenlabs_headers(),
+        timeout=30,
+    )
+    if not r.ok:
+        raise RuntimeError(f"ElevenLabs voices error {r.status_code}: {r.text[:300]}")
+    voices = (r.json() or {}).get("voices") or []
+    return [_normalize_elevenlabs_voice_item(v) for v in voices if (v.get("voice_id") or v.get("id"))]
+
+
+def get_firestore_voice_catalog():
+    global _firestore_voice_catalog
+    if _firestore_voice_catalog is None:
+        from services.voice_catalog import VoiceCatalog
+
+        _firestore_voice_catalog = VoiceCatalog(
+            _load_firestore_voice_items,
+            ttl_seconds=VOICE_CATALOG_TTL_SECONDS,
+            name="firestore",
+        )
+    return _firestore_voice_catalog
+
+
+def get_elevenlabs_voice_catalog():
+    global _elevenlabs_voice_catalog
+    if _elevenlabs_voice_catalog is None:
+        from services.voice_catalog import VoiceCatalog
+
+        _elevenlabs_voice_catalog = VoiceCatalog(
+            _load_elevenlabs_account_voice_items,
+            ttl_seconds=VOICE_CATALOG_TTL_SECONDS,
+            name="elevenlabs-account",
+        )
+    return _elevenlabs_voice_catalog
+
+
+def _voice_catalog_response(snapshot, items, filters: dict, limit: int = 0):
+    """Serve catalog items with an ETag derived from the catalog version and filters."""
+    if limit > 0:
+        items = items[:limit]
+    filter_key = json.dumps({**filters, "limit": limit}, sort_keys=True)
+    etag = f"{snapshot.etag}-{hashlib.sha1(filter_key.encode('utf-8')).hexdigest()[:12]}"
+    resp = jsonify(count=len(items), items=items)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp.make_conditional(request)
+
+
 @app.get("/api/voices")
 def api_voices():
     provider_q = (request.args.get("provider") or "").strip().lower()
     gender_q = (request.args.get("gender") or "").strip().lower()
+    language_q = (request.args.get("language") or "").strip().lower()
+    accent_q = (request.args.get("accent") or "").strip().lower()
     try:
         limit = int(request.args.get("limit") or "0")
     except Exception:
@@ -4058,14 +4293,7 @@ def api_voices():
     limit = max(0, min(limit, 1000))
 
     library_flag = str(request.args.get("library") or "").strip().lower() in ("1", "true", "yes")
-
-    def _gender_matches(value: str):
-        if not gender_q:
-            return True
-        v = (value or "").strip().lower()
-        if not v:
-            return False
-        return v == gender_q
+    filters = {"gender": gender_q, "language": language_q, "accent": accent_q}
 
     # If caller explicitly requests ElevenLabs, fetch live list directly.
     if provider_q == "elevenlabs":
@@ -4080,102 +4308,18 @@ def api_voices():
                 return err
             return jsonify(payload)
         try:
-            r = requests.get(
-                "https://api.elevenlabs.io/v1/voices",
-                headers=_elevenlabs_headers(),
-                timeout=30,
-            )
-            if not r.ok:
-                return jsonify(
-                    count=0,
-                    items=[],
-                    error=f"ElevenLabs voices error {r.status_code}: {r.text[:300]}",
-                ), 502
-            voices = (r.json() or {}).get("voices") or []
-            items = [_normalize_elevenlabs_voice_item(v) for v in voices if (v.get("voice_id") or v.get("id"))]
-            if gender_q:
-                items = [x for x in items if _gender_matches(x.get("gender"))]
-            if limit > 0:
-                items = items[:limit]
-            return jsonify(count=len(items), items=items)
+            snapshot = get_elevenlabs_voice_catalog().get()
+            return _voice_catalog_response(snapshot, snapshot.filter(**filters), filters, limit)
+        except RuntimeError as e:
+            return jsonify(count=0, items=[], error=str(e)), 502
         except Exception as e:
             print("ElevenLabs /api/voices direct ERROR:", e)
             return jsonify(error=str(e), count=0, items=[]), 500
 
     try:
-        docs = db.collection("voices").stream()
-
-        items = []
-        for d in docs:
-            v = d.to_dict() or {}
-
-            # normalize fields (support both Firestore styles)
-            name = v.get("name") or v.get("Name") or ""
-            gender = v.get("gender") or v.get("Gender") or ""
-            description = v.get("description") or v.get("Description") or ""
-            provider = v.get("provider") or v.get("Provider") or "ElevenLabs"
-            pitch = v.get("pitch") or v.get("Pitch") or ""
-            languages = v.get("languages") or v.get("Languages") or []
-            tone = v.get("tone") or v.get("Tone") or []
-            stored_labels = v.get("labels") or v.get("Labels") or {}
-            if not isinstance(stored_labels, dict):
-                stored_labels = {}
-
-            provider_voice_id = (
-                v.get("providerVoiceId")
-                or v.get("provider_voice_id")
-                or v.get("voiceId")
-                or v.get("VoiceId")
-                or v.get("id")
-                or d.id
-            )
-
-            labels_out = _json_safe_voice_labels(stored_labels)
-            if gender:
-                labels_out["gender"] = gender
-            if isinstance(languages, str) and languages.strip():
-                lang_legacy: list = [languages.strip()]
-            elif isinstance(languages, list):
-                lang_legacy = languages
-            else:
-                lang_legacy = []
-            lang_list = _coerce_voice_language_list(stored_labels, lang_legacy)
-            if not lang_list:
-                top_lang = v.get("language") or v.get("Language")
-                if isinstance(top_lang, str) and top_lang.strip():
-                    lang_list = _coerce_voice_language_list(stored_labels, [top_lang.strip()])
-                elif isinstance(top_lang, list):
-                    lang_list = _coerce_voice_language_list(stored_labels, top_lang)
-            if isinstance(tone, list):
-                tone_list = [str(x) for x in tone if x is not None]
-            elif isinstance(tone, str) and tone.strip():
-                tone_list = [tone.strip()]
-            else:
-                tone_list = []
-            language_accents = _voice_language_accent_profiles(v, labels_out)
-
-            out = {
-                "docId": d.id,
-                "id": provider_voice_id,
-                "providerVoiceId": provider_voice_id,
-                "provider": provider,
-                "name": name,
-                "gender": gender,
-                "description": description,
-                "pitch": pitch,
-                "languages": lang_list,
-                "languageAccents": language_accents,
-                "languageAccentPairs": language_accents,
-                "tone": tone_list,
-                "labels": labels_out,
-                "category": str(v.get("category") or v.get("Category") or ""),
-                "preview_url": v.get("preview_url") or "",
-            }
-            if _gender_matches(gender):
-                items.append(out)
-
-        if items:
-            return jsonify(count=len(items), items=items)
+        snapshot = get_firestore_voice_catalog().get()
+        if snapshot.items:
+            return _voice_catalog_response(snapshot, snapshot.filter(**filters), filters)
 
         # Fallback to ElevenLabs if Firestore has no voices
         if not get_current_podcast_owner_id():
@@ -4185,27 +4329,10 @@ def api_voices():
             return jsonify(count=0, items=[], error="ElevenLabs API key is not configured."), 500
 
         try:
-            r = requests.get(
-                "https://api.elevenlabs.io/v1/voices",
-                headers=_elevenlabs_headers(),
-                timeout=30,
-            )
-            if not r.ok:
-                return jsonify(
-                    count=0,
-                    items=[],
-                    error=f"ElevenLabs voices error {r.status_code}: {r.text[:200]}",
-                ), 502
-
-            data = r.json() or {}
-            voices = data.get("voices") or []
-            for v in voices:
-                out = _normalize_elevenlabs_voice_item(v)
-                gender = out.get("gender") or ""
-                if _gender_matches(gender):
-                    items.append(out)
-
-            return jsonify(count=len(items), items=items)
+            snapshot = get_elevenlabs_voice_catalog().get()
+            return _voice_catalog_response(snapshot, snapshot.filter(**filters), filters)
+        except RuntimeError as e:
+            return jsonify(count=0, items=[], error=str(e)), 502
         except Exception as e:
             print("ElevenLabs /api/voices fallback ERROR:", e)
             return jsonify(error=str(e), count=0, items=[]), 500
@@ -4214,8 +4341,96 @@ def api_voices():
         print("Firestore /api/voices ERROR:", e)
         return jsonify(error=str(e), count=0, items=[]), 500
 
+VOICE_PREVIEW_MODEL_ID = "eleven_turbo_v2_5"
+VOICE_PREVIEW_OUTPUT_FORMAT = "mp3_44100_64"
+VOICE_PREVIEW_CACHE_PREFIX = "voice-previews"
+# Keys known to exist in R2 and voice id/name -> resolved voice id. Both only grow
+# with distinct voices auditioned, so a simple cap is enough to bound them.
+_VOICE_PREVIEW_MEMO_LIMIT = 4096
+_voice_preview_known_keys = set()
+_voice_id_resolutions = {}
+
+
+def _voice_preview_cache_key(voice_id: str, text: str, model_id: str, output_format: str) -> str:
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+    safe_voice = re.sub(r"[^A-Za-z0-9_-]+", "_", voice_id)
+    return f"{VOICE_PREVIEW_CACHE_PREFIX}/{safe_voice}/{model_id}/{output_format}/{text_hash}.mp3"
+
+
+def _voice_preview_cached(object_key: str) -> bool:
+    if object_key in _voice_preview_known_keys:
+        return True
+    if not r2_storage:
+        return False
+    try:
+        if not r2_storage.exists(object_key):
+            return False
+    except Exception:
+        return False
+    _remember_voice_preview_key(object_key)
+    return True
+
+
+def _remember_voice_preview_key(object_key: str):
+    if len(_voice_preview_known_keys) >= _VOICE_PREVIEW_MEMO_LIMIT:
+        _voice_preview_known_keys.clear()
+    _voice_preview_known_keys.add(object_key)
+
+
+def _resolve_account_voice_id(voice_id: str, voice_name: str):
+    """
+    Resolve a voice id that ElevenLabs rejected against the account voice list,
+    matching by id first and then by name. Only hits are memoized, so a voice
+    added to the account later resolves once the catalog refreshes.
+    """
+    memo_key = (voice_id, (voice_name or voice_id).strip().lower())
+    cached = _voice_id_resolutions.get(memo_key)
+    if cached:
+        return cached
+
+    snapshot = get_elevenlabs_voice_catalog().get()
+    resolved = ""
+    if any(item.get("id") == voice_id for item in snapshot.items):
+        resolved = voice_id
+    else:
+        for item in snapshot.items:
+            if (item.get("name") or "").strip().lower() == memo_key[1] and item.get("id"):
+                resolved = item["id"]
+                break
+
+    if not resolved:
+        return ""
+    if len(_voice_id_resolutions) >= _VOICE_PREVIEW_MEMO_LIMIT:
+        _voice_id_resolutions.clear()
+    _voice_id_resolutions[memo_key] = resolved
+    return resolved
+
+
+def _voice_preview_response(object_key: str, audio_bytes: bytes = b"", cached: bool = False, as_url: bool = False):
+    """Point the client at the cached R2 object; stream bytes only when R2 is unavailable."""
+    audio_url = ""
+    if object_key:
+        try:
+            audio_url = build_r2_asset_url(object_key, expires_in=24 * 3600)
+        except Exception as exc:
+            print(f"Voice preview URL failed for '{object_key}': {exc}")
+    if not audio_url:
+        if as_url:
+            audio_url = "data:audio/mpeg;base64," + base64.b64encode(audio_bytes).decode("ascii")
+            return jsonify(url=audio_url, cached=False)
+        return Response(audio_bytes, mimetype="audio/mpeg")
+    if as_url:
+        return jsonify(url=audio_url, cached=cached)
+    return redirect(audio_url)
+
+
 @app.post("/api/voices/preview")
 def api_voice_preview():
+    """
+    Voice audition clip, cached in R2 by (voice id, text hash, model, format).
+    Responds with a redirect to the cached object, or JSON {url, cached} when
+    the body asks for responseType "url" (what the SPA uses to feed <audio>).
+    """
     user_id, err = _require_login_user()
     if err:
         return err
@@ -4226,6 +4441,8 @@ def api_voice_preview():
     text = (data.get("text") or "Hi, this is a WeCast sample.").strip()
     if len(text) > 120:
         text = text[:120].strip()
+    as_url = str(data.get("responseType") or "").strip().lower() == "url"
+    from services.usage import record_tts_cache_hit
 
     if not _elevenlabs_key_ready():
         return _elevenlabs_not_configured_response()
@@ -4245,54 +4462,61 @@ def api_voice_preview():
         )
         payload = {
             "text": text,
-            "model_id": "eleven_turbo_v2_5",
-            "output_format": "mp3_44100_64",
+            "model_id": VOICE_PREVIEW_MODEL_ID,
+            "output_format": VOICE_PREVIEW_OUTPUT_FORMAT,
         }
-        return requests.post(url, headers=headers, json=payload, timeout=40)
+        from services.usage import record_tts
+
+        with track("elevenlabs", "tts_preview"):
+            response = requests.post(url, headers=headers, json=payload, timeout=40)
+        if response.ok:
+            record_tts(len(text), operation="preview")
+        return response
+
+    def _cache_and_respond(resolved_voice_id: str, audio_bytes: bytes):
+        object_key = _voice_preview_cache_key(
+            resolved_voice_id, text, VOICE_PREVIEW_MODEL_ID, VOICE_PREVIEW_OUTPUT_FORMAT
+        )
+        try:
+            upload_bytes_to_r2(audio_bytes, object_key, "audio/mpeg")
+            _remember_voice_preview_key(object_key)
+        except Exception as exc:
+            print(f"Voice preview cache upload failed: {exc}")
+            object_key = ""
+        return _voice_preview_response(object_key, audio_bytes, cached=False, as_url=as_url)
+
+    # An id we already had to resolve by name goes straight to the resolved voice.
+    voice_id = _voice_id_resolutions.get((incoming, (incoming_name or incoming).lower())) or incoming
+    object_key = _voice_preview_cache_key(voice_id, text, VOICE_PREVIEW_MODEL_ID, VOICE_PREVIEW_OUTPUT_FORMAT)
+    if _voice_preview_cached(object_key):
+        record_tts_cache_hit(len(text), operation="preview")
+        return _voice_preview_response(object_key, cached=True, as_url=as_url)
 
     # Fast path: synthesize directly using the incoming ID.
-    voice_id = incoming
     r = _synthesize_preview(voice_id)
     if r.ok:
-        return Response(r.content, mimetype="audio/mpeg")
+        return _cache_and_respond(voice_id, r.content)
 
-    # Fallback: resolve by id/name from account voices, then retry once.
+    # Fallback: resolve by id/name from the cached account voices, then retry once.
     if r.status_code == 404:
         try:
-            vr = requests.get(
-                "https://api.elevenlabs.io/v1/voices",
-                headers=_elevenlabs_headers(),
-                timeout=20,
-            )
-            if not vr.ok:
+            resolved = _resolve_account_voice_id(incoming, incoming_name)
+            if not resolved:
                 return jsonify(
-                    error=f"ElevenLabs voices list failed {vr.status_code}",
-                    details=vr.text[:400],
-                ), 502
-
-            voices = (vr.json() or {}).get("voices") or []
-            by_id = {str(v.get("voice_id") or v.get("id") or "").strip(): v for v in voices}
-            by_name = {
-                (v.get("name") or "").strip().lower(): v
-                for v in voices
-                if (v.get("name") or "").strip()
-            }
+                    error="Voice not found in ElevenLabs account",
+                    received=incoming,
+                    receivedName=incoming_name,
+                ), 404
+            voice_id = resolved
 
-            if voice_id not in by_id:
-                suggest_name = (incoming_name or incoming).strip().lower()
-                match = by_name.get(suggest_name)
-                if match and (match.get("voice_id") or match.get("id")):
-                    voice_id = (match.get("voice_id") or match.get("id")).strip()
-                else:
-                    return jsonify(
-                        error="Voice not found in ElevenLabs account",
-                        received=incoming,
-                        receivedName=incoming_name,
-                    ), 404
+            object_key = _voice_preview_cache_key(voice_id, text, VOICE_PREVIEW_MODEL_ID, VOICE_PREVIEW_OUTPUT_FORMAT)
+            if _voice_preview_cached(object_key):
+                record_tts_cache_hit(len(text), operation="preview")
+                return _voice_preview_response(object_key, cached=True, as_url=as_url)
 
             retry = _synthesize_preview(voice_id)
             if retry.ok:
-                return Response(retry.content, mimetype="audio/mpeg")
+                return _cache_and_respond(voice_id, retry.content)
             if retry.status_code == 404:
                 return jsonify(
                     error="Voice not found on ElevenLabs",
@@ -4304,6 +4528,8 @@ def api_voice_preview():
                 voice_id=voice_id,
                 details=retry.text[:800],
             ), 502
+        except RuntimeError as e:
+            return jsonify(error="ElevenLabs voices list failed", details=str(e)), 502
         except Exception as e:
             return jsonify(error="Failed to resolve voice", details=str(e)), 500
 
@@ -4333,22 +4559,48 @@ def _assert_podcast_owner(podcast_id: str, user_id: str):
     return pdata, None
 
 
+# Create-flow state lives in a versioned Firestore draft per podcast
+# (services.draft_store); the session only remembers which podcast is active.
+LEGACY_SESSION_DRAFT_KEYS = (
+    "create_draft",
+    "introMusic",
+    "bodyMusic",
+    "outroMusic",
+    "last_audio_url",
+    "last_audio_key",
+    "last_word_timeline",
+)
+_draft_store = None
+
+
+def _get_draft_store():
+    global _draft_store
+    if _draft_store is None:
+        from services.draft_store import DraftStore
+
+        _draft_store = DraftStore(db)
+    return _draft_store
+
+
+def _active_draft_podcast_id():
+    return (session.get("draft_podcast_id") or "").strip()
+
+
+def _set_active_draft(podcast_id: str):
+    if session.get("draft_podcast_id") != podcast_id:
+        session["draft_podcast_id"] = podcast_id
+    for key in LEGACY_SESSION_DRAFT_KEYS:
+        session.pop(key, None)
+
+
 def _get_draft_for(podcast_id: str):
-    draft = session.get("create_draft") or {}
-    # Safety: only return the draft if it matches the podcastId
-    if draft.get("podcastId") != podcast_id:
-        return {}
-    return draft
-
-
-def _set_draft_for(podcast_id: str, updates: dict):
-    draft = session.get("create_draft") or {}
-    if draft.get("podcastId") != podcast_id:
-        # If the draft isn't for this podcast, create a minimal draft entry
-        draft = {"podcastId": podcast_id}
-    draft.update(updates)
-    session["create_draft"] = draft
-    session.modified = True
+    return _get_draft_store().get(podcast_id)
+
+
+def _set_draft_for(podcast_id: str, updates: dict, uow=None):
+    # Inline cover bytes go back to the client directly; they don't fit in a draft doc.
+    updates = {key: value for key, value in updates.items() if key != "coverArtBase64"}
+    _get_draft_store().update(podcast_id, updates, uow=uow)
 
 
 def _edit_draft_ref(podcast_id: str):
@@ -4388,23 +4640,33 @@ def _serialize_edit_draft(doc):
     }
 
 
-def _validate_image_bytes(image_bytes: bytes, min_size: int = 512):
-    try:
-        img = Image.open(BytesIO(image_bytes))
-        img.verify()  # verify file integrity
-    except UnidentifiedImageError:
-        return False, "Unsupported image format. Please upload PNG/JPG."
-    except Exception:
-        return False, "Invalid image file."
+COVER_MASTER_FORMAT = os.getenv("WECAST_IMAGE_MASTER_FORMAT", "WEBP")
+COVER_MASTER_MAX_SIDE = int(os.getenv("WECAST_COVER_MAX_SIDE", "3000"))
+AVATAR_MAX_SIDE = int(os.getenv("WECAST_AVATAR_MAX_SIDE", "512"))
+COVER_THUMB_SIZE = 256
+IMAGE_PIPELINE_TIMEOUT_SECONDS = int(os.getenv("WECAST_IMAGE_PIPELINE_TIMEOUT_SECONDS", "60"))
 
-    # reopen after verify
-    img = Image.open(BytesIO(image_bytes))
-    w, h = img.size
 
-    if w < min_size or h < min_size:
-        return False, f"Image too small. Minimum is {min_size}x{min_size}px."
+def _process_image(image_bytes: bytes, **options):
+    """
+    Run services.image_pipeline.process_image on the bounded media pool so
+    concurrent uploads can't decode more images at once than there are workers.
+    Raises ImageRejected for invalid input.
+    """
+    from services.image_pipeline import process_image
+
+    future = _get_media_pool().submit(process_image, image_bytes, **options)
+    return future.result(timeout=IMAGE_PIPELINE_TIMEOUT_SECONDS)
 
-    return True, {"width": w, "height": h, "format": (img.format or "").upper()}
+
+def _process_cover_image(image_bytes: bytes, min_size: int = 1):
+    return _process_image(
+        image_bytes,
+        min_side=min_size,
+        master_format=COVER_MASTER_FORMAT,
+        master_max_side=COVER_MASTER_MAX_SIDE,
+        thumb_sizes=(COVER_THUMB_SIZE,),
+    )
 
 
 def _build_cover_prompt(title: str, style: str, language: str, description: str, extra: str = ""):
@@ -4443,6 +4705,9 @@ def _generate_cover_b64(prompt: str, size: str = "1024x1024") -> str:
         prompt=prompt,
         size=size,
     )
+    from services.usage import record_image
+
+    record_image("gpt-image-1", size)
     return img.data[0].b64_json
 
 
@@ -4452,23 +4717,18 @@ def _cover_ext_from_mime(mime_type: str) -> str:
         return "jpg"
     if mt == "image/webp":
         return "webp"
+    if mt == "image/avif":
+        return "avif"
     return "png"
 
 
-def _make_cover_thumb_b64(image_bytes: bytes, size: int = 256) -> str:
-    """
-    Create a small JPEG thumbnail base64 suitable for Firestore storage.
-    """
-    try:
-        img = Image.open(BytesIO(image_bytes)).convert("RGB")
-        img.thumbnail((size, size))
-        buf = BytesIO()
-        img.save(buf, format="JPEG", quality=78, optimize=True)
-        return base64.b64encode(buf.getvalue()).decode("utf-8")
-    except Exception:
-        return ""
-
 def _persist_avatar_to_r2(user_id: str, image_bytes: bytes, mime_type: str):
+    processed = _process_image(
+        image_bytes,
+        master_format=COVER_MASTER_FORMAT,
+        master_max_side=AVATAR_MAX_SIDE,
+    )
+    image_bytes, mime_type = processed.stored_bytes()
     ext = _cover_ext_from_mime(mime_type)
     ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     object_key = f"avatars/{user_id}/{ts}.{ext}"
@@ -4478,19 +4738,20 @@ def _persist_avatar_to_r2(user_id: str, image_bytes: bytes, mime_type: str):
 
     return signed_url, object_key
 
-def _persist_cover_to_storage_and_doc(podcast_id: str, cover_b64: str, mime_type: str = "image/png"):
+def _persist_cover_to_storage_and_doc(podcast_id: str, image_bytes: bytes, mime_type: str = "image/png", processed=None):
     """
     Persist cover image to Cloudflare R2 and store a small thumbnail in Firestore.
+    The stored object is the re-encoded master when the pipeline produced one.
+    Pass `processed` when the caller already ran the image pipeline.
     Returns: (cover_url, storage_path, thumb_b64, persist_error)
     """
-    if not cover_b64:
+    if not image_bytes:
         return "", "", "", "missing_cover_data"
-    
-    if cover_b64.startswith("data:"):
-        cover_b64 = cover_b64.split(",", 1)[1]
 
-    img_bytes = base64.b64decode(cover_b64)
-    thumb_b64 = _make_cover_thumb_b64(img_bytes)
+    if processed is None:
+        processed = _process_cover_image(image_bytes)
+    thumb_b64 = processed.thumb_b64(COVER_THUMB_SIZE)
+    img_bytes, mime_type = processed.stored_bytes()
     ext = _cover_ext_from_mime(mime_type)
     ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     storage_path = f"covers/{podcast_id}/{ts}.{ext}"
@@ -4572,6 +4833,9 @@ def api_cover_generate(podcast_id):
     pdata, err = _assert_podcast_owner(podcast_id, user_id)
     if err:
         return err
+    from services.usage import bind_usage
+
+    bind_usage(user_id=user_id, podcast_id=podcast_id)
 
     payload = request.get_json(silent=True) or {}
     limit_ok, limit_state = _cover_generation_limit_status(pdata)
@@ -4597,7 +4861,7 @@ def api_cover_generate(podcast_id):
         except Exception:
             description = ""
 
-    style = (payload.get("style") or draft.get("script_style") or pdata.get("style") or "Conversational").strip()
+    style = (payload.get("style") or draft.get("scriptStyle") or pdata.get("style") or "Conversational").strip()
     language = (payload.get("language") or draft.get("language") or pdata.get("language") or "en").strip().lower()
     extra = (payload.get("direction") or "").strip()  #"blue palette", "minimal", etc.
 
@@ -4611,7 +4875,7 @@ def api_cover_generate(podcast_id):
 
     try:
         cover_url, storage_path, thumb_b64, persist_error = _persist_cover_to_storage_and_doc(
-            podcast_id, b64, "image/png"
+            podcast_id, base64.b64decode(b64), "image/png"
         )
     except Exception as e:
         print("Cover persist error:", e)
@@ -4756,9 +5020,10 @@ def api_update_podcast(podcast_id):
     
     if payload["description"]:
         updates["description"] = payload["description"]
-    
-    podcast_ref.set(updates, merge=True)
-    print(f"Updated main podcast document")
+
+    # Queue every write of the final save so it lands as one atomic batch.
+    uow = _firestore_unit_of_work()
+    uow.set(podcast_ref, updates, merge=True)
 
     # Get the script that the frontend sent (already has updated speaker names)
     script_to_save = payload["script"]
@@ -4768,12 +5033,11 @@ def api_update_podcast(podcast_id):
     # Update script - the frontend has already updated the speaker names
     if script_to_save:
         script_ref = podcast_ref.collection("scripts").document("main")
-        script_ref.set({
+        uow.set(script_ref, {
             "finalScriptText": script_to_save,
             "wordCount": len((script_to_save or "").split()),
             "lastEditedAt": firestore.SERVER_TIMESTAMP,
         }, merge=True)
-        print(f"DEBUG: Script saved to Firestore")
     else:
         print(f"DEBUG: No script to save")
 
@@ -4783,11 +5047,11 @@ def api_update_podcast(podcast_id):
         
         # Delete existing speakers
         for speaker_doc in podcast_ref.collection("speakers").stream():
-            speaker_doc.reference.delete()
+            uow.delete(speaker_doc.reference)
         
         # Add new speakers
         for speaker in payload["speakers"]:
-            podcast_ref.collection("speakers").document().set({
+            uow.set(podcast_ref.collection("speakers").document(), {
                 "name": speaker.get("name", ""),
                 "gender": speaker.get("gender", "Male"),
                 "role": speaker.get("role", "host"),
@@ -4795,16 +5059,18 @@ def api_update_podcast(podcast_id):
                 "voiceName": speaker.get("voiceName", "") or speaker.get("voice_name", ""),
                 "updatedAt": firestore.SERVER_TIMESTAMP,
             })
-        print(f"DEBUG: Speakers saved")
 
-    draft_ref.delete()
-    podcast_ref.set(
+    uow.delete(draft_ref)
+    uow.set(
+        podcast_ref,
         {
             "hasEditDraft": False,
             "editDraftUpdatedAt": firestore.DELETE_FIELD,
         },
         merge=True,
     )
+    written = uow.commit()
+    print(f"DEBUG: Final save committed {written} writes in one batch")
 
     return jsonify({
         "ok": True,
@@ -4832,47 +5098,282 @@ def api_cover_upload(podcast_id):
     if not image_bytes:
         return jsonify(error="Empty file"), 400
 
-    ok, info = _validate_image_bytes(image_bytes, min_size=512)
-    if not ok:
-        return jsonify(error=info), 400
+    from services.image_pipeline import ImageRejected
+
+    # One decode: validation, stored master and Firestore thumbnail together.
+    try:
+        processed = _process_cover_image(image_bytes, min_size=512)
+    except ImageRejected as e:
+        return jsonify(error=str(e)), 400
+    except Exception as e:
+        print("Cover processing error:", e)
+        return jsonify(error="Could not process image. Please try again."), 500
 
-    mimeType = "image/png" if info["format"] == "PNG" else "image/jpeg"
+    info = processed.info()
+    mimeType = processed.mime_type
 
     # Encode for session storage + frontend display
     b64 = base64.b64encode(image_bytes).decode("utf-8")
 
     try:
-        cover_url, storage_path, thumb_b64, persist_error = _persist_cover_to_storage_and_doc(
-            podcast_id, b64, mimeType
+        cover_url, storage_path, thumb_b64, persist_error = _persist_cover_to_storage_and_doc(
+            podcast_id, image_bytes, mimeType, processed=processed
+        )
+    except Exception as e:
+        print("Cover persist error:", e)
+        return jsonify(error="Cover uploaded but failed to persist."), 500
+
+    _set_draft_for(podcast_id, {
+        "coverArtBase64": b64,
+        "coverArtMeta": {
+            "uploadedAt": datetime.utcnow().isoformat(),
+            "source": "upload",
+            "width": info["width"],
+            "height": info["height"],
+            "format": info["format"],
+            "mimeType": mimeType,
+            "storagePath": storage_path,
+            "coverUrl": cover_url,
+            "persistError": persist_error,
+        },
+    })
+
+    return jsonify(
+        ok=True,
+        podcastId=podcast_id,
+        coverArtBase64=b64,
+        coverUrl=cover_url,
+        coverThumbB64=thumb_b64,
+        mimeType=mimeType,
+        meta=info,
+        warning=("Cover thumbnail saved; storage URL unavailable." if persist_error else ""),
+    )
+
+
+# ------------------------------------------------------------
+# Direct-to-R2 image uploads (presigned PUT + completion check)
+# ------------------------------------------------------------
+DIRECT_UPLOAD_IMAGE_TYPES = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+DIRECT_UPLOAD_MAX_BYTES = {"cover": 15 * 1024 * 1024, "avatar": 5 * 1024 * 1024}
+DIRECT_UPLOAD_MIN_SIDE = {"cover": 512, "avatar": 1}
+DIRECT_UPLOAD_URL_TTL_SECONDS = 600
+IMAGE_PROBE_BYTES = (64 * 1024, 1024 * 1024)
+
+_media_pool = None
+
+
+def _get_media_pool():
+    global _media_pool
+    if _media_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _media_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("WECAST_MEDIA_WORKERS", "2")),
+            thread_name_prefix="media",
+        )
+    return _media_pool
+
+
+def _direct_upload_prefix(kind: str, podcast_id: str = ""):
+    """Return (key prefix, owner context, error response) for the caller's upload target."""
+    if kind == "cover":
+        user_id, err = _require_login_user()
+        if err:
+            return "", None, err
+        safe_podcast_id = re.sub(r"[^A-Za-z0-9_-]", "", podcast_id or "")
+        if not safe_podcast_id:
+            return "", None, (jsonify(error="Missing podcastId"), 400)
+        pdata, err = _assert_podcast_owner(safe_podcast_id, user_id)
+        if err:
+            return "", None, err
+        return f"covers/{safe_podcast_id}/", {"podcastId": safe_podcast_id, "podcast": pdata}, None
+
+    if kind == "avatar":
+        identity = get_current_user_identity()
+        doc = identity.get("doc")
+        if not identity.get("email"):
+            return "", None, (jsonify(error="Not logged in"), 401)
+        if not doc or not doc.exists:
+            return "", None, (jsonify(error="User not found"), 404)
+        owner = identity.get("firebaseUid") or identity.get("email")
+        return f"avatars/{owner}/", {"userRef": doc.reference, "user": identity.get("data") or {}}, None
+
+    return "", None, (jsonify(error="Unsupported upload kind"), 400)
+
+
+def _probe_r2_image(object_key: str, content_length: int):
+    """Read just enough of the object for PIL to parse the header (no full decode)."""
+    from PIL import Image, UnidentifiedImageError
+
+    last_error = None
+    for probe_size in IMAGE_PROBE_BYTES:
+        end = min(probe_size, content_length) - 1
+        try:
+            head_bytes = r2_storage.read_range(object_key, 0, end)
+            img = Image.open(BytesIO(head_bytes))
+            return {"width": img.size[0], "height": img.size[1], "format": (img.format or "").upper()}
+        except (UnidentifiedImageError, OSError) as exc:
+            last_error = exc
+            if end + 1 >= content_length:
+                break
+    raise ValueError(f"unreadable image header: {last_error}")
+
+
+def _generate_cover_thumb_from_r2(podcast_id: str, object_key: str):
+    """Background job: build coverThumbB64 for a directly uploaded cover."""
+    try:
+        with track("r2", "get"):
+            obj = r2_client.get_object(Bucket=R2_BUCKET_NAME, Key=object_key)
+        try:
+            image_bytes = obj["Body"].read()
+        finally:
+            obj["Body"].close()
+        # Already on the media pool, so call the pipeline directly. With no
+        # master requested, JPEGs are decoded at reduced scale.
+        from services.image_pipeline import process_image
+
+        thumb_b64 = process_image(image_bytes, thumb_sizes=(COVER_THUMB_SIZE,)).thumb_b64(COVER_THUMB_SIZE)
+        if not thumb_b64:
+            return
+        ref = db.collection("podcasts").document(podcast_id)
+        current = ref.get()
+        # Skip if the user replaced the cover again while we were working.
+        if current.exists and ((current.to_dict() or {}).get("coverPath") or "") == object_key:
+            ref.set({"coverThumbB64": thumb_b64}, merge=True)
+    except Exception as exc:
+        print(f"Cover thumbnail job failed for {podcast_id}: {exc}")
+
+
+@app.post("/api/uploads/presign")
+def api_upload_presign():
+    """
+    Hand out a presigned PUT URL so the browser uploads cover/avatar images
+    straight to R2 instead of streaming them through a Flask thread.
+    """
+    if not r2_storage:
+        return jsonify(error="Direct uploads are unavailable", code="direct_upload_unavailable"), 503
+
+    data = request.get_json(silent=True) or {}
+    kind = (data.get("kind") or "").strip().lower()
+    content_type = (data.get("contentType") or "").strip().lower()
+    try:
+        size = int(data.get("size") or 0)
+    except (TypeError, ValueError):
+        size = 0
+
+    prefix, _, err = _direct_upload_prefix(kind, data.get("podcastId") or "")
+    if err:
+        return err
+    ext = DIRECT_UPLOAD_IMAGE_TYPES.get(content_type)
+    if not ext:
+        return jsonify(error="Unsupported image format. Please upload PNG/JPG/WEBP."), 400
+    if size <= 0 or size > DIRECT_UPLOAD_MAX_BYTES[kind]:
+        return jsonify(error=f"Image must be under {DIRECT_UPLOAD_MAX_BYTES[kind] // (1024 * 1024)}MB."), 400
+
+    ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    object_key = f"{prefix}{ts}-{secrets.token_hex(4)}.{ext}"
+    return jsonify(
+        ok=True,
+        method="PUT",
+        uploadUrl=r2_storage.presign_put(object_key, content_type, expires_in=DIRECT_UPLOAD_URL_TTL_SECONDS),
+        headers={"Content-Type": content_type},
+        objectKey=object_key,
+        expiresIn=DIRECT_UPLOAD_URL_TTL_SECONDS,
+    )
+
+
+@app.post("/api/uploads/complete")
+def api_upload_complete():
+    """
+    Verify a direct upload (HEAD + header-only image probe), attach it to the
+    podcast or profile and queue the cover thumbnail in the background.
+    """
+    if not r2_storage:
+        return jsonify(error="Direct uploads are unavailable", code="direct_upload_unavailable"), 503
+
+    data = request.get_json(silent=True) or {}
+    kind = (data.get("kind") or "").strip().lower()
+    object_key = (data.get("objectKey") or "").strip().lstrip("/")
+    prefix, owner, err = _direct_upload_prefix(kind, data.get("podcastId") or "")
+    if err:
+        return err
+    if not object_key.startswith(prefix) or "/" in object_key[len(prefix):]:
+        return jsonify(error="Upload does not belong to this target"), 403
+
+    meta = r2_storage.head(object_key)
+    if meta is None:
+        return jsonify(error="Upload not found. Please try again."), 404
+
+    content_length = int(meta.get("ContentLength") or 0)
+    mime_type = (meta.get("ContentType") or "").split(";", 1)[0].strip().lower()
+
+    def _reject(message):
+        delete_from_r2_quietly(object_key, label="Rejected upload")
+        return jsonify(error=message), 400
+
+    if mime_type not in DIRECT_UPLOAD_IMAGE_TYPES:
+        return _reject("Unsupported image format. Please upload PNG/JPG/WEBP.")
+    if content_length <= 0 or content_length > DIRECT_UPLOAD_MAX_BYTES[kind]:
+        return _reject(f"Image must be under {DIRECT_UPLOAD_MAX_BYTES[kind] // (1024 * 1024)}MB.")
+    try:
+        info = _probe_r2_image(object_key, content_length)
+    except ValueError:
+        return _reject("Invalid image file.")
+    min_side = DIRECT_UPLOAD_MIN_SIDE[kind]
+    if info["width"] < min_side or info["height"] < min_side:
+        return _reject(f"Image too small. Minimum is {min_side}x{min_side}px.")
+
+    asset_url = build_r2_asset_url(object_key, expires_in=3600)
+
+    if kind == "avatar":
+        old_avatar_key = (owner["user"].get("avatarKey") or "").strip()
+        owner["userRef"].set(
+            {"avatarKey": object_key, "avatarUrl": asset_url, "updatedAt": firestore.SERVER_TIMESTAMP},
+            merge=True,
         )
-    except Exception as e:
-        print("Cover persist error:", e)
-        return jsonify(error="Cover uploaded but failed to persist."), 500
+        if old_avatar_key and old_avatar_key != object_key:
+            delete_from_r2_quietly(old_avatar_key, label="Avatar replace")
+        return jsonify(ok=True, avatarUrl=asset_url, avatarKey=object_key, meta=info)
 
-    _set_draft_for(podcast_id, {
-        "coverArtBase64": b64,
-        "coverArtMeta": {
-            "uploadedAt": datetime.utcnow().isoformat(),
-            "source": "upload",
-            "width": info["width"],
-            "height": info["height"],
-            "format": info["format"],
-            "mimeType": mimeType,
-            "storagePath": storage_path,
-            "coverUrl": cover_url,
-            "persistError": persist_error,
+    podcast_id = owner["podcastId"]
+    old_cover_path = ((owner["podcast"] or {}).get("coverPath") or "").strip()
+    db.collection("podcasts").document(podcast_id).set(
+        {
+            "coverUrl": asset_url,
+            "coverPath": object_key,
+            "coverMimeType": mime_type,
+            "coverThumbB64": "",
+            "coverUpdatedAt": firestore.SERVER_TIMESTAMP,
         },
-    })
+        merge=True,
+    )
+    if old_cover_path and old_cover_path != object_key:
+        delete_from_r2_quietly(old_cover_path, label="Cover replace")
+    _get_media_pool().submit(_generate_cover_thumb_from_r2, podcast_id, object_key)
+
+    cover_meta = {
+        "uploadedAt": datetime.utcnow().isoformat(),
+        "source": "upload",
+        "width": info["width"],
+        "height": info["height"],
+        "format": info["format"],
+        "mimeType": mime_type,
+        "storagePath": object_key,
+        "coverUrl": asset_url,
+        "persistError": "",
+    }
+    _set_draft_for(podcast_id, {"coverArtBase64": None, "coverArtMeta": cover_meta})
 
     return jsonify(
         ok=True,
         podcastId=podcast_id,
-        coverArtBase64=b64,
-        coverUrl=cover_url,
-        coverThumbB64=thumb_b64,
-        mimeType=mimeType,
+        coverArtBase64=None,
+        coverUrl=asset_url,
+        coverThumbB64="",
+        thumbnailPending=True,
+        mimeType=mime_type,
         meta=info,
-        warning=("Cover thumbnail saved; storage URL unavailable." if persist_error else ""),
+        warning="",
     )
 
 @app.post("/api/podcasts/<podcast_id>/title")
@@ -4900,13 +5401,9 @@ def api_podcast_update_title(podcast_id):
         merge=True
     )
 
-    # also keep session draft in sync if its the same podcast
-    draft = session.get("create_draft") or {}
-    if draft.get("podcastId") == podcast_id:
-        draft["title"] = title
-        draft["show_title"] = title
-        session["create_draft"] = draft
-        session.modified = True
+    # also keep the create draft in sync if this session is working on it
+    if _active_draft_podcast_id() == podcast_id:
+        _set_draft_for(podcast_id, {"title": title, "showTitle": title})
 
     return jsonify(success=True, ok=True, podcastId=podcast_id, title=title)
 
@@ -5099,6 +5596,8 @@ def api_profile_update():
                     400,
                 )
             
+            from services.image_pipeline import ImageRejected
+
             try:
                 signed_url, avatar_key = _persist_avatar_to_r2(
                     user_id=firebase_uid or user_id,
@@ -5106,6 +5605,9 @@ def api_profile_update():
                     mime_type=avatar_file.content_type,
                 )
                 avatar_url = signed_url
+            except ImageRejected as e:
+                log_profile_update("rejected", reason="invalid_avatar_image")
+                return auth_error_response("invalid_avatar", str(e), 400)
             except Exception as e:
                 print(f"Avatar upload error for profile update userDoc={user_ref.path}: {e}")
                 traceback.print_exc()
@@ -5192,9 +5694,10 @@ def api_profile_update():
                 current_username=_stored_username_display(existing_data),
                 email=existing_data.get('email') or user_id,
                 firebase_uid=firebase_uid,
+                existing_data=existing_data,
             )
         else:
-            user_ref.set(update_data, merge=True)
+            user_ref.set(_with_login_name_index(update_data, existing_data), merge=True)
         if 'avatar_key' in locals() and old_avatar_key and old_avatar_key != avatar_key:
             delete_from_r2_quietly(old_avatar_key, label="Avatar replace")
 
@@ -5292,17 +5795,40 @@ def api_delete_account():
         session.modified = True
         return jsonify(error="User not found"), 404
 
-    def _purge_podcast_document(ref):
-        snapshot = ref.get()
-        if snapshot.exists:
-            _delete_podcast_assets(snapshot.to_dict() or {})
-        for sub_name in ("scripts", "speakers", "transcripts", "edits"):
-            try:
-                for sub_doc in ref.collection(sub_name).stream():
-                    sub_doc.reference.delete()
-            except Exception:
-                pass
-        ref.delete()
+    # Podcasts go first: if any of them survives, the account stays intact so
+    # the user can retry instead of leaving orphaned episodes behind.
+    deleted_podcast_ids = set()
+    podcast_candidates = [user_id]
+    for previous_email in data.get("previousEmails") or []:
+        normalized_previous = _normalize_email(previous_email)
+        if normalized_previous and normalized_previous not in podcast_candidates:
+            podcast_candidates.append(normalized_previous)
+
+    try:
+        podcast_snapshots = []
+        for candidate in podcast_candidates:
+            for podcast_doc in db.collection("podcasts").where("userId", "==", candidate).stream():
+                if podcast_doc.id in deleted_podcast_ids:
+                    continue
+                deleted_podcast_ids.add(podcast_doc.id)
+                podcast_snapshots.append(podcast_doc)
+
+        # One bulk pass for every episode doc, subcollection and R2 object.
+        purge_stats = _purge_podcast_snapshots(podcast_snapshots)
+        print(
+            f"Account purge for {_mask_email(user_id)}: "
+            f"podcasts={purge_stats['podcasts']} docs={purge_stats['documents']} "
+            f"objects={purge_stats['objects']}"
+        )
+    except Exception as podcast_error:
+        print(f"Podcast deletion error for {_mask_email(user_id)}: {podcast_error}")
+        return jsonify(error="Failed to delete account"), 500
+    if purge_stats["failedPodcastIds"]:
+        print(
+            f"Account deletion stopped for {_mask_email(user_id)}: "
+            f"podcasts not removed {purge_stats['failedPodcastIds']}"
+        )
+        return jsonify(error="Some podcasts could not be deleted. Your account was kept; please try again."), 500
 
     try:
         user_ref_for_reservation = doc.reference if doc and doc.exists else None
@@ -5318,23 +5844,6 @@ def api_delete_account():
             email=user_id,
         )
 
-        deleted_podcast_ids = set()
-        podcast_candidates = [user_id]
-        for previous_email in data.get("previousEmails") or []:
-            normalized_previous = _normalize_email(previous_email)
-            if normalized_previous and normalized_previous not in podcast_candidates:
-                podcast_candidates.append(normalized_previous)
-
-        for candidate in podcast_candidates:
-            try:
-                for doc in db.collection("podcasts").where("userId", "==", candidate).stream():
-                    if doc.id in deleted_podcast_ids:
-                        continue
-                    deleted_podcast_ids.add(doc.id)
-                    _purge_podcast_document(doc.reference)
-            except Exception as podcast_error:
-                print(f"Podcast deletion error for {candidate}: {podcast_error}")
-
         deleted_user_docs = 0
         user_doc_candidates = set(user_id_candidates(user_id))
         if firebase_uid:
@@ -6445,6 +6954,45 @@ def api_account_email_change_confirm():
         return jsonify(error="This email change link is invalid, expired, or already used."), 400
 
 
+_firestore_read_pool = None
+
+
+def _get_firestore_read_pool():
+    global _firestore_read_pool
+    if _firestore_read_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        _firestore_read_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("WECAST_FIRESTORE_READ_WORKERS", "4")),
+            thread_name_prefix="firestore-read",
+        )
+    return _firestore_read_pool
+
+
+def _load_podcast_edit_view(podcast_id: str):
+    """
+    Fetch everything the edit page needs in one round-trip of latency: one
+    get_all for the podcast, scripts/main and edits/draft docs, with the
+    speakers query running alongside it on the read pool. "speakers" is the
+    pending future; callers check ownership on "podcast" before reading it.
+    """
+    podcast_ref = db.collection("podcasts").document(podcast_id)
+    script_ref = podcast_ref.collection("scripts").document("main")
+    draft_ref = _edit_draft_ref(podcast_id)
+
+    speakers_future = _get_firestore_read_pool().submit(
+        lambda: list(podcast_ref.collection("speakers").stream())
+    )
+    # get_all does not guarantee order, so match snapshots back by path.
+    snapshots = {snap.reference.path: snap for snap in db.get_all([podcast_ref, script_ref, draft_ref])}
+    return {
+        "podcast": snapshots[podcast_ref.path],
+        "script": snapshots[script_ref.path],
+        "draft": snapshots[draft_ref.path],
+        "speakers": speakers_future,
+    }
+
+
 @app.get("/api/podcast/<podcast_id>")
 def api_get_podcast(podcast_id):
     """Fetch full podcast data for editing"""
@@ -6452,23 +7000,20 @@ def api_get_podcast(podcast_id):
     if not user_id:
         return jsonify(error="Not logged in"), 401
 
-    # Get podcast document
-    podcast_ref = db.collection("podcasts").document(podcast_id)
-    podcast_doc = podcast_ref.get()
-    
-    if not podcast_doc.exists:
+    view = _load_podcast_edit_view(podcast_id)
+    if not view["podcast"].exists:
+        view["speakers"].cancel()
         return jsonify(error="Podcast not found"), 404
 
-    podcast_data = podcast_doc.to_dict() or {}
+    podcast_data = view["podcast"].to_dict() or {}
     
-    # Verify ownership
+    # Verify ownership before any subcollection result is used.
     if not _podcast_owned_by_user(podcast_data, user_id):
+        view["speakers"].cancel()
         return jsonify(error="Forbidden"), 403
 
-    # Get speakers from subcollection
     speakers = []
-    speakers_query = podcast_ref.collection("speakers").stream()
-    for speaker_doc in speakers_query:
+    for speaker_doc in view["speakers"].result():
         speaker_data = speaker_doc.to_dict() or {}
         speakers.append({
             "name": speaker_data.get("name", ""),
@@ -6478,8 +7023,7 @@ def api_get_podcast(podcast_id):
             "voiceName": speaker_data.get("voiceName", "") or speaker_data.get("voice_name", ""),
         })
 
-    # Get script from subcollection
-    script_doc = podcast_ref.collection("scripts").document("main").get()
+    script_doc = view["script"]
     script = ""
     script_template = ""
     if script_doc.exists:
@@ -6487,7 +7031,7 @@ def api_get_podcast(podcast_id):
         script = script_data.get("finalScriptText", "")
         script_template = script_data.get("sourceText", "")
 
-    edit_draft = _serialize_edit_draft(_edit_draft_ref(podcast_id).get())
+    edit_draft = _serialize_edit_draft(view["draft"])
 
     # Prefer long-lived URLs for edit view too
     resolved_podcast_data = resolve_podcast_media_urls(
@@ -6545,6 +7089,9 @@ def api_generate():
         return jsonify(ok=False, error="Invalid speakers count."), 400
     if len(description.split()) < 500:
         return jsonify(ok=False, error="Your text must be at least 500 words."), 400
+    from services.usage import bind_usage
+
+    bind_usage(user_id=user_id)
 
     try:
         script = generate_podcast_script(description, speakers_info, script_style, language=ui_language)
@@ -6570,20 +7117,23 @@ def api_generate():
         speakers_info=speakers_info,
         language=ui_language,
     )
+    # The script and title calls above now count toward this episode.
+    bind_usage(podcast_id=podcast_id)
 
 
-    session["create_draft"] = {
-        "podcastId": podcast_id,
-        "script_style": script_style,
-        "speakers_count": speakers,
-        "speakers_info": speakers_info,
+    _get_draft_store().replace(podcast_id, {
+        "ownerId": user_id,
+        "scriptStyle": script_style,
+        "speakersCount": speakers,
+        "speakersInfo": speakers_info,
         "description": description,
         "script": script_template,
-        "show_title": show_title,
+        "showTitle": show_title,
         "title": title,
         "language": ui_language,
         "guestMode": is_guest_session,
-    }
+    })
+    _set_active_draft(podcast_id)
 
 
     return jsonify(ok=True, script=script_template, title=title, show_title=show_title, podcastId=podcast_id)
@@ -6714,6 +7264,11 @@ def api_episodes_list():
         else:
             items.append(payload)
 
+    # Stored audioUrl values may be expired presigned URLs; refresh them in one batch.
+    audio_urls = resolve_r2_asset_urls([item["audioKey"] for item in items + recycle_items], expires_in=24 * 3600)
+    for item in items + recycle_items:
+        item["audioUrl"] = audio_urls.get(str(item["audioKey"]).strip().lstrip("/")) or item["audioUrl"]
+
     print("Episodes returned:", len(items))
 
     return jsonify(
@@ -6800,16 +7355,9 @@ def api_delete_episode(episode_id):
     if not _podcast_owned_by_user(data, user_id):
         return jsonify(error="Forbidden"), 403
 
-    _delete_podcast_assets(data)
-
-    for sub_name in ("scripts", "speakers", "transcripts"):
-        try:
-            for sub_doc in ref.collection(sub_name).stream():
-                sub_doc.reference.delete()
-        except Exception:
-            pass
-
-    ref.delete()
+    purge_stats = _purge_podcast_snapshots([doc])
+    if episode_id in purge_stats["failedPodcastIds"]:
+        return jsonify(error="Failed to delete episode"), 500
 
     return jsonify(ok=True, deletedId=episode_id)
 
@@ -6818,221 +7366,59 @@ def api_delete_episode(episode_id):
 
 
 
-def clean_script_for_tts(script: str) -> str:
-    """
-    Create a clean text version for TTS:
-    - Remove speaker labels
-    - Remove formatting leftovers (ga:, fe:, -, bullet points, unicode spaces)
-    - Remove tags and markdown
-    - Keep only natural spoken text
-    """
-    cleaned_lines = []
-
-    for raw in script.splitlines():
-        line = raw.strip()
-        if not line:
-            continue
-
-        if line.startswith("#"):
-            continue
-
-        if is_section_header(line):
-            continue
-
-        if re.match(r"^([^:ï¼ڑ]+)[:ï¼ڑ]\s*(intro|body|outro|مقدمة|النص|الخاتمة)\s*$", line, re.IGNORECASE):
-            continue
-
-        if re.fullmatch(r"\[[^\]]+\]", line):
-            if not is_music_tag(line):
-                continue
-
-        line = re.sub(r"\[[^\]]*]", "", line)
-
-        line = re.sub(r"[\u200B-\u200D\uFEFF]", "", line)
-
-        if re.fullmatch(r"[-_=*~â€¢آ·\u2022]{2,}", line):
-            continue
-
-        line = re.sub(r"^[A-Za-z0-9]{1,10}\s*[:ï¼ڑ]\s*", "", line)
-
-        line = re.sub(r"^[^\w]+", "", line)
-        line = re.sub(r"\s{2,}", " ", line).strip()
-
-        if line:
-            cleaned_lines.append(line)
-
-    return "\n".join(cleaned_lines)
-
-def build_speaker_voice_map():
-    """
-    Build a mapping: speaker_name -> voiceId
-    plus a default voice (host voice if available).
-    """
-    draft = session.get("create_draft") or {}
-    speakers_info = draft.get("speakers_info") or []
-
-    mapping = {}
-    host_voice = None
-    any_voice = None
-
-    for s in speakers_info:
-        name = (s.get("name") or "").strip()
-        vid = (s.get("voiceId") or "").strip()
-        if not name or not vid:
-            continue
-
-        mapping[name] = vid
-        if not any_voice:
-            any_voice = vid
-        if s.get("role") == "host" and not host_voice:
-            host_voice = vid
-
-    default_voice = host_voice or any_voice or "21m00Tcm4TlvDq8ikWAM"
-    return mapping, default_voice
-
-def parse_script_into_segments(script: str):
+def synthesize_audio_from_script(script: str, podcast_id: str = "", draft=None):
     """
-    Turn the script into segments: [(speaker_name, text), ...]
-    - ignore markdown headings (#..)
-    - ignore INTRO/BODY/OUTRO headers
-    - ignore separator lines (----)
-    - lines without label keep the previous speaker
-    - Literal parser: KEEP speaker labels exactly as written.
-    - Only treat '[music]' as a special segment.
+    Render the script using the speakers and music of the podcast's draft.
+    Pass `draft` when the caller already loaded it; nothing here reads the
+    Flask session, so renders can also run from background workers.
     """
-    segments = []
-    last_speaker = None
-    for raw in script.splitlines():
-        stripped = raw.strip()
-        if not stripped:
-            continue
-
-        if is_music_tag(stripped):
-            segments.append(("__music__", None))
-            continue
-
-        if ":" in stripped:
-            speaker, text = stripped.split(":", 1)
-            speaker = speaker.strip()
-            text = text.strip()
-
-            if text:
-                segments.append((speaker, text))
-                last_speaker = speaker
-            continue
-
-        if last_speaker:
-            segments.append((last_speaker, stripped))
-
-    return segments
-
-def synthesize_audio_from_script(script: str, podcast_id: str = ""):
-    music_index = 0
+    if draft is None:
+        draft = _get_draft_for(podcast_id)
     script = (script or "").strip()
     if not script:
         return False, "Script is empty."
 
-    segments = parse_script_into_segments(script)
+    with span("parse", chars=len(script)) as parse_span:
+        segments = parse_script_into_segments(script)
+        parse_span.set(segments=len(segments))
     if not segments:
         return False, "Nothing to read after cleaning script."
 
-    speaker_to_voice, default_voice = build_speaker_voice_map()
-
-    audio_parts = []
-    word_timeline = []
-    timeline_offset = 0.0  # seconds
-
-    for speaker, text in segments:
-        # ----------------------
-        # MUSIC SEGMENT
-        # ----------------------
-        if speaker.strip().lower() == "__music__":
-            intro = session.get("introMusic", "")
-            body = session.get("bodyMusic", "")
-            outro = session.get("outroMusic", "")
-
-            if music_index == 0:
-                selected_music = intro
-            elif music_index in (1, 2):
-                selected_music = body
-            else:
-                selected_music = outro
-
-            music_index += 1
-
-            if selected_music:
-                music_path = os.path.join("static", "music", selected_music)
-                if os.path.exists(music_path):
-                    music_clip = AudioSegment.from_mp3(music_path)
-                    audio_parts.append(music_clip)
-
-                    # advance offset
-                    timeline_offset += (len(music_clip) / 1000.0)
-
-            continue
-
-        # ----------------------
-        # SPEECH SEGMENT
-        # ----------------------
-        if is_arabic(text):
-            tts_text = text.strip()
-        else:
-            tts_text = clean_script_for_tts(text)
-
-        if not tts_text.strip():
-            continue
-
-        voice_id = speaker_to_voice.get(speaker, default_voice)
-
-        try:
-            audio_bytes, segment_words = eleven_tts_with_timestamps(
-                text=tts_text,
-                voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-            )
-        except Exception as e:
-            return False, str(e)
-
-        speech_segment = AudioSegment.from_file(BytesIO(audio_bytes), format="mp3")
-        audio_parts.append(speech_segment)
-
-        # shift segment words to global timeline
-        for w in segment_words:
-            word_timeline.append({
-                "w": w["w"],
-                "start": w["start"] + timeline_offset,
-                "end": w["end"] + timeline_offset,
-                "speaker": speaker,
-            })
+    speaker_to_voice, default_voice = build_speaker_voice_map(draft.get("speakersInfo"))
 
-        # advance offset by this speech duration
-        timeline_offset += (len(speech_segment) / 1000.0)
+    try:
+        final_audio, word_timeline = render_segments(
+            segments,
+            speaker_to_voice,
+            default_voice,
+            music=(draft.get("introMusic") or "", draft.get("bodyMusic") or "", draft.get("outroMusic") or ""),
+            audio_segment=AudioSegment,
+        )
+    except Exception as e:
+        return False, str(e)
 
-    if not audio_parts:
+    if final_audio is None:
         return False, "No audio data generated."
 
-    final_audio = AudioSegment.silent(duration=500)
-    timeline_offset_final = 0.5  # because we added 500ms silence
-
-    for w in word_timeline:
-        w["start"] += timeline_offset_final
-        w["end"] += timeline_offset_final
-
-    for item in audio_parts:
-        final_audio += item
-
     safe_id = re.sub(r"[^A-Za-z0-9_-]", "", podcast_id or "")
     if not safe_id:
         safe_id = "output"
 
     local_filename = f"output_{safe_id}.mp3"
-    buffer = BytesIO()
-    final_audio.export(buffer, format="mp3")
-    mp3_bytes = buffer.getvalue()
-
-    # Upload to R2
     object_key = f"episodes/{safe_id}/{local_filename}"
-    upload_bytes_to_r2(mp3_bytes, object_key, "audio/mpeg")
+
+    # Encode to a temp file and stream it to R2 in parts instead of holding
+    # the MP3 buffer and a getvalue() copy next to the decoded audio.
+    import tempfile
+
+    with tempfile.TemporaryFile(suffix=".mp3") as mp3_file:
+        with span("encode", format="mp3", durationSec=round(len(final_audio) / 1000.0, 3)) as encode_span:
+            final_audio.export(mp3_file, format="mp3")
+            encode_span.set(bytes=mp3_file.tell())
+        del final_audio
+        mp3_file.seek(0)
+        with span("upload", key=object_key):
+            upload_stream_to_r2(mp3_file, object_key, "audio/mpeg")
     signed_url = build_r2_asset_url(object_key, expires_in=3600)
 
     return True, {
@@ -7043,21 +7429,24 @@ def synthesize_audio_from_script(script: str, podcast_id: str = ""):
 
 @app.post("/api/audio")
 def api_audio():
-    
+    # Root span of the render trace (services/tracing.py, WECAST_TRACE_EXPORTERS).
+    with span("render", endpoint="/api/audio") as render_span:
+        response = _render_audio_request(render_span)
+        render_span.set(status=(response[1] if isinstance(response, tuple) else 200))
+        return response
+
+
+def _render_audio_request(render_span):
     payload = request.get_json(silent=True) or {}
     script = (payload.get("scriptText") or request.form.get("scriptText") or "").strip()
     podcast_id = (payload.get("podcastId") or "").strip()
     ui_language = (payload.get("language") or "").strip().lower()
+    render_span.set(podcastId=podcast_id, scriptChars=len(script))
 
     print("DEBUG /api/audio script length:", len(script))
     print("DEBUG /api/audio first 200 chars:", script[:200])
     print("DEBUG /api/audio podcastId:", podcast_id)
     incoming_speakers_info = payload.get("speakers_info")
-    if isinstance(incoming_speakers_info, list) and incoming_speakers_info:
-        draft = session.get("create_draft") or {}
-        draft["speakers_info"] = incoming_speakers_info
-        session["create_draft"] = draft
-        session.modified = True
 
     if not podcast_id:
         return jsonify(error="Missing podcastId"), 400
@@ -7073,52 +7462,61 @@ def api_audio():
     pdata = doc.to_dict() or {}
     if not _podcast_owned_by_user(pdata, user_id):
         return jsonify(error="Forbidden"), 403
+    from services.usage import bind_usage
+
+    bind_usage(user_id=user_id, podcast_id=podcast_id)
+
+    draft = _get_draft_for(podcast_id)
+    if isinstance(incoming_speakers_info, list) and incoming_speakers_info:
+        draft["speakersInfo"] = incoming_speakers_info
 
-    ok, result = synthesize_audio_from_script(script, podcast_id)
+    ok, result = synthesize_audio_from_script(script, podcast_id, draft=draft)
     if not ok:
         return jsonify(error=result), 400
-
-    # keep audio in session 
-    session["last_audio_url"] = result["url"]
-    session["last_audio_key"] = result.get("audioKey", "")
-    session.modified = True
+    _set_active_draft(podcast_id)
 
     words = result.get("words") or []
-    transcript_text = build_transcript_text_with_speakers(words)
+    with span("transcript", words=len(words)):
+        transcript_text = build_transcript_text_with_speakers(words)
     old_audio_key = (pdata.get("audioKey") or "").strip()
     new_audio_key = (result.get("audioKey") or "").strip()
 
-    if ui_language in ("en", "ar"):
-        podcast_ref.set({
-            "language": ui_language,
-        }, merge=True)
+    # Generate chapters first so every doc write of this render commits together.
+    language = ui_language or pdata.get("language") or "en"
+    with span("chapters", language=language) as chapters_span:
+        chapters = build_chapters(words, transcript_text, language=language)
+        chapters_span.set(chapters=len(chapters or []))
 
-    # Save transcript text in main podcast doc (small)
-    podcast_ref.set({
+    podcast_updates = {
+        # Save transcript text in main podcast doc (small)
         "transcriptText": transcript_text,
         "transcriptUpdatedAt": firestore.SERVER_TIMESTAMP,
         "audioUrl": result["url"],
         "audioKey": new_audio_key,
         "audioUpdatedAt": firestore.SERVER_TIMESTAMP,
-    }, merge=True)
-
-    if old_audio_key and new_audio_key and old_audio_key != new_audio_key:
-        delete_from_r2_quietly(old_audio_key, label="Audio replace")
+        "chapters": chapters,
+        "chaptersUpdatedAt": firestore.SERVER_TIMESTAMP,
+    }
+    if ui_language in ("en", "ar"):
+        podcast_updates["language"] = ui_language
 
+    uow = _firestore_unit_of_work()
+    uow.set(podcast_ref, podcast_updates, merge=True)
+    draft_updates = {"lastAudioUrl": result["url"], "lastAudioKey": new_audio_key}
+    if isinstance(incoming_speakers_info, list) and incoming_speakers_info:
+        draft_updates["speakersInfo"] = incoming_speakers_info
+    _set_draft_for(podcast_id, draft_updates, uow=uow)
     # Save full word timeline in a subcollection doc
-    podcast_ref.collection("transcripts").document("main").set({
+    uow.set(podcast_ref.collection("transcripts").document("main"), {
         "words": words,
         "updatedAt": firestore.SERVER_TIMESTAMP,
     }, merge=True)
-    
-    # Generate & save chapters
-    language = ui_language or pdata.get("language") or "en"
-    chapters = build_chapters(words, transcript_text, language=language)
+    with span("transcript_write", words=len(words)):
+        uow.commit()
 
-    podcast_ref.set({
-        "chapters": chapters,
-        "chaptersUpdatedAt": firestore.SERVER_TIMESTAMP,
-    }, merge=True)
+    # Only drop the previous render once the doc points at the new one.
+    if old_audio_key and new_audio_key and old_audio_key != new_audio_key:
+        delete_from_r2_quietly(old_audio_key, label="Audio replace")
 
     return jsonify(
         url=result["url"],
@@ -7226,6 +7624,9 @@ def summarize_transcript():
             system_prompt = "You are a helpful assistant that creates concise podcast summaries. Always respond with 150 words or less."
             user_prompt = f"Please summarize this podcast transcript in 150 words or less. Focus on the main points, key insights, and important discussions:\n\n{text}"
 
+        from services.usage import bind_usage, record_chat
+
+        bind_usage(user_id=user_id, podcast_id=podcast_id)
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
@@ -7235,6 +7636,7 @@ def summarize_transcript():
             max_tokens=350,
             temperature=0.7
         )
+        record_chat(response, operation="summary")
 
         summary = (response.choices[0].message.content or "").strip()
 
@@ -7383,7 +7785,7 @@ def save_all_podcast(podcast_id):
     audio_url = (payload.get("audioUrl") or payload.get("audio_url") or "").strip()
     audio_key = (payload.get("audioKey") or payload.get("audio_key") or "").strip()
     if not audio_key:
-        audio_key = (session.get("last_audio_key") or "").strip()
+        audio_key = (_get_draft_for(podcast_id).get("lastAudioKey") or "").strip()
     summary = payload.get("summary")
     chapters = payload.get("chapters")
     words = payload.get("words")
@@ -7445,8 +7847,9 @@ def save_preview_snapshot():
         return jsonify(error="Not logged in"), 401
 
     payload = request.get_json(silent=True) or {}
-    audio_url = _normalize_public_url((payload.get("audioUrl") or payload.get("audio_url") or session.get("last_audio_url") or "").strip())
-    audio_key = (payload.get("audioKey") or payload.get("audio_key") or session.get("last_audio_key") or "").strip()
+    draft = _get_draft_for(_active_draft_podcast_id())
+    audio_url = _normalize_public_url((payload.get("audioUrl") or payload.get("audio_url") or draft.get("lastAudioUrl") or "").strip())
+    audio_key = (payload.get("audioKey") or payload.get("audio_key") or draft.get("lastAudioKey") or "").strip()
     summary = payload.get("summary")
     chapters = payload.get("chapters")
     words = payload.get("words")
@@ -7457,19 +7860,18 @@ def save_preview_snapshot():
     category = (payload.get("category") or "").strip()
     speakers_info = payload.get("speakers") if isinstance(payload.get("speakers"), list) else None
 
-    draft = session.get("create_draft") or {}
     title = resolve_episode_title(payload, draft)
     print(f"[WeCast guest restore] title payload received after login: {title}")
     if not description:
         description = (draft.get("description") or "").strip()
     if not style:
-        style = (draft.get("script_style") or "").strip()
+        style = (draft.get("scriptStyle") or "").strip()
     if speakers_info is None:
-        draft_speakers = draft.get("speakers_info")
+        draft_speakers = draft.get("speakersInfo")
         speakers_info = draft_speakers if isinstance(draft_speakers, list) else []
 
-    if not isinstance(words, list) or not words:
-        words = session.get("last_word_timeline") or []
+    if not isinstance(words, list):
+        words = []
 
     if words and not transcript_text:
         try:
@@ -7479,6 +7881,7 @@ def save_preview_snapshot():
 
     script_text = (payload.get("script") or draft.get("script") or transcript_text or "").strip()
 
+    uow = _firestore_unit_of_work()
     podcast_id = save_generated_podcast_to_firestore(
         user_id=user_id,
         title=title,
@@ -7487,6 +7890,7 @@ def save_preview_snapshot():
         script=script_text,
         speakers_info=speakers_info or [],
         language=language,
+        unit_of_work=uow,
     )
 
     ref = db.collection("podcasts").document(podcast_id)
@@ -7516,10 +7920,11 @@ def save_preview_snapshot():
         updates["transcriptText"] = transcript_text
         updates["transcriptUpdatedAt"] = firestore.SERVER_TIMESTAMP
 
-    ref.set(updates, merge=True)
+    uow.set(ref, updates, merge=True)
 
     if isinstance(words, list) and words:
-        ref.collection("transcripts").document("main").set(
+        uow.set(
+            ref.collection("transcripts").document("main"),
             {
                 "words": words,
                 "updatedAt": firestore.SERVER_TIMESTAMP,
@@ -7527,17 +7932,33 @@ def save_preview_snapshot():
             merge=True,
         )
 
+    uow.commit()
     return jsonify(ok=True, podcastId=podcast_id)
 
 
 @app.post("/api/save-music")
 def save_music():
     data = request.get_json() or {}
-    session["introMusic"] = data.get("introMusic", "")
-    session["bodyMusic"] = data.get("bodyMusic", "")
-    session["outroMusic"] = data.get("outroMusic", "")
+    podcast_id = (data.get("podcastId") or "").strip()
+    if podcast_id:
+        user_id = get_current_podcast_owner_id()
+        if not user_id:
+            return jsonify(error="Not logged in"), 401
+        _, err = _assert_podcast_owner(podcast_id, user_id)
+        if err:
+            return err
+        _set_active_draft(podcast_id)
+    else:
+        podcast_id = _active_draft_podcast_id()
+    if not podcast_id:
+        return jsonify(ok=True, saved=False)
 
-    return jsonify(ok=True)
+    _set_draft_for(podcast_id, {
+        "introMusic": data.get("introMusic") or "",
+        "bodyMusic": data.get("bodyMusic") or "",
+        "outroMusic": data.get("outroMusic") or "",
+    })
+    return jsonify(ok=True, saved=True)
 
 # ------------------------------------------------------------
 # ------------------------------------------------------------
@@ -7552,13 +7973,12 @@ def api_audio_last():
     Return the last generated audio URL for this session, if any.
     Used so the audio does not 'disappear' after refresh or navigation.
     """
-    url = session.get("last_audio_url")
-    key = session.get("last_audio_key")
+    draft = _get_draft_for(_active_draft_podcast_id())
+    url = draft.get("lastAudioUrl")
+    key = draft.get("lastAudioKey")
     if key:
         try:
             url = build_r2_asset_url(key, expires_in=3600)
-            session["last_audio_url"] = url
-            session.modified = True
         except Exception as exc:
             print(f"Last audio URL refresh failed: {exc}")
     return jsonify(url=url or None, audioKey=key or None)
@@ -8224,6 +8644,10 @@ def send_podcast_ready_email(user_email, podcast_title, podcast_id):
     except ValueError:
         smtp_port = 587
 
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     try:
         msg = MIMEMultipart()
         from_name = (os.getenv("FROM_NAME") or os.getenv("RESEND_FROM_NAME") or "WeCast").strip()
@@ -8311,8 +8735,151 @@ def download_shared_podcast(podcast_id):
 
 
 # ------------------------------------------------------------
-# Main
+# Recycle bin reaper (optional in-process scheduler)
+# ------------------------------------------------------------
+RECYCLE_BIN_REAPER_INTERVAL_MINUTES = int(os.getenv("WECAST_RECYCLE_BIN_REAPER_INTERVAL_MINUTES", "0"))
+RECYCLE_BIN_REAPER_MAX_PAGES = int(os.getenv("WECAST_RECYCLE_BIN_REAPER_MAX_PAGES", "10"))
+_recycle_bin_reaper_thread = None
+
+
+def run_recycle_bin_reaper(max_pages=None):
+    from services.recycle_bin_reaper import reap_recycle_bin
+
+    return reap_recycle_bin(
+        db,
+        retention_days=RECYCLE_BIN_RETENTION_DAYS,
+        r2_client=r2_client,
+        bucket_name=R2_BUCKET_NAME,
+        max_pages=max_pages,
+        pause_seconds=1.0,
+    )
+
+
+def _start_recycle_bin_reaper():
+    """
+    Purge expired trash every N minutes when WECAST_RECYCLE_BIN_REAPER_INTERVAL_MINUTES > 0.
+    Every worker starts the loop, but only the holder of the Firestore lease
+    runs a pass; the lease lasts two intervals, so a dead holder is replaced.
+    """
+    global _recycle_bin_reaper_thread
+    if RECYCLE_BIN_REAPER_INTERVAL_MINUTES <= 0 or _recycle_bin_reaper_thread is not None:
+        return
+
+    import threading
+    from services.scheduler_lease import FirestoreLease
+
+    stop_event = threading.Event()
+    lease = FirestoreLease(db, "recycleBinReaper", ttl_seconds=RECYCLE_BIN_REAPER_INTERVAL_MINUTES * 60 * 2)
+
+    def _loop():
+        while not stop_event.wait(RECYCLE_BIN_REAPER_INTERVAL_MINUTES * 60):
+            if not lease.acquire():
+                continue
+            try:
+                totals = run_recycle_bin_reaper(max_pages=RECYCLE_BIN_REAPER_MAX_PAGES)
+                print(
+                    "Recycle bin reaper:",
+                    f"episodes={totals['episodes']}",
+                    f"docs={totals['documents']}",
+                    f"objects={totals['objects']}",
+                    f"bytes={totals['bytes']}",
+                )
+            except Exception as exc:
+                print(f"Recycle bin reaper failed: {exc}")
+
+    _recycle_bin_reaper_thread = threading.Thread(target=_loop, name="recycle-bin-reaper", daemon=True)
+    _recycle_bin_reaper_thread.start()
+
+
+
+# ------------------------------------------------------------
+# Shared voice library mirror sync (optional in-process scheduler)
+# ------------------------------------------------------------
+_shared_voice_sync_thread = None
+
+
+def run_shared_voice_sync():
+    return get_shared_voice_mirror().sync(_elevenlabs_headers(), pause_seconds=0.2)
+
+
+def _start_shared_voice_sync():
+    """
+    Re-mirror the ElevenLabs shared library every N minutes when WECAST_SHARED_VOICE_SYNC_INTERVAL_MINUTES > 0.
+    The mirror is a file on this host's disk, so each instance keeps its own,
+    and a lock next to it lets only one worker per host sync; the others
+    pick the new file up by its mtime.
+    """
+    global _shared_voice_sync_thread
+    if SHARED_VOICE_SYNC_INTERVAL_MINUTES <= 0 or _shared_voice_sync_thread is not None:
+        return
+    if not _elevenlabs_key_ready():
+        print("Shared voice sync disabled: ElevenLabs API key is not configured.")
+        return
+
+    import threading
+    from services.scheduler_lease import HostLock
+
+    stop_event = threading.Event()
+    host_lock = HostLock(SHARED_VOICE_MIRROR_PATH + ".lock")
+
+    def _loop():
+        # Sync straight away when there is no mirror yet (fresh deploy, ephemeral disk).
+        delay = 0 if get_shared_voice_mirror().get() is None else SHARED_VOICE_SYNC_INTERVAL_MINUTES * 60
+        while not stop_event.wait(delay):
+            delay = SHARED_VOICE_SYNC_INTERVAL_MINUTES * 60
+            if not host_lock.acquire():
+                continue
+            try:
+                print(f"Shared voice sync: mirrored {run_shared_voice_sync()} voices")
+            except Exception as exc:
+                print(f"Shared voice sync failed: {exc}")
+
+    _shared_voice_sync_thread = threading.Thread(target=_loop, name="shared-voice-sync", daemon=True)
+    _shared_voice_sync_thread.start()
+
+
+# ------------------------------------------------------------
+# App factory / Main
 # ------------------------------------------------------------
+WARM_CLIENTS_ON_START = os.getenv("WECAST_WARM_CLIENTS", "1").strip().lower() not in ("0", "false", "no")
+_app_started = False
+
+
+def _warm_clients():
+    """Build the lazy SDK clients in the background so the first real request doesn't pay for it."""
+    from services.lazy import warm
+
+    for name, target in (("firestore", db), ("r2", r2_storage), ("openai", client), ("pydub", AudioSegment)):
+        try:
+            warm(target)
+        except Exception as exc:
+            print(f"Warm-up of {name} client failed: {exc}")
+
+
+def create_app():
+    """
+    WSGI entry point (gunicorn "app:create_app()").
+
+    Importing this module only registers routes and reads config; SDK clients
+    are built on first use. create_app() logs the env diagnostics, starts the
+    optional background schedulers and (unless WECAST_WARM_CLIENTS=0) warms the
+    clients off-thread, so the worker answers /api/health immediately.
+    Scripts that import app get none of these side effects.
+    """
+    global _app_started
+    if _app_started:
+        return app
+    _app_started = True
+
+    _log_startup_diagnostics()
+    _start_recycle_bin_reaper()
+    _start_shared_voice_sync()
+    if WARM_CLIENTS_ON_START:
+        import threading
+
+        threading.Thread(target=_warm_clients, name="warm-clients", daemon=True).start()
+    return app
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    create_app().run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,12 @@
+"""
+Offline benchmarks: app.py driven against local stand-ins for ElevenLabs,
+OpenAI, Firestore and R2. Run from the repo root:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --cases synthesize,share --tts-ms 400 --firestore-ms 20
+
+benchmarks.load runs mixed traffic against gunicorn configurations serving
+benchmarks.wsgi and prints a capacity table:
+
+    python -m benchmarks.load --configs gthread-1x2,gthread-2x4,offload-1x4+2x1
+"""
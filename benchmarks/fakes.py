@@ -0,0 +1,853 @@
+"""
+Local stand-ins for the paid/remote services, each with configurable latency.
+
+- FakeElevenLabs: HTTP-level stub for api.elevenlabs.io (deterministic silent
+  MP3 + character alignment), installed by intercepting `requests`.
+- FakeOpenAI: the chat.completions / images.generate subset the app calls.
+- MemoryFirestore: in-memory Firestore client (documents, subcollections,
+  queries, batches, get_all) that understands the write sentinels.
+- LocalS3: S3-compatible client over a local directory, enough for
+  services.storage.R2Storage and the multipart uploader.
+"""
+import base64
+import copy
+import hashlib
+import hmac
+import io
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from urllib.parse import quote, urlparse
+
+
+def _sleep_ms(latency_ms):
+    if latency_ms and latency_ms > 0:
+        time.sleep(latency_ms / 1000.0)
+
+
+# ------------------------------------------------------------
+# Audio
+# ------------------------------------------------------------
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono, no padding. A frame whose side
+# info and main data are all zero decodes as 1152 samples of silence.
+_MP3_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0xC0])
+_MP3_FRAME_BYTES = 417
+_MP3_FRAME_SECONDS = 1152 / 44100.0
+_SILENT_FRAME = _MP3_FRAME_HEADER + bytes(_MP3_FRAME_BYTES - len(_MP3_FRAME_HEADER))
+
+
+def silent_mp3(seconds):
+    """Deterministic, decodable MP3 of roughly `seconds` of silence."""
+    frames = max(1, int(round(seconds / _MP3_FRAME_SECONDS)))
+    return _SILENT_FRAME * frames
+
+
+# ------------------------------------------------------------
+# HTTP interception for `requests`
+# ------------------------------------------------------------
+def make_response(status_code, body=b"", *, content_type="application/json", url=""):
+    import requests
+
+    response = requests.models.Response()
+    response.status_code = status_code
+    if not isinstance(body, (bytes, bytearray)):
+        body = json.dumps(body).encode("utf-8")
+    response._content = bytes(body)
+    response.headers["Content-Type"] = content_type
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+def install_http_stubs(handlers):
+    """
+    Route `requests` calls for the given hosts to handler(method, url, **kwargs).
+    Other hosts go out as usual. Returns a function that removes the stubs.
+    """
+    import requests
+
+    original = requests.sessions.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        handler = handlers.get(urlparse(url).hostname or "")
+        if handler is None:
+            return original(session, method, url, *args, **kwargs)
+        return handler(method.upper(), url, **kwargs)
+
+    requests.sessions.Session.request = request
+
+    def uninstall():
+        requests.sessions.Session.request = original
+
+    return uninstall
+
+
+# ------------------------------------------------------------
+# ElevenLabs
+# ------------------------------------------------------------
+class FakeElevenLabs:
+    """
+    Answers text-to-speech (with-timestamps and stream), voices and
+    shared-voices requests. Speech lasts len(text) / chars_per_second seconds,
+    with characters spread evenly across it.
+    """
+
+    host = "api.elevenlabs.io"
+
+    def __init__(self, *, latency_ms=0, ms_per_char=0.0, chars_per_second=15.0, voices=24):
+        self.latency_ms = latency_ms
+        self.ms_per_char = ms_per_char
+        self.chars_per_second = chars_per_second
+        self.voice_count = voices
+        self.requests = 0
+        self.characters = 0
+        self._lock = threading.Lock()
+
+    def voices(self):
+        genders = ("female", "male")
+        accents = ("american", "british", "arabic")
+        return [
+            {
+                "voice_id": f"bench-voice-{index:03d}",
+                "name": f"Bench Voice {index}",
+                "category": "premade",
+                "labels": {"gender": genders[index % 2], "accent": accents[index % 3], "language": "en"},
+                "preview_url": "",
+            }
+            for index in range(self.voice_count)
+        ]
+
+    def synthesize(self, text):
+        """(mp3_bytes, alignment) for text, as the with-timestamps endpoint returns them."""
+        duration = max(0.3, len(text) / self.chars_per_second)
+        step = duration / max(1, len(text))
+        starts = [round(index * step, 4) for index in range(len(text))]
+        ends = [round((index + 1) * step, 4) for index in range(len(text))]
+        alignment = {
+            "characters": list(text),
+            "character_start_times_seconds": starts,
+            "character_end_times_seconds": ends,
+        }
+        return silent_mp3(duration), alignment
+
+    def __call__(self, method, url, **kwargs):
+        body = kwargs.get("json") or {}
+        text = str(body.get("text") or "")
+        with self._lock:
+            self.requests += 1
+            self.characters += len(text)
+        _sleep_ms(self.latency_ms + self.ms_per_char * len(text))
+
+        path = urlparse(url).path
+        if method == "POST" and path.endswith("/with-timestamps"):
+            audio, alignment = self.synthesize(text)
+            return make_response(
+                200,
+                {"audio_base64": base64.b64encode(audio).decode("ascii"), "alignment": alignment},
+                url=url,
+            )
+        if method == "POST" and path.startswith("/v1/text-to-speech/"):
+            audio, _ = self.synthesize(text)
+            return make_response(200, audio, content_type="audio/mpeg", url=url)
+        if method == "GET" and path == "/v1/voices":
+            return make_response(200, {"voices": self.voices()}, url=url)
+        if method == "GET" and path == "/v1/shared-voices":
+            return make_response(200, {"voices": self.voices(), "has_more": False}, url=url)
+        return make_response(404, {"detail": f"bench stub has no route for {method} {path}"}, url=url)
+
+    def install(self):
+        return install_http_stubs({self.host: self})
+
+
+# ------------------------------------------------------------
+# OpenAI
+# ------------------------------------------------------------
+class FakeOpenAI:
+    """
+    client.chat.completions.create and client.images.generate. Chapter
+    prompts get anchors taken from the transcript; other prompts get a short
+    two-speaker script.
+    """
+
+    def __init__(self, *, latency_ms=0, image_size=1024):
+        self.latency_ms = latency_ms
+        self.image_size = image_size
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._image_b64 = ""
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_completion))
+        self.images = SimpleNamespace(generate=self._generate_image)
+
+    def _chat_completion(self, *, model="", messages=(), **kwargs):
+        _sleep_ms(self.latency_ms)
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+        if '"chapters"' in prompt:
+            content = json.dumps({"chapters": self._chapters_for(prompt)}, ensure_ascii=False)
+        else:
+            content = bench_script(8)
+        usage = SimpleNamespace(
+            prompt_tokens=len(prompt) // 4,
+            completion_tokens=len(content) // 4,
+            total_tokens=(len(prompt) + len(content)) // 4,
+        )
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")], usage=usage)
+
+    @staticmethod
+    def _chapters_for(prompt):
+        match = re.search(r'Transcript:\s*"""(.*)"""', prompt, re.S)
+        lines = [line.split(":", 1)[-1].strip() for line in (match.group(1) if match else "").splitlines()]
+        lines = [line for line in lines if len(line.split()) >= 4]
+        if not lines:
+            return []
+        count = min(6, len(lines))
+        picks = [lines[(index * len(lines)) // count] for index in range(count)]
+        return [{"title": f"Part {index + 1}", "anchor": " ".join(line.split()[:6])} for index, line in enumerate(picks)]
+
+    def _generate_image(self, *, model="", prompt="", size="", **kwargs):
+        _sleep_ms(self.latency_ms)
+        with self._lock:
+            self.calls += 1
+            if not self._image_b64:
+                from PIL import Image
+
+                buffer = io.BytesIO()
+                Image.new("RGB", (self.image_size, self.image_size), (40, 90, 160)).save(buffer, format="PNG")
+                self._image_b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
+        return SimpleNamespace(data=[SimpleNamespace(b64_json=self._image_b64, url=None)])
+
+
+_BENCH_SENTENCES = (
+    "Welcome back to the show where we unpack one big idea at a time.",
+    "Today we are looking at how small teams ship reliable software quickly.",
+    "The first thing people notice is how much time goes into waiting on reviews.",
+    "That is fair, but the bigger cost is usually context switching between tasks.",
+    "Let us talk about what actually changed when the team started measuring it.",
+    "They found that most of the delay came from a handful of slow dependencies.",
+    "Once those were cached, the median build time dropped by more than half.",
+    "It is a good reminder to measure before optimizing anything at all.",
+)
+
+
+def bench_script(segments, speakers=("Host", "Guest")):
+    """A two-speaker script with `segments` spoken lines (and a [music] tag every 25)."""
+    lines = ["INTRO:"]
+    for index in range(segments):
+        if index and index % 25 == 0:
+            lines.append("[music]")
+        sentence = _BENCH_SENTENCES[index % len(_BENCH_SENTENCES)]
+        # The leading number keeps every line unique, so chapter anchors resolve.
+        lines.append(f"{speakers[index % len(speakers)]}: Point {index + 1}, {sentence}")
+    return "\n".join(lines)
+
+
+# ------------------------------------------------------------
+# Firestore
+# ------------------------------------------------------------
+def _firestore_transforms():
+    try:
+        from google.cloud.firestore_v1 import transforms
+
+        return transforms
+    except Exception:
+        return None
+
+
+_TRANSFORMS = _firestore_transforms()
+
+
+def _resolve_value(current, value, now):
+    t = _TRANSFORMS
+    if t is not None:
+        if value is t.SERVER_TIMESTAMP:
+            return now
+        if isinstance(value, t.Increment):
+            return (current if isinstance(current, (int, float)) else 0) + value.value
+        if isinstance(value, t.ArrayUnion):
+            merged = list(current or []) if isinstance(current, list) else []
+            merged.extend(item for item in value.values if item not in merged)
+            return merged
+        if isinstance(value, t.ArrayRemove):
+            return [item for item in (current or []) if item not in value.values] if isinstance(current, list) else []
+    if isinstance(value, dict):
+        base = current if isinstance(current, dict) else {}
+        return {key: _resolve_value(base.get(key), item, now) for key, item in value.items() if not _is_delete(item)}
+    return copy.deepcopy(value)
+
+
+def _is_delete(value):
+    return _TRANSFORMS is not None and value is _TRANSFORMS.DELETE_FIELD
+
+
+def _merge_into(target, data, now):
+    for key, value in data.items():
+        if _is_delete(value):
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_into(target[key], value, now)
+        else:
+            target[key] = _resolve_value(target.get(key), value, now)
+
+
+def _set_path(target, dotted, value, now):
+    parts = dotted.split(".")
+    for part in parts[:-1]:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            child = target[part] = {}
+        target = child
+    if _is_delete(value):
+        target.pop(parts[-1], None)
+    else:
+        target[parts[-1]] = _resolve_value(target.get(parts[-1]), value, now)
+
+
+def _get_path(data, dotted):
+    value = data
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+class MemorySnapshot:
+    def __init__(self, reference, data, update_time=None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+        self.create_time = update_time
+        self.update_time = update_time
+        self.read_time = update_time
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        return copy.deepcopy(_get_path(self._data or {}, field_path))
+
+
+class MemoryDocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self):
+        return MemoryCollectionReference(self._client, self.path.rsplit("/", 1)[0])
+
+    def collection(self, name):
+        return MemoryCollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths=None, transaction=None, **kwargs):
+        self._client._round_trip("read")
+        return self._client._snapshot(self, field_paths)
+
+    def set(self, document_data, merge=False):
+        self._client._round_trip("write")
+        self._client._write(self.path, "set_merge" if merge else "set", document_data)
+
+    def update(self, field_updates, **kwargs):
+        self._client._round_trip("write")
+        self._client._write(self.path, "update", field_updates)
+
+    def create(self, document_data):
+        self._client._round_trip("write")
+        self._client._write(self.path, "create", document_data)
+
+    def delete(self, **kwargs):
+        self._client._round_trip("write")
+        self._client._write(self.path, "delete", None)
+
+    def __eq__(self, other):
+        return isinstance(other, MemoryDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+class _Watch:
+    def unsubscribe(self):
+        pass
+
+
+class MemoryQuery:
+    _OPS = {
+        "==": lambda a, b: a == b,
+        "!=": lambda a, b: a != b,
+        "<": lambda a, b: a is not None and a < b,
+        "<=": lambda a, b: a is not None and a <= b,
+        ">": lambda a, b: a is not None and a > b,
+        ">=": lambda a, b: a is not None and a >= b,
+        "in": lambda a, b: a in b,
+        "not-in": lambda a, b: a not in b,
+        "array_contains": lambda a, b: isinstance(a, list) and b in a,
+        "array_contains_any": lambda a, b: isinstance(a, list) and any(item in a for item in b),
+    }
+
+    def __init__(self, client, collection_path="", *, group="", filters=(), orders=(), limit_count=None, offset_count=0, cursor=None, fields=None):
+        self._client = client
+        self._collection_path = collection_path
+        self._group = group
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit_count
+        self._offset = offset_count
+        self._cursor = cursor
+        self._fields = fields
+
+    def _copy(self, **changes):
+        state = {
+            "group": self._group,
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit_count": self._limit,
+            "offset_count": self._offset,
+            "cursor": self._cursor,
+            "fields": self._fields,
+        }
+        state.update(changes)
+        return MemoryQuery(self._client, self._collection_path, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in self._OPS:
+            raise ValueError(f"Unsupported operator for the in-memory Firestore: {op_string}")
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field_path, str(direction).upper().startswith("DESC")),))
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def offset(self, count):
+        return self._copy(offset_count=count)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(cursor=document_fields_or_snapshot)
+
+    def select(self, field_paths):
+        return self._copy(fields=tuple(field_paths))
+
+    def _matches(self, path):
+        parent = path.rsplit("/", 1)[0]
+        if self._group:
+            return parent.rsplit("/", 1)[-1] == self._group
+        return parent == self._collection_path
+
+    def _run(self):
+        self._client._round_trip("query")
+        rows = [(path, data) for path, data in self._client._items() if self._matches(path)]
+        for field_path, op_string, value in self._filters:
+            check = self._OPS[op_string]
+            rows = [(path, data) for path, data in rows if check(_get_path(data, field_path), value)]
+
+        orders = self._orders or ()
+        if orders:
+            for field_path, descending in reversed(orders):
+                rows.sort(key=lambda row: _sort_key(_get_path(row[1], field_path)), reverse=descending)
+        else:
+            rows.sort(key=lambda row: row[0])
+
+        if self._cursor is not None:
+            cursor_path = getattr(getattr(self._cursor, "reference", None), "path", None)
+            if cursor_path:
+                paths = [path for path, _ in rows]
+                if cursor_path in paths:
+                    rows = rows[paths.index(cursor_path) + 1:]
+
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return [self._client._snapshot(MemoryDocumentReference(self._client, path), self._fields, data=data) for path, data in rows]
+
+    def stream(self, transaction=None, **kwargs):
+        yield from self._run()
+
+    def get(self, transaction=None, **kwargs):
+        return self._run()
+
+    def on_snapshot(self, callback):
+        return _Watch()
+
+
+def _sort_key(value):
+    # Firestore orders by type first; enough here to keep mixed/None values sortable.
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, value.timestamp())
+    return (4, str(value))
+
+
+class MemoryCollectionReference(MemoryQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, document_id=None):
+        return MemoryDocumentReference(self._client, f"{self.path}/{document_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return datetime.now(timezone.utc), ref
+
+    def list_documents(self):
+        prefix = self.path + "/"
+        return [
+            MemoryDocumentReference(self._client, path)
+            for path, _ in self._client._items()
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+
+
+class MemoryWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, reference, document_data, merge=False):
+        self._ops.append((reference.path, "set_merge" if merge else "set", document_data))
+        return self
+
+    def update(self, reference, field_updates):
+        self._ops.append((reference.path, "update", field_updates))
+        return self
+
+    def delete(self, reference):
+        self._ops.append((reference.path, "delete", None))
+        return self
+
+    def commit(self):
+        self._client._round_trip("write")
+        with self._client._lock:
+            for path, kind, data in self._ops:
+                self._client._write(path, kind, data)
+        results, self._ops = self._ops, []
+        return results
+
+
+class MemoryFirestore:
+    """
+    In-memory Firestore client: db.collection(...).document(...).get/set/...,
+    where/order_by/limit/start_after/select queries, collection groups,
+    batches and get_all. Each remote call costs `latency_ms`. Transactions
+    are not emulated.
+    """
+
+    def __init__(self, *, latency_ms=0):
+        self.latency_ms = latency_ms
+        self.counts = {"read": 0, "write": 0, "query": 0}
+        self._docs = {}
+        self._updated = {}
+        self._lock = threading.RLock()
+
+    def _round_trip(self, kind):
+        with self._lock:
+            self.counts[kind] += 1
+        _sleep_ms(self.latency_ms)
+
+    def _items(self):
+        with self._lock:
+            return list(self._docs.items())
+
+    def _snapshot(self, reference, field_paths=None, data=None):
+        with self._lock:
+            if data is None:
+                data = self._docs.get(reference.path)
+            data = copy.deepcopy(data)
+            updated = self._updated.get(reference.path)
+        if data is not None and field_paths:
+            data = {field: _get_path(data, field) for field in field_paths if _get_path(data, field) is not None}
+        return MemorySnapshot(reference, data, updated)
+
+    def _write(self, path, kind, data):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            current = self._docs.get(path)
+            if kind == "delete":
+                self._docs.pop(path, None)
+                self._updated.pop(path, None)
+                return
+            if kind == "create" and current is not None:
+                raise ValueError(f"Document already exists: {path}")
+            if kind == "update":
+                if current is None:
+                    raise ValueError(f"No document to update: {path}")
+                for key, value in (data or {}).items():
+                    _set_path(current, key, value, now)
+            elif kind == "set_merge":
+                current = current if current is not None else {}
+                _merge_into(current, data or {}, now)
+            else:
+                current = _resolve_value(None, dict(data or {}), now)
+            self._docs[path] = current
+            self._updated[path] = now
+
+    def collection(self, name):
+        return MemoryCollectionReference(self, name)
+
+    def document(self, path):
+        return MemoryDocumentReference(self, path)
+
+    def collection_group(self, collection_id):
+        return MemoryQuery(self, group=collection_id)
+
+    def batch(self):
+        return MemoryWriteBatch(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self._round_trip("read")
+        for reference in references:
+            yield self._snapshot(reference, field_paths)
+
+    def transaction(self, **kwargs):
+        raise NotImplementedError("MemoryFirestore does not emulate transactions.")
+
+
+# ------------------------------------------------------------
+# S3 / R2
+# ------------------------------------------------------------
+def _client_error(code, operation):
+    try:
+        from botocore.exceptions import ClientError
+
+        return ClientError({"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": 404}}, operation)
+    except Exception:
+        error = RuntimeError(f"{operation}: {code}")
+        error.response = {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": 404}}
+        return error
+
+
+class _Body:
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+
+    def read(self, amt=None):
+        return self._buffer.read() if amt is None else self._buffer.read(amt)
+
+    def iter_chunks(self, chunk_size=1024 * 1024):
+        while True:
+            chunk = self._buffer.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        self._buffer.close()
+
+
+class _Paginator:
+    def __init__(self, s3, page_size=1000):
+        self._s3 = s3
+        self._page_size = page_size
+
+    def paginate(self, Bucket, Prefix="", **kwargs):
+        keys = sorted(key for key in self._s3._meta_for(Bucket) if key.startswith(Prefix))
+        for start in range(0, len(keys), self._page_size):
+            self._s3._round_trip()
+            yield {"Contents": [self._s3._listing(Bucket, key) for key in keys[start:start + self._page_size]]}
+
+
+class LocalS3:
+    """
+    S3 client stand-in that keeps objects as files under root_dir (a temp dir
+    by default, removed by close()), so stored audio does not count toward
+    the benchmark's memory.
+    """
+
+    def __init__(self, root_dir="", *, latency_ms=0, signing_key=b"bench"):
+        self._owns_root = not root_dir
+        self.root_dir = root_dir or tempfile.mkdtemp(prefix="wecast-bench-s3-")
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self._signing_key = signing_key
+        self._meta = {}
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._upload_ids = itertools.count(1)
+
+    def close(self):
+        if self._owns_root:
+            shutil.rmtree(self.root_dir, ignore_errors=True)
+
+    def _round_trip(self):
+        with self._lock:
+            self.requests += 1
+        _sleep_ms(self.latency_ms)
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root_dir, bucket, *key.split("/"))
+
+    def _meta_for(self, bucket):
+        with self._lock:
+            return dict(self._meta.get(bucket) or {})
+
+    def _listing(self, bucket, key):
+        meta = self._meta_for(bucket).get(key) or {}
+        return {"Key": key, "Size": meta.get("size", 0), "LastModified": meta.get("modified"), "ETag": meta.get("etag", "")}
+
+    def _store(self, bucket, key, data, content_type):
+        path = self._path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as handle:
+            handle.write(data)
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        with self._lock:
+            self._meta.setdefault(bucket, {})[key] = {
+                "size": len(data),
+                "contentType": content_type or "binary/octet-stream",
+                "etag": etag,
+                "modified": datetime.now(timezone.utc),
+            }
+        return etag
+
+    @staticmethod
+    def _read_body(body):
+        if body is None:
+            return b""
+        if isinstance(body, (bytes, bytearray)):
+            return bytes(body)
+        if isinstance(body, str):
+            return body.encode("utf-8")
+        return body.read()
+
+    def put_object(self, Bucket, Key, Body=None, ContentType="", **kwargs):
+        self._round_trip()
+        return {"ETag": self._store(Bucket, Key, self._read_body(Body), ContentType)}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None, **kwargs):
+        self.put_object(Bucket, Key, Fileobj, (ExtraArgs or {}).get("ContentType", ""))
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None, **kwargs):
+        with open(Filename, "rb") as handle:
+            self.upload_fileobj(handle, Bucket, Key, ExtraArgs)
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._round_trip()
+        meta = self._meta_for(Bucket).get(Key)
+        if meta is None:
+            raise _client_error("404", "HeadObject")
+        return {"ContentLength": meta["size"], "ContentType": meta["contentType"], "ETag": meta["etag"], "LastModified": meta["modified"]}
+
+    def get_object(self, Bucket, Key, Range="", **kwargs):
+        meta = self.head_object(Bucket, Key)
+        with open(self._path(Bucket, Key), "rb") as handle:
+            data = handle.read()
+        status = 200
+        if Range:
+            match = re.match(r"bytes=(\d+)-(\d*)", Range)
+            if match:
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else len(data) - 1
+                data = data[start:end + 1]
+                status = 206
+        return {
+            "Body": _Body(data),
+            "ContentLength": len(data),
+            "ContentType": meta["ContentType"],
+            "ETag": meta["ETag"],
+            "LastModified": meta["LastModified"],
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        }
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._round_trip()
+        with self._lock:
+            (self._meta.get(Bucket) or {}).pop(Key, None)
+        try:
+            os.remove(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        deleted = []
+        for item in Delete.get("Objects") or []:
+            with self._lock:
+                (self._meta.get(Bucket) or {}).pop(item["Key"], None)
+            try:
+                os.remove(self._path(Bucket, item["Key"]))
+            except FileNotFoundError:
+                pass
+            deleted.append({"Key": item["Key"]})
+        self._round_trip()
+        return {"Deleted": deleted, "Errors": []}
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600, **kwargs):
+        params = Params or {}
+        key = params.get("Key", "")
+        expires = int(time.time()) + int(ExpiresIn)
+        to_sign = f"{ClientMethod}\n{params.get('Bucket', '')}\n{key}\n{expires}".encode("utf-8")
+        signature = hmac.new(self._signing_key, to_sign, hashlib.sha256).hexdigest()
+        return f"http://local-s3.invalid/{params.get('Bucket', '')}/{quote(key)}?X-Amz-Expires={expires}&X-Amz-Signature={signature}"
+
+    def create_multipart_upload(self, Bucket, Key, ContentType="", **kwargs):
+        self._round_trip()
+        upload_id = f"upload-{next(self._upload_ids)}"
+        with self._lock:
+            self._uploads[upload_id] = {"bucket": Bucket, "key": Key, "contentType": ContentType, "parts": {}}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self._round_trip()
+        data = self._read_body(Body)
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        with self._lock:
+            self._uploads[UploadId]["parts"][int(PartNumber)] = (etag, data)
+        return {"ETag": etag}
+
+    def list_parts(self, Bucket, Key, UploadId, **kwargs):
+        self._round_trip()
+        with self._lock:
+            upload = self._uploads.get(UploadId)
+            if upload is None:
+                raise _client_error("NoSuchUpload", "ListParts")
+            parts = sorted(upload["parts"].items())
+        return {"Parts": [{"PartNumber": number, "ETag": etag, "Size": len(data)} for number, (etag, data) in parts]}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload=None, **kwargs):
+        with self._lock:
+            upload = self._uploads.pop(UploadId)
+        numbers = [int(part["PartNumber"]) for part in (MultipartUpload or {}).get("Parts") or []]
+        data = b"".join(upload["parts"][number][1] for number in numbers)
+        self._round_trip()
+        return {"ETag": self._store(Bucket, Key, data, upload["contentType"]), "Key": Key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        with self._lock:
+            self._uploads.pop(UploadId, None)
+        return {}
+
+    def get_paginator(self, operation_name):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(operation_name)
+        return _Paginator(self)
+
+    def list_objects_v2(self, Bucket, Prefix="", **kwargs):
+        return next(iter(self.get_paginator("list_objects_v2").paginate(Bucket=Bucket, Prefix=Prefix)), {"Contents": []})
+
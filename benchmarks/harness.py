@@ -0,0 +1,175 @@
+"""Load app.py wired to the local fakes, and seed it with realistic data."""
+import importlib
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.fakes import FakeElevenLabs, FakeOpenAI, LocalS3, MemoryFirestore, bench_script  # noqa: E402
+
+BENCH_BUCKET = "wecast-bench"
+BENCH_USER_EMAIL = "bench@wecast.test"
+BENCH_USER_UID = "bench-uid"
+
+# Set before app.py is imported: fake credentials, no background threads and
+# no Firestore listeners.
+_APP_ENV = {
+    "FLASK_SECRET_KEY": "bench-secret",
+    "ELEVENLABS_API_KEY": "bench-key",
+    "OPENAI_API_KEY": "bench-key",
+    "WECAST_WARM_CLIENTS": "0",
+    "WECAST_VOICE_CATALOG_WATCH": "0",
+    "WECAST_RECYCLE_BIN_REAPER_INTERVAL_MINUTES": "0",
+    "WECAST_SHARED_VOICE_SYNC_INTERVAL_MINUTES": "0",
+    "WECAST_USAGE_METERING": "0",
+}
+
+
+class BenchServices:
+    """The fakes behind one loaded app, with their latencies (ms)."""
+
+    def __init__(self, *, tts_ms=0, tts_ms_per_char=0.0, openai_ms=0, firestore_ms=0, s3_ms=0):
+        self.elevenlabs = FakeElevenLabs(latency_ms=tts_ms, ms_per_char=tts_ms_per_char)
+        self.openai = FakeOpenAI(latency_ms=openai_ms)
+        self.firestore = MemoryFirestore(latency_ms=firestore_ms)
+        self.s3 = LocalS3(latency_ms=s3_ms)
+        self._uninstall_http = None
+
+    def close(self):
+        if self._uninstall_http:
+            self._uninstall_http()
+        self.s3.close()
+
+
+def apply_bench_env():
+    """Fake credentials and quiet background work; call before importing app."""
+    for key, value in _APP_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+def load_app(services=None, **latencies):
+    """
+    Import app.py with every external service replaced by a fake. Returns
+    (app_module, services). Call once per process.
+    """
+    apply_bench_env()
+    services = services or BenchServices(**latencies)
+
+    wecast = importlib.import_module("app")
+    from services.storage import R2Storage
+    import wecast_core.storage
+
+    storage = R2Storage(services.s3, BENCH_BUCKET)
+    wecast.db = services.firestore
+    wecast.client = services.openai
+    wecast.r2_storage = storage
+    wecast.r2_client = services.s3
+    wecast.R2_BUCKET_NAME = BENCH_BUCKET
+    wecast.ELEVENLABS_API_KEY = os.environ["ELEVENLABS_API_KEY"]
+    wecast_core.storage._storage = storage
+    services._uninstall_http = services.elevenlabs.install()
+    return wecast, services
+
+
+def auth_headers(wecast, email=BENCH_USER_EMAIL, uid=BENCH_USER_UID):
+    return {"Authorization": f"Bearer {wecast.create_token(email, email, firebase_uid=uid)}"}
+
+
+def seed_user(db, email=BENCH_USER_EMAIL, uid=BENCH_USER_UID):
+    db.collection("users").document(uid).set({
+        "email": email,
+        "firebaseUid": uid,
+        "username": "bench",
+        "displayName": "Bench User",
+        "createdAt": datetime.now(timezone.utc),
+    })
+
+
+def timeline_for(services, script):
+    """Word timeline and transcript text for a script, as a render would produce them."""
+    from wecast_core.script import parse_script_into_segments
+    from wecast_core.timeline import build_transcript_text_with_speakers, chars_to_words
+
+    words = []
+    offset = 0.5
+    for speaker, text in parse_script_into_segments(script):
+        if not text:
+            continue
+        _, alignment = services.elevenlabs.synthesize(text)
+        for word in chars_to_words(text, alignment["character_start_times_seconds"], alignment["character_end_times_seconds"]):
+            words.append({"w": word["w"], "start": word["start"] + offset, "end": word["end"] + offset, "speaker": speaker})
+        offset += alignment["character_end_times_seconds"][-1] if alignment["character_end_times_seconds"] else 0.3
+    return words, build_transcript_text_with_speakers(words)
+
+
+def seed_episodes(services, count, *, segments=40, email=BENCH_USER_EMAIL, uid=BENCH_USER_UID, with_audio=True):
+    """
+    `count` owned podcasts with summary, transcript text, chapters, a stored
+    audio object and a transcripts/main word timeline of `segments` lines.
+    Returns their ids. The stored audio is a short clip: listing and share
+    pages only sign its URL.
+    """
+    from benchmarks.fakes import silent_mp3
+
+    db = services.firestore
+    script = bench_script(segments)
+    words, transcript_text = timeline_for(services, script)
+    audio = silent_mp3(5.0) if with_audio else b""
+    now = datetime.now(timezone.utc)
+    ids = []
+    for index in range(count):
+        podcast_id = f"bench-{index:05d}"
+        audio_key = f"episodes/{podcast_id}/output_{podcast_id}.mp3"
+        if with_audio:
+            services.s3.put_object(Bucket=BENCH_BUCKET, Key=audio_key, Body=audio, ContentType="audio/mpeg")
+        ref = db.collection("podcasts").document(podcast_id)
+        ref.set({
+            "userId": email,
+            "ownerUid": uid,
+            "title": f"Bench Episode {index + 1}",
+            "showTitle": "Bench Show",
+            "description": "A benchmark episode about shipping reliable software.",
+            "summary": transcript_text[:600],
+            "transcriptText": transcript_text,
+            "script": script,
+            "language": "en",
+            "status": "published",
+            "audioKey": audio_key if with_audio else "",
+            "chapters": [{"title": "Opening", "startSec": 0.0}],
+            "createdAt": now - timedelta(minutes=index),
+            "updatedAt": now - timedelta(minutes=index),
+        })
+        ref.collection("transcripts").document("main").set({"words": words, "updatedAt": now})
+        ids.append(podcast_id)
+    return ids
+
+
+def seed_voices(db, count):
+    genders = ("female", "male")
+    accents = ("american", "british", "arabic", "australian")
+    for index in range(count):
+        db.collection("voices").document(f"voice-{index:04d}").set({
+            "name": f"Voice {index}",
+            "provider": "elevenlabs",
+            "voiceId": f"bench-voice-{index:04d}",
+            "gender": genders[index % 2],
+            "accent": accents[index % len(accents)],
+            "language": "ar" if index % 5 == 0 else "en",
+            "previewUrl": "",
+        })
+
+
+def draft_for(script, podcast_id="bench-render"):
+    from wecast_core.script import parse_script_into_segments
+
+    speakers = list(dict.fromkeys(speaker for speaker, text in parse_script_into_segments(script) if text))
+    return {
+        "podcastId": podcast_id,
+        "speakersInfo": [
+            {"name": name, "role": "host" if index == 0 else "guest", "voiceId": f"bench-voice-{index:03d}"}
+            for index, name in enumerate(speakers)
+        ],
+    }
@@ -0,0 +1,453 @@
+"""
+Mixed-traffic load test of gunicorn configurations against the local fakes.
+
+Each configuration is started as real gunicorn processes serving
+benchmarks.wsgi, then driven by closed-loop virtual users at increasing
+concurrency. A virtual user sends its next request as soon as the last one
+answers (plus optional think time), picking library browsing, share views,
+voice previews and renders by weight. The capacity table gives, per
+configuration, the highest throughput at which every non-render route kept
+its p95 under --slo-ms with an error rate under --max-error-rate.
+
+Configurations are preset names or specs:
+  gthread:WxT           W workers x T threads (render.yaml runs gthread:1x2)
+  gevent:WxC            W gevent workers x C worker connections
+  offload:WxT+RxS       web pool gthread WxT, plus a separate gthread RxS pool
+                        that serves only /api/audio, so renders never hold a
+                        web thread (what a dedicated render service would do)
+
+    python -m benchmarks.load
+    python -m benchmarks.load --configs gthread:1x2,gthread:2x4 --concurrency 2,8,32 --duration 30
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.run import percentile  # noqa: E402
+
+PRESETS = {
+    "gthread-1x2": "gthread:1x2",
+    "gthread-1x8": "gthread:1x8",
+    "gthread-2x4": "gthread:2x4",
+    "gevent-1x64": "gevent:1x64",
+    "offload-1x4+2x1": "offload:1x4+2x1",
+}
+DEFAULT_MIX = "library=50,share=30,preview=15,render=5"
+ROUTES = ("library", "share", "preview", "render")
+
+
+def _parse_size(text):
+    workers, _, threads = text.partition("x")
+    return int(workers), int(threads or 1)
+
+
+class Pool:
+    """One gunicorn master and its workers, serving `routes` (None = every route)."""
+
+    def __init__(self, worker_class, workers, threads, routes=None):
+        self.worker_class = worker_class
+        self.workers = workers
+        self.threads = threads
+        self.routes = routes
+        self.port = 0
+        self.process = None
+        self.log_path = ""
+
+    @property
+    def label(self):
+        return f"{self.worker_class} {self.workers}x{self.threads}"
+
+    def start(self, env, log_dir):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        command = [
+            sys.executable, "-m", "gunicorn", "benchmarks.wsgi:application",
+            "--bind", f"127.0.0.1:{self.port}",
+            "--workers", str(self.workers),
+            "--worker-class", self.worker_class,
+            "--timeout", "900",
+            "--graceful-timeout", "120",
+            "--log-level", "warning",
+        ]
+        if self.worker_class == "gthread":
+            command += ["--threads", str(self.threads)]
+        elif self.worker_class == "gevent":
+            command += ["--worker-connections", str(self.threads)]
+        self.log_path = os.path.join(log_dir, f"gunicorn-{self.worker_class}-{self.port}.log")
+        log = open(self.log_path, "w", encoding="utf-8")
+        self.process = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+
+    def wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.label} exited during startup; see {self.log_path}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+                conn.request("GET", "/api/health")
+                if conn.getresponse().status == 200:
+                    conn.close()
+                    return
+                conn.close()
+            except OSError:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"{self.label} not ready after {timeout}s; see {self.log_path}")
+
+    def rss_bytes(self):
+        import psutil
+
+        try:
+            master = psutil.Process(self.process.pid)
+            processes = [master, *master.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def stop(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def parse_config(name):
+    """Preset name or spec -> (name, [Pool, ...])."""
+    spec = PRESETS.get(name, name)
+    kind, _, sizes = spec.partition(":")
+    if kind == "offload":
+        web, _, render = sizes.partition("+")
+        if not render:
+            raise ValueError(f"offload needs web+render sizes: {name}")
+        web_pool = Pool("gthread", *_parse_size(web), routes=tuple(route for route in ROUTES if route != "render"))
+        return name, [web_pool, Pool("gthread", *_parse_size(render), routes=("render",))]
+    if kind in ("gthread", "gevent", "sync"):
+        return name, [Pool(kind, *_parse_size(sizes or "1x1"))]
+    raise ValueError(f"unknown configuration: {name}")
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        route, _, weight = item.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise ValueError(f"unknown route in mix: {route}")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+def build_requests(args, token):
+    """route -> fn(rng, user_index) -> (method, path, json_body)."""
+    from benchmarks.fakes import bench_script
+    from benchmarks.harness import draft_for
+
+    script = bench_script(args.render_segments)
+    speakers_info = draft_for(script)["speakersInfo"]
+
+    def library(rng, user):
+        return "GET", "/api/episodes", None
+
+    def share(rng, user):
+        return "GET", f"/api/share/bench-{rng.randrange(args.episodes):05d}", None
+
+    def preview(rng, user):
+        # A fixed pool of (voice, text) pairs, so previews settle into the
+        # R2 cache the way repeat auditions do in production.
+        return "POST", "/api/voices/preview", {
+            "voiceId": f"bench-voice-{rng.randrange(24):03d}",
+            "text": f"Hi, this is WeCast sample {rng.randrange(args.preview_texts)}.",
+            "responseType": "url",
+        }
+
+    def render(rng, user):
+        return "POST", "/api/audio", {
+            "podcastId": f"bench-{user % args.episodes:05d}",
+            "scriptText": script,
+            "speakers_info": speakers_info,
+            "language": "en",
+        }
+
+    return {"library": library, "share": share, "preview": preview, "render": render}, {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+
+
+class _Client:
+    """Keep-alive connections for one virtual user, one per port."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._connections = {}
+
+    def request(self, port, method, path, body, headers):
+        conn = self._connections.get(port)
+        if conn is None:
+            conn = self._connections[port] = http.client.HTTPConnection("127.0.0.1", port, timeout=self.timeout)
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._connections.pop(port, None)
+            raise
+
+    def close(self):
+        for conn in self._connections.values():
+            conn.close()
+
+
+def run_level(pools, requests_by_route, headers, mix, concurrency, seconds, *, think_ms=0, seed=0, timeout=900):
+    """Drive `concurrency` virtual users for `seconds`; returns the level result."""
+    port_for = {}
+    for pool in pools:
+        for route in pool.routes or ROUTES:
+            port_for[route] = pool.port
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+    samples_lock = threading.Lock()
+    started = time.monotonic()
+    stop_at = started + seconds
+
+    def virtual_user(index):
+        rng = random.Random(seed * 10007 + index)
+        client = _Client(timeout)
+        try:
+            while time.monotonic() < stop_at:
+                route = rng.choices(names, weights)[0]
+                method, path, body = requests_by_route[route](rng, index)
+                request_started = time.perf_counter()
+                try:
+                    ok = client.request(port_for[route], method, path, body, headers) < 400
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                finished = time.monotonic()
+                with samples_lock:
+                    samples.append((route, time.perf_counter() - request_started, ok, finished))
+                if think_ms:
+                    time.sleep(rng.expovariate(1000.0 / think_ms))
+        finally:
+            client.close()
+
+    peak_rss = [0]
+    sampling = threading.Event()
+
+    def sample_rss():
+        while not sampling.wait(0.5):
+            peak_rss[0] = max(peak_rss[0], sum(pool.rss_bytes() for pool in pools))
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    users = [threading.Thread(target=virtual_user, args=(index,), daemon=True) for index in range(concurrency)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    sampling.set()
+    sampler.join()
+    peak_rss[0] = max(peak_rss[0], sum(pool.rss_bytes() for pool in pools))
+
+    # Throughput counts what finished inside the window; a render still
+    # running at the deadline counts toward latency only.
+    in_window = [sample for sample in samples if sample[3] <= stop_at]
+    routes = {}
+    for route in names:
+        latencies = [sample[1] for sample in samples if sample[0] == route]
+        if not latencies:
+            continue
+        routes[route] = {
+            "count": len(latencies),
+            "errors": sum(1 for sample in samples if sample[0] == route and not sample[2]),
+            "p50Ms": percentile(latencies, 50) * 1000,
+            "p95Ms": percentile(latencies, 95) * 1000,
+        }
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "rps": len(in_window) / seconds,
+        "errorRate": (sum(1 for sample in samples if not sample[2]) / len(samples)) if samples else 0.0,
+        "routes": routes,
+        "peakRssMb": peak_rss[0] / (1024 * 1024),
+    }
+
+
+def capacity(levels, slo_ms, max_error_rate):
+    """The best level whose non-render p95s meet the SLO, or None."""
+    passing = [
+        level for level in levels
+        if level["errorRate"] <= max_error_rate
+        and all(stats["p95Ms"] <= slo_ms for route, stats in level["routes"].items() if route != "render")
+    ]
+    return max(passing, key=lambda level: level["rps"]) if passing else None
+
+
+def _server_env(args):
+    env = dict(os.environ)
+    # render.yaml sets this for the real service; the spec flags must win here.
+    env.pop("GUNICORN_CMD_ARGS", None)
+    env.update({
+        "WECAST_BENCH_TTS_MS": str(args.tts_ms),
+        "WECAST_BENCH_TTS_MS_PER_CHAR": str(args.tts_ms_per_char),
+        "WECAST_BENCH_OPENAI_MS": str(args.openai_ms),
+        "WECAST_BENCH_FIRESTORE_MS": str(args.firestore_ms),
+        "WECAST_BENCH_S3_MS": str(args.s3_ms),
+        "WECAST_BENCH_EPISODES": str(args.episodes),
+        "WECAST_BENCH_SEGMENTS": str(args.segments),
+        "WECAST_BENCH_VOICES": str(args.voices),
+    })
+    return env
+
+
+def _bench_token():
+    from benchmarks.harness import BENCH_USER_EMAIL, BENCH_USER_UID, apply_bench_env
+
+    apply_bench_env()
+    import app as wecast
+
+    return wecast.create_token(BENCH_USER_EMAIL, BENCH_USER_EMAIL, firebase_uid=BENCH_USER_UID)
+
+
+def _print_level(name, level, routes):
+    cells = []
+    for route in routes:
+        stats = level["routes"].get(route)
+        cells.append(f"{stats['p95Ms']:>12.0f}" if stats else f"{'-':>12}")
+    print(
+        f"{name:<18} {level['concurrency']:>5} {level['rps']:>8.1f} {level['errorRate'] * 100:>6.1f} "
+        + " ".join(cells)
+        + f" {level['peakRssMb']:>8.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-traffic load test of gunicorn configurations on local fakes.")
+    parser.add_argument("--configs", default=",".join(PRESETS), help="Comma list of preset names or specs.")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma list of virtual-user counts.")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per concurrency level.")
+    parser.add_argument("--warmup", type=float, default=5, help="Unrecorded seconds before the first level.")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean think time between a user's requests.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Route weights.")
+    parser.add_argument("--slo-ms", type=float, default=1000, help="p95 target for every route except render.")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate above which a level fails.")
+    parser.add_argument("--episodes", type=int, default=50, help="Seeded episodes per worker.")
+    parser.add_argument("--segments", type=int, default=100, help="Transcript segments per seeded episode.")
+    parser.add_argument("--voices", type=int, default=100, help="Seeded voice catalog size.")
+    parser.add_argument("--render-segments", type=int, default=20, help="Script segments per render request.")
+    parser.add_argument("--preview-texts", type=int, default=20, help="Distinct preview texts (per voice).")
+    parser.add_argument("--tts-ms", type=float, default=300, help="Fake ElevenLabs latency per request.")
+    parser.add_argument("--tts-ms-per-char", type=float, default=1.0, help="Extra fake ElevenLabs latency per character.")
+    parser.add_argument("--openai-ms", type=float, default=800, help="Fake OpenAI latency per call.")
+    parser.add_argument("--firestore-ms", type=float, default=15, help="Fake Firestore latency per round trip.")
+    parser.add_argument("--s3-ms", type=float, default=25, help="Fake R2/S3 latency per request.")
+    parser.add_argument("--startup-timeout", type=float, default=180, help="Seconds to wait for /api/health.")
+    parser.add_argument("--log-dir", default="", help="Where gunicorn logs go (default: a temp dir).")
+    parser.add_argument("--json", default="", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    levels = [int(value) for value in args.concurrency.split(",") if value.strip()]
+    configs = [parse_config(name.strip()) for name in args.configs.split(",") if name.strip()]
+    log_dir = args.log_dir or tempfile.mkdtemp(prefix="wecast-load-")
+    os.makedirs(log_dir, exist_ok=True)
+
+    token = _bench_token()
+    requests_by_route, headers = build_requests(args, token)
+    env = _server_env(args)
+    routes = [route for route in ROUTES if route in mix]
+
+    results = []
+    skipped = []
+    print(
+        f"{'config':<18} {'users':>5} {'rps':>8} {'err%':>6} "
+        + " ".join(f"{route + ' p95':>12}" for route in routes)
+        + f" {'rss MB':>8}"
+    )
+    for name, pools in configs:
+        if any(pool.worker_class == "gevent" for pool in pools) and importlib.util.find_spec("gevent") is None:
+            skipped.append(f"{name}: gevent is not installed")
+            continue
+        try:
+            for pool in pools:
+                pool.start(env, log_dir)
+            for pool in pools:
+                pool.wait_ready(args.startup_timeout)
+            if args.warmup:
+                run_level(pools, requests_by_route, headers, mix, levels[0], args.warmup, think_ms=args.think_ms, seed=999)
+            config_levels = []
+            for index, concurrency in enumerate(levels):
+                level = run_level(
+                    pools, requests_by_route, headers, mix, concurrency, args.duration,
+                    think_ms=args.think_ms, seed=index,
+                )
+                config_levels.append(level)
+                _print_level(name, level, routes)
+            results.append({"config": name, "pools": [pool.label for pool in pools], "levels": config_levels})
+        except RuntimeError as exc:
+            skipped.append(f"{name}: {exc}")
+        finally:
+            for pool in pools:
+                pool.stop()
+
+    print("\nCapacity")
+    print(f"{'config':<18} {'pools':<28} {'max rps':>8} {'users':>5} {'render p95 s':>12} {'rss MB':>8}")
+    for result in results:
+        best = capacity(result["levels"], args.slo_ms, args.max_error_rate)
+        result["capacity"] = best and {"rps": best["rps"], "concurrency": best["concurrency"]}
+        pools = " + ".join(result["pools"])
+        if best is None:
+            print(f"{result['config']:<18} {pools:<28} {'none':>8}")
+            continue
+        render = best["routes"].get("render")
+        render_p95 = f"{render['p95Ms'] / 1000:>12.1f}" if render else f"{'-':>12}"
+        print(
+            f"{result['config']:<18} {pools:<28} {best['rps']:>8.1f} {best['concurrency']:>5} "
+            f"{render_p95} {best['peakRssMb']:>8.0f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"args": vars(args), "results": results, "skipped": skipped}, handle, indent=2)
+
+    print("\nSummary")
+    print("-------")
+    print(f"Configurations run: {len(results)}")
+    print(f"Skipped: {len(skipped)}")
+    for line in skipped:
+        print(f"  {line}")
+    print(f"Mix: {args.mix}; SLO p95 <= {args.slo_ms:g} ms (renders excluded), errors <= {args.max_error_rate:.0%}")
+    print(f"Gunicorn logs: {log_dir}")
+    if args.json:
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+# size -> iterations; big renders are slow enough that one sample is plenty.
+CASES = {
+    "synthesize": {"sizes": (10, 100, 1000), "unit": "segments", "iterations": {10: 5, 100: 2, 1000: 1}},
+    "chapters": {"sizes": (10, 100, 1000), "unit": "segments", "iterations": {10: 30, 100: 20, 1000: 10}},
+    "episodes": {"sizes": (10, 500), "unit": "episodes", "iterations": {10: 50, 500: 10}},
+    "voices": {"sizes": (100, 1000), "unit": "voices", "iterations": {100: 100, 1000: 50}},
+    "share": {"sizes": (10, 100, 1000), "unit": "segments", "iterations": {10: 100, 100: 50, 1000: 20}},
+}
+
+
+def _setup_synthesize(wecast, services, size):
+    from benchmarks.fakes import bench_script
+    from benchmarks.harness import draft_for
+
+    script = bench_script(size)
+    draft = draft_for(script)
+
+    def run():
+        ok, result = wecast.synthesize_audio_from_script(script, "bench-render", draft=draft)
+        if not ok:
+            raise RuntimeError(result)
+
+    return run
+
+
+def _setup_chapters(wecast, services, size):
+    from benchmarks.fakes import bench_script
+    from benchmarks.harness import timeline_for
+
+    words, transcript_text = timeline_for(services, bench_script(size))
+
+    def run():
+        if not wecast.build_chapters(words, transcript_text, language="en"):
+            raise RuntimeError("no chapters")
+
+    return run
+
+
+def _client_get(wecast, path, headers=None):
+    test_client = wecast.app.test_client()
+
+    def run():
+        response = test_client.get(path, headers=headers or {})
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        response.get_data()
+
+    return run
+
+
+def _setup_episodes(wecast, services, size):
+    from benchmarks.harness import auth_headers, seed_episodes, seed_user
+
+    seed_user(services.firestore)
+    seed_episodes(services, size)
+    return _client_get(wecast, "/api/episodes", auth_headers(wecast))
+
+
+def _setup_voices(wecast, services, size):
+    from benchmarks.harness import seed_voices
+
+    seed_voices(services.firestore, size)
+    return _client_get(wecast, "/api/voices")
+
+
+def _setup_share(wecast, services, size):
+    from benchmarks.harness import seed_episodes
+
+    podcast_id = seed_episodes(services, 1, segments=size)[0]
+    return _client_get(wecast, f"/api/share/{podcast_id}")
+
+
+_SETUP = {
+    "synthesize": _setup_synthesize,
+    "chapters": _setup_chapters,
+    "episodes": _setup_episodes,
+    "voices": _setup_voices,
+    "share": _setup_share,
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb():
+    """(this process, largest child) peak resident set size in MB."""
+    try:
+        import resource
+
+        # ru_maxrss is bytes on macOS, kilobytes on Linux.
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor
+        return own, children
+    except ImportError:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024), 0.0
+
+
+def _service_counts(services):
+    return {
+        "ttsRequests": services.elevenlabs.requests,
+        "ttsChars": services.elevenlabs.characters,
+        "openaiCalls": services.openai.calls,
+        "firestoreOps": sum(services.firestore.counts.values()),
+        "s3Requests": services.s3.requests,
+    }
+
+
+def run_case(case, size, iterations, warmup, latencies):
+    """Run one case in this process and return its result dict."""
+    from benchmarks.harness import load_app
+
+    wecast, services = load_app(**latencies)
+    try:
+        operation = _SETUP[case](wecast, services, size)
+        for _ in range(warmup):
+            operation()
+        before = _service_counts(services)
+        samples = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            op_started = time.perf_counter()
+            operation()
+            samples.append(time.perf_counter() - op_started)
+        total = time.perf_counter() - started
+        after = _service_counts(services)
+    finally:
+        services.close()
+
+    own_rss, child_rss = peak_rss_mb()
+    return {
+        "case": case,
+        "size": size,
+        "iterations": iterations,
+        "seconds": total,
+        "throughput": iterations / total if total else 0.0,
+        "p50Ms": percentile(samples, 50) * 1000,
+        "p95Ms": percentile(samples, 95) * 1000,
+        "p99Ms": percentile(samples, 99) * 1000,
+        "maxMs": max(samples) * 1000,
+        "peakRssMb": own_rss,
+        "childPeakRssMb": child_rss,
+        "perOp": {key: (after[key] - before[key]) / iterations for key in after},
+    }
+
+
+def _latency_args(args):
+    return [
+        "--tts-ms", str(args.tts_ms),
+        "--tts-ms-per-char", str(args.tts_ms_per_char),
+        "--openai-ms", str(args.openai_ms),
+        "--firestore-ms", str(args.firestore_ms),
+        "--s3-ms", str(args.s3_ms),
+    ]
+
+
+def _run_child(case, size, iterations, args):
+    # A fresh interpreter per case, so peak RSS belongs to that case alone.
+    command = [
+        sys.executable, "-m", "benchmarks.run",
+        "--child", case, str(size),
+        "--iterations", str(iterations),
+        "--warmup", str(args.warmup),
+        *_latency_args(args),
+    ]
+    proc = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"{case}/{size} failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks of render, chapters, library, voices and share paths against local fakes."
+    )
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Comma list of cases ({', '.join(CASES)}).")
+    parser.add_argument("--sizes", default="", help="Comma list of sizes to run instead of each case's defaults.")
+    parser.add_argument("--iterations", type=int, default=0, help="Timed iterations per case (default: per size).")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed iterations before measuring.")
+    parser.add_argument("--tts-ms", type=float, default=0, help="Fake ElevenLabs latency per request.")
+    parser.add_argument("--tts-ms-per-char", type=float, default=0, help="Extra fake ElevenLabs latency per character.")
+    parser.add_argument("--openai-ms", type=float, default=0, help="Fake OpenAI latency per call.")
+    parser.add_argument("--firestore-ms", type=float, default=0, help="Fake Firestore latency per round trip.")
+    parser.add_argument("--s3-ms", type=float, default=0, help="Fake R2/S3 latency per request.")
+    parser.add_argument("--json", default="", help="Also write the results to this file.")
+    parser.add_argument("--child", nargs=2, metavar=("CASE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    latencies = {
+        "tts_ms": args.tts_ms,
+        "tts_ms_per_char": args.tts_ms_per_char,
+        "openai_ms": args.openai_ms,
+        "firestore_ms": args.firestore_ms,
+        "s3_ms": args.s3_ms,
+    }
+    if args.child:
+        case, size = args.child[0], int(args.child[1])
+        result = run_case(case, size, args.iterations, args.warmup, latencies)
+        print("RESULT " + json.dumps(result))
+        return
+
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    only_sizes = {int(size) for size in args.sizes.split(",") if size.strip()}
+
+    results = []
+    failures = []
+    print(f"{'case':<11} {'size':>6} {'iters':>5} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MB':>7}  per op")
+    for case in cases:
+        spec = CASES[case]
+        for size in spec["sizes"]:
+            if only_sizes and size not in only_sizes:
+                continue
+            iterations = args.iterations or spec["iterations"][size]
+            try:
+                result = _run_child(case, size, iterations, args)
+            except RuntimeError as exc:
+                failures.append(str(exc))
+                print(f"{case:<11} {size:>6}  FAILED")
+                continue
+            results.append(result)
+            per_op = ", ".join(f"{key}={value:g}" for key, value in result["perOp"].items() if value)
+            print(
+                f"{case:<11} {size:>6} {iterations:>5} {result['throughput']:>9.2f} {result['p50Ms']:>9.1f} "
+                f"{result['p95Ms']:>9.1f} {result['p99Ms']:>9.1f} {result['peakRssMb']:>7.0f}  {per_op}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"latenciesMs": latencies, "results": results}, handle, indent=2)
+
+    for failure in failures:
+        print(f"\n{failure}")
+
+    print("\nSummary")
+    print("-------")
+    print(f"Cases run: {len(results)}")
+    print(f"Failed: {len(failures)}")
+    print("Fake latencies (ms): " + ", ".join(f"{key}={value:g}" for key, value in latencies.items()))
+    if args.json:
+        print(f"Results written to {args.json}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+gunicorn "benchmarks.wsgi:application": app.py on the local fakes, seeded
+with a bench user, voices and episodes. Each worker builds its own copy of
+the same data, so any worker can answer any request.
+
+WECAST_BENCH_TTS_MS, WECAST_BENCH_TTS_MS_PER_CHAR, WECAST_BENCH_OPENAI_MS,
+WECAST_BENCH_FIRESTORE_MS and WECAST_BENCH_S3_MS set the fake latencies;
+WECAST_BENCH_EPISODES, WECAST_BENCH_SEGMENTS and WECAST_BENCH_VOICES the data.
+"""
+import os
+
+from benchmarks.harness import load_app, seed_episodes, seed_user, seed_voices
+
+wecast, services = load_app(
+    tts_ms=float(os.getenv("WECAST_BENCH_TTS_MS") or 0),
+    tts_ms_per_char=float(os.getenv("WECAST_BENCH_TTS_MS_PER_CHAR") or 0),
+    openai_ms=float(os.getenv("WECAST_BENCH_OPENAI_MS") or 0),
+    firestore_ms=float(os.getenv("WECAST_BENCH_FIRESTORE_MS") or 0),
+    s3_ms=float(os.getenv("WECAST_BENCH_S3_MS") or 0),
+)
+seed_user(services.firestore)
+seed_voices(services.firestore, int(os.getenv("WECAST_BENCH_VOICES") or 100))
+seed_episodes(
+    services,
+    int(os.getenv("WECAST_BENCH_EPISODES") or 50),
+    segments=int(os.getenv("WECAST_BENCH_SEGMENTS") or 100),
+)
+
+application = wecast.create_app()
@@ -2,13 +2,20 @@ import argparse
 import os
 import sys
 
+from dotenv import load_dotenv
+
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
 from firebase_init import db
 from firebase_admin import firestore
-from app import build_chapters, build_transcript_text_with_speakers, is_arabic
+from openai import OpenAI
+from wecast_core.chapters import build_chapters
+from wecast_core.script import is_arabic
+from wecast_core.timeline import build_transcript_text_with_speakers
 
 
 def main():
@@ -19,6 +26,7 @@ def main():
     parser.add_argument("--apply", action="store_true", help="Actually write chapter updates.")
     args = parser.parse_args()
 
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     ready = 0
     updated = 0
     skipped = 0
@@ -53,7 +61,7 @@ def main():
         if language not in ("en", "ar"):
             language = "ar" if is_arabic(transcript_text) else "en"
 
-        chapters = build_chapters(words, transcript_text, language=language)
+        chapters = build_chapters(words, transcript_text, language=language, client=client)
         if not isinstance(chapters, list) or not chapters:
             print(f"FAILED {doc.id} {data.get('title') or 'Untitled'}")
             continue
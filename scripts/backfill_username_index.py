@@ -0,0 +1,164 @@
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from firebase_init import db
+from firebase_admin import firestore
+from services.firestore_writes import FirestoreUnitOfWork
+from services.usernames import username_reservation_problem
+
+USERNAME_RESERVATIONS_COLLECTION = "username_reservations"
+PAGE_SIZE = 200
+
+
+def _normalize(value):
+    return (value or "").strip().lower()
+
+
+def _is_deleted(data):
+    return bool(
+        data.get("deleted") is True
+        or _normalize(data.get("accountStatus")) == "deleted"
+        or data.get("deletedAt")
+    )
+
+
+def _username_fields(data):
+    """Return (display username, username_lower) the login path should resolve for this user."""
+    display = (
+        data.get("username")
+        or data.get("displayName")
+        or data.get("name")
+        or ""
+    ).strip()
+    return display, _normalize(data.get("username_lower") or display)
+
+
+def _iter_user_pages(page_size):
+    query = db.collection("users").order_by("__name__").limit(page_size)
+    cursor = None
+    while True:
+        page = list((query.start_after(cursor) if cursor else query).stream())
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        cursor = page[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Materialize username_lower / loginNames_lower and username reservations "
+            "for legacy users so username login never scans the users collection."
+        )
+    )
+    parser.add_argument("--only-id", help="Backfill only one user document id.")
+    parser.add_argument("--apply", action="store_true", help="Actually write index fields and reservations.")
+    args = parser.parse_args()
+
+    updated_users = 0
+    created_reservations = 0
+    conflicts = 0
+    invalid = 0
+    skipped = 0
+    uow = FirestoreUnitOfWork(db)
+
+    for page in _iter_user_pages(PAGE_SIZE):
+        candidates = []
+        for doc in page:
+            if args.only_id and doc.id != args.only_id:
+                continue
+            data = doc.to_dict() or {}
+            if _is_deleted(data):
+                skipped += 1
+                continue
+            candidates.append((doc, data))
+
+        reservation_refs = {}
+        for doc, data in candidates:
+            _, username_lower = _username_fields(data)
+            eligible = bool(data.get("password_hash") or data.get("username") or data.get("username_lower"))
+            if not (username_lower and eligible):
+                continue
+            # Same rules as the app's signup/profile flows, so no reservation
+            # is created that the app itself would reject.
+            problem = username_reservation_problem(username_lower)
+            if problem:
+                invalid += 1
+                print(f"INVALID {doc.reference.path} {username_lower!r}: {problem}")
+                continue
+            reservation_refs[doc.reference.path] = (
+                db.collection(USERNAME_RESERVATIONS_COLLECTION).document(username_lower)
+            )
+        existing_reservations = {}
+        if reservation_refs:
+            for snap in db.get_all(list({ref.path: ref for ref in reservation_refs.values()}.values())):
+                existing_reservations[snap.reference.path] = snap
+
+        claimed_in_page = {}
+        for doc, data in candidates:
+            updates = {}
+            login_names = sorted({_normalize(data.get(field)) for field in ("name", "displayName")} - {""})
+            if login_names and data.get("loginNames_lower") != login_names:
+                updates["loginNames_lower"] = login_names
+            if data.get("username") and not data.get("username_lower"):
+                updates["username_lower"] = _normalize(data.get("username"))
+
+            if updates:
+                updated_users += 1
+                print(f"INDEX {doc.id} {updates}")
+                uow.set(doc.reference, updates, merge=True)
+
+            reservation_ref = reservation_refs.get(doc.reference.path)
+            if reservation_ref is None:
+                continue
+            snapshot = existing_reservations.get(reservation_ref.path)
+            owner_path = ""
+            if snapshot is not None and snapshot.exists:
+                owner_path = ((snapshot.to_dict() or {}).get("userRef") or "").strip()
+            owner_path = owner_path or claimed_in_page.get(reservation_ref.path, "")
+            if owner_path:
+                if owner_path != doc.reference.path:
+                    conflicts += 1
+                    print(f"CONFLICT {reservation_ref.id} reserved by {owner_path}, also used by {doc.reference.path}")
+                continue
+
+            display, username_lower = _username_fields(data)
+            claimed_in_page[reservation_ref.path] = doc.reference.path
+            created_reservations += 1
+            print(f"RESERVE {username_lower} -> {doc.reference.path}")
+            uow.set(reservation_ref, {
+                "username": display,
+                "username_lower": username_lower,
+                "email": _normalize(data.get("email")),
+                "firebaseUid": (data.get("firebaseUid") or "").strip(),
+                "userRef": doc.reference.path,
+                "updatedAt": firestore.SERVER_TIMESTAMP,
+            }, merge=True)
+
+        if args.apply:
+            uow.commit()
+        else:
+            uow.discard()
+
+    print("\nSummary")
+    print("-------")
+    print(f"Users indexed: {updated_users}")
+    print(f"Reservations created: {created_reservations}")
+    print(f"Conflicts (left for manual review): {conflicts}")
+    print(f"Invalid usernames (not reserved, left for manual review): {invalid}")
+    print(f"Skipped deleted users: {skipped}")
+    if not args.apply:
+        print("Dry run only. Re-run with --apply to perform the backfill.")
+    else:
+        print("Once applied, leave WECAST_USERNAME_LEGACY_SCAN unset so logins never scan users.")
+
+
+if __name__ == "__main__":
+    main()
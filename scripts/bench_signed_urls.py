@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from services.signed_url_cache import SignedUrlCache
+from services.storage import build_r2_client
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure presign cost per list request with and without the signed URL cache."
+    )
+    parser.add_argument("--items", type=int, default=50, help="Episodes per list request (audio + cover each).")
+    parser.add_argument("--requests", type=int, default=200, help="List requests to simulate.")
+    args = parser.parse_args()
+
+    # Presigning never touches the network, so placeholder credentials are enough.
+    client = build_r2_client("bench", "bench-access-key", "bench-secret-key")
+
+    def sign(key, expires_in):
+        return client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": "bench", "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    keys = []
+    for i in range(args.items):
+        keys.append(f"podcasts/episode-{i}/audio.mp3")
+        keys.append(f"covers/episode-{i}/20250101000000.png")
+
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        for key in keys:
+            sign(key, 3600)
+    uncached = time.perf_counter() - started
+
+    cache = SignedUrlCache(sign, max_entries=len(keys) * 2)
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        cache.get_many(keys, expires_in=3600)
+    cached = time.perf_counter() - started
+
+    per_request_before = uncached / args.requests * 1000
+    per_request_after = cached / args.requests * 1000
+
+    print("\nSummary")
+    print("-------")
+    print(f"URLs per request: {len(keys)}")
+    print(f"Requests: {args.requests}")
+    print(f"Presign per request (no cache): {per_request_before:.3f} ms")
+    print(f"Presign per request (cache):    {per_request_after:.3f} ms")
+    print(f"Cache hits / misses: {cache.hits} / {cache.misses}")
+    if per_request_after:
+        print(f"Speedup: {per_request_before / per_request_after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter each time so every sample is a true cold start.
+PROBE = r"""
+import time
+t0 = time.perf_counter()
+import app as wecast
+t1 = time.perf_counter()
+flask_app = wecast.create_app()
+resp = flask_app.test_client().get("/api/health")
+t2 = time.perf_counter()
+assert resp.status_code == 200, resp.status_code
+print(f"RESULT import={t1 - t0:.6f} health={t2 - t0:.6f}")
+"""
+
+
+def _run_probe(env):
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    match = re.search(r"RESULT import=([\d.]+) health=([\d.]+)", proc.stdout)
+    if proc.returncode != 0 or not match:
+        raise RuntimeError(f"probe failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+    return float(match.group(1)), float(match.group(2))
+
+
+def _top_imports(env, limit):
+    """Slowest modules by cumulative import time (python -X importtime)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    # Only top-level-ish entries, otherwise parents and children double count.
+    rows = [row for row in rows if row[1] <= 2]
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure cold import time of app.py and time to the first /api/health response."
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to sample.")
+    parser.add_argument("--top", type=int, default=15, help="Show the N slowest imports.")
+    parser.add_argument(
+        "--no-warm",
+        action="store_true",
+        help="Set WECAST_WARM_CLIENTS=0 so background client warm-up doesn't compete with the probe.",
+    )
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.no_warm:
+        env["WECAST_WARM_CLIENTS"] = "0"
+
+    imports = []
+    health = []
+    for _ in range(max(1, args.runs)):
+        import_s, health_s = _run_probe(env)
+        imports.append(import_s)
+        health.append(health_s)
+
+    print("Slowest imports (cumulative ms)")
+    print("-------------------------------")
+    for cumulative_us, _, module in _top_imports(env, args.top):
+        print(f"{cumulative_us / 1000:8.1f}  {module}")
+
+    print("\nSummary")
+    print("-------")
+    print(f"Runs: {len(imports)}")
+    print(f"Import app (median / max): {statistics.median(imports) * 1000:.0f} ms / {max(imports) * 1000:.0f} ms")
+    print(f"First /api/health (median / max): {statistics.median(health) * 1000:.0f} ms / {max(health) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+from firebase_init import db
+from services.r2_gc import DEFAULT_GRACE_HOURS, GC_PREFIXES, collect_garbage
+from services.storage import storage_from_env
+
+
+def _format_bytes(value):
+    size = float(value or 0)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Delete R2 objects under episodes/, covers/ and avatars/ that no Firestore document references."
+    )
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        help=f"Bucket prefix to scan (repeatable). Defaults to {', '.join(GC_PREFIXES)}.",
+    )
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=DEFAULT_GRACE_HOURS,
+        help="Never delete objects modified more recently than this.",
+    )
+    parser.add_argument("--max-delete", type=int, help="Stop after this many orphans in one run.")
+    parser.add_argument("--apply", action="store_true", help="Actually delete orphaned objects.")
+    args = parser.parse_args()
+
+    storage = storage_from_env()
+    stats = collect_garbage(
+        db,
+        storage,
+        prefixes=tuple(args.prefix or GC_PREFIXES),
+        grace_hours=args.grace_hours,
+        dry_run=not args.apply,
+        max_delete=args.max_delete,
+    )
+
+    print("\nSummary")
+    print("-------")
+    print(f"Referenced keys: {stats['referenced']}")
+    print(f"Objects scanned: {stats['scanned']}")
+    print(f"Orphans: {stats['orphans']} ({_format_bytes(stats['orphanBytes'])})")
+    print(f"Orphans inside grace period (kept): {stats['recentOrphans']}")
+    if args.apply:
+        print(f"Deleted: {stats['deleted']}")
+        print(f"Bytes reclaimed: {stats['deletedBytes']} ({_format_bytes(stats['deletedBytes'])})")
+        if stats["failedKeys"]:
+            print(f"Failed to delete: {len(stats['failedKeys'])}")
+    else:
+        print("Dry run only. Re-run with --apply to delete the orphans.")
+
+
+if __name__ == "__main__":
+    main()
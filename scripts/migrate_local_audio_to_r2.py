@@ -1,17 +1,20 @@
 import argparse
 import os
 import re
+import sys
 from datetime import datetime, timezone
-from urllib.parse import quote
 
-import boto3
 import firebase_admin
-from botocore.client import Config
 from dotenv import load_dotenv
 from firebase_admin import credentials, firestore
 
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from services.storage import storage_from_env
+
 SERVICE_ACCOUNT_PATH = os.path.join(ROOT_DIR, "config", "service_account.json")
 STATIC_DIR = os.path.join(ROOT_DIR, "static")
 
@@ -24,41 +27,6 @@ def load_firestore():
     return firestore.client()
 
 
-def build_r2_client():
-    account_id = (os.getenv("R2_ACCOUNT_ID") or "").strip()
-    access_key = (os.getenv("R2_ACCESS_KEY_ID") or "").strip()
-    secret_key = (os.getenv("R2_SECRET_ACCESS_KEY") or "").strip()
-    bucket_name = (os.getenv("R2_BUCKET_NAME") or "").strip()
-    public_base_url = (os.getenv("R2_PUBLIC_BASE_URL") or "").strip().rstrip("/")
-
-    if not all([account_id, access_key, secret_key, bucket_name]):
-        raise RuntimeError("Missing R2 environment variables.")
-
-    endpoint = f"https://{account_id}.r2.cloudflarestorage.com"
-    client = boto3.client(
-        "s3",
-        endpoint_url=endpoint,
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        config=Config(signature_version="s3v4"),
-        region_name="auto",
-    )
-    return client, bucket_name, public_base_url
-
-
-def build_r2_asset_url(client, bucket_name: str, public_base_url: str, object_key: str):
-    normalized_key = str(object_key or "").strip().lstrip("/")
-    if not normalized_key:
-        return ""
-    if public_base_url:
-        return f"{public_base_url}/{quote(normalized_key, safe='/')}"
-    return client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": bucket_name, "Key": normalized_key},
-        ExpiresIn=3600,
-    )
-
-
 def local_audio_path(doc_id: str, audio_url: str) -> str:
     preferred = os.path.join(STATIC_DIR, f"output_{doc_id}.mp3")
     if os.path.exists(preferred):
@@ -84,18 +52,11 @@ def looks_like_local_audio(audio_url: str) -> bool:
     )
 
 
-def upload_audio(client, bucket_name: str, public_base_url: str, file_path: str, doc_id: str):
-    with open(file_path, "rb") as fh:
-        audio_bytes = fh.read()
-
+def upload_audio(storage, file_path: str, doc_id: str):
     object_key = f"episodes/{doc_id}/output_{doc_id}.mp3"
-    client.put_object(
-        Bucket=bucket_name,
-        Key=object_key,
-        Body=audio_bytes,
-        ContentType="audio/mpeg",
-    )
-    return object_key, build_r2_asset_url(client, bucket_name, public_base_url, object_key)
+    # Streams from disk; large files go multipart with parallel parts.
+    storage.upload_file(file_path, object_key, "audio/mpeg")
+    return object_key, storage.asset_url(object_key)
 
 
 def main():
@@ -107,7 +68,7 @@ def main():
     args = parser.parse_args()
 
     db = load_firestore()
-    r2_client, bucket_name, public_base_url = build_r2_client()
+    storage = storage_from_env()
 
     migrated = 0
     missing_local = 0
@@ -137,13 +98,7 @@ def main():
         if not args.apply:
             continue
 
-        object_key, migrated_url = upload_audio(
-            r2_client,
-            bucket_name,
-            public_base_url,
-            file_path,
-            doc.id,
-        )
+        object_key, migrated_url = upload_audio(storage, file_path, doc.id)
 
         doc.reference.set(
             {
@@ -159,7 +114,7 @@ def main():
             merge=True,
         )
         migrated += 1
-        print(f"MIGRATED {doc.id} -> {bucket_name}/{object_key}")
+        print(f"MIGRATED {doc.id} -> {storage.bucket_name}/{object_key}")
 
     print("\nSummary")
     print("-------")
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+from firebase_init import db
+from services.storage import storage_from_env
+from services.recycle_bin_reaper import DEFAULT_REAPER_PAGE_SIZE, reap_recycle_bin
+
+
+def _format_bytes(value):
+    size = float(value or 0)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Permanently purge recycle-bin episodes older than RECYCLE_BIN_RETENTION_DAYS."
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=int(os.getenv("RECYCLE_BIN_RETENTION_DAYS", "30")),
+        help="Days a trashed episode is kept (defaults to RECYCLE_BIN_RETENTION_DAYS).",
+    )
+    parser.add_argument("--page-size", type=int, default=DEFAULT_REAPER_PAGE_SIZE, help="Episodes per page (max 500).")
+    parser.add_argument("--max-pages", type=int, help="Stop after this many pages in this run.")
+    parser.add_argument("--max-episodes", type=int, help="Stop after this many episodes in total.")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds to sleep between pages (rate limit).")
+    parser.add_argument(
+        "--checkpoint",
+        default=os.path.join(ROOT_DIR, ".recycle_bin_reaper.json"),
+        help="Checkpoint file used to resume an interrupted run. Pass an empty string to disable.",
+    )
+    parser.add_argument("--skip-bytes", action="store_true", help="Skip HEAD requests used to report bytes reclaimed.")
+    parser.add_argument("--apply", action="store_true", help="Actually delete episodes and R2 assets.")
+    args = parser.parse_args()
+
+    storage = storage_from_env() if args.apply else None
+
+    totals = reap_recycle_bin(
+        db,
+        retention_days=args.retention_days,
+        r2_client=storage.client if storage else None,
+        bucket_name=storage.bucket_name if storage else "",
+        page_size=args.page_size,
+        max_pages=args.max_pages,
+        max_episodes=args.max_episodes,
+        pause_seconds=args.pause,
+        dry_run=not args.apply,
+        checkpoint_path=args.checkpoint,
+        measure_bytes=not args.skip_bytes,
+    )
+
+    print("\nSummary")
+    print("-------")
+    print(f"Cutoff: {totals['cutoff']}")
+    print(f"Pages: {totals['pages']}")
+    print(f"Expired episodes: {totals['episodes']}")
+    print(f"Documents deleted: {totals['documents']}")
+    print(f"R2 objects deleted: {totals['objects']}")
+    print(f"Bytes reclaimed: {totals['bytes']} ({_format_bytes(totals['bytes'])})")
+    if totals["failedObjectKeys"]:
+        print(f"R2 objects that failed to delete: {len(totals['failedObjectKeys'])}")
+    if not totals.get("finished"):
+        print("Stopped before the recycle bin was drained; re-run to continue from the checkpoint.")
+    if not args.apply:
+        print("Dry run only. Re-run with --apply to perform the purge.")
+
+
+if __name__ == "__main__":
+    main()
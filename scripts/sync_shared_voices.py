@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+from services.shared_voice_library import SharedVoiceIndex, fetch_shared_voice_library, save_mirror
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mirror the ElevenLabs shared voice library into the local file served by /api/voices/elevenlabs."
+    )
+    parser.add_argument(
+        "--path",
+        default=os.getenv("WECAST_SHARED_VOICE_MIRROR_PATH") or os.path.join(ROOT_DIR, ".shared_voices.json"),
+        help="Mirror file (defaults to WECAST_SHARED_VOICE_MIRROR_PATH).",
+    )
+    parser.add_argument("--max-pages", type=int, help="Stop after this many 100-voice pages.")
+    parser.add_argument("--pause", type=float, default=0.2, help="Seconds to sleep between pages (rate limit).")
+    parser.add_argument("--apply", action="store_true", help="Actually write the mirror file.")
+    args = parser.parse_args()
+
+    api_key = (os.getenv("ELEVENLABS_API_KEY") or "").strip()
+    if not api_key:
+        raise RuntimeError("Missing ELEVENLABS_API_KEY.")
+
+    voices = fetch_shared_voice_library(
+        {"xi-api-key": api_key},
+        max_pages=args.max_pages,
+        pause_seconds=args.pause,
+    )
+    index = SharedVoiceIndex(voices)
+    facets = index.facets()
+
+    synced_at = ""
+    if args.apply and voices:
+        synced_at = save_mirror(args.path, voices)
+
+    print("\nSummary")
+    print("-------")
+    print(f"Voices fetched: {len(voices)}")
+    for field in ("language", "locale", "accent", "age", "use_case", "category"):
+        print(f"Distinct {field} values: {len(facets.get(field, {}))}")
+    if synced_at:
+        print(f"Mirror written to {args.path} at {synced_at}")
+    elif args.apply:
+        print("Nothing fetched; existing mirror left untouched.")
+    else:
+        print("Dry run only. Re-run with --apply to write the mirror.")
+
+
+if __name__ == "__main__":
+    main()
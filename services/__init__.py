@@ -1,27 +1,28 @@
-from .email_service import (
-    send_confirm_new_email,
-    send_email_change_requested,
-    send_email_changed_success,
-    send_password_changed_email,
-    send_password_reset_email,
-    send_verification_email,
-    validate_email_environment,
-)
-from .firebase_action_links import (
-    generate_email_verification_link,
-    generate_password_reset_link,
-    public_app_url,
-)
+# Re-exports are resolved on first access (PEP 562) so importing any
+# services.* module doesn't drag in the email stack (smtplib, requests,
+# email templates).
+_EXPORTS = {
+    "generate_email_verification_link": "firebase_action_links",
+    "generate_password_reset_link": "firebase_action_links",
+    "public_app_url": "firebase_action_links",
+    "send_confirm_new_email": "email_service",
+    "send_email_change_requested": "email_service",
+    "send_email_changed_success": "email_service",
+    "send_password_changed_email": "email_service",
+    "send_password_reset_email": "email_service",
+    "send_verification_email": "email_service",
+    "validate_email_environment": "email_service",
+}
 
-__all__ = [
-    "generate_email_verification_link",
-    "generate_password_reset_link",
-    "public_app_url",
-    "send_confirm_new_email",
-    "send_email_change_requested",
-    "send_email_changed_success",
-    "send_password_changed_email",
-    "send_password_reset_email",
-    "send_verification_email",
-    "validate_email_environment",
-]
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if not module_name:
+        raise AttributeError(f"module 'services' has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
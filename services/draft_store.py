@@ -0,0 +1,114 @@
+from firebase_admin import firestore
+
+
+DRAFT_SCHEMA_VERSION = 1
+# Fields a render needs; everything else in the doc is bookkeeping.
+DRAFT_FIELDS = (
+    "podcastId",
+    "ownerId",
+    "scriptStyle",
+    "speakersCount",
+    "speakersInfo",
+    "description",
+    "script",
+    "showTitle",
+    "title",
+    "language",
+    "guestMode",
+    "introMusic",
+    "bodyMusic",
+    "outroMusic",
+    "coverArtMeta",
+    "lastAudioUrl",
+    "lastAudioKey",
+)
+
+
+class DraftConflict(Exception):
+    def __init__(self, podcast_id, expected, actual):
+        super().__init__(f"Draft for {podcast_id} is at version {actual}, expected {expected}")
+        self.podcast_id = podcast_id
+        self.expected = expected
+        self.actual = actual
+
+
+class DraftStore:
+    """
+    Create-flow/render state for one podcast, stored next to its edit draft at
+    podcasts/{id}/edits/render (so podcast purges already remove it).
+
+    Every write bumps `version`, so a reader can tell whether the draft moved
+    under it and a writer can pass expected_version for compare-and-set.
+    Renders read the draft by podcast id, with no Flask session involved.
+    """
+
+    def __init__(self, db, doc_id="render"):
+        self._db = db
+        self._doc_id = doc_id
+
+    def ref(self, podcast_id):
+        return self._db.collection("podcasts").document(podcast_id).collection("edits").document(self._doc_id)
+
+    def get(self, podcast_id):
+        """The draft as a dict (with `version`), or {} when there is none."""
+        if not podcast_id:
+            return {}
+        snap = self.ref(podcast_id).get()
+        if not snap.exists:
+            return {}
+        data = snap.to_dict() or {}
+        data.setdefault("podcastId", podcast_id)
+        data.setdefault("version", 0)
+        return data
+
+    def _payload(self, podcast_id, updates):
+        payload = {key: value for key, value in (updates or {}).items() if key in DRAFT_FIELDS}
+        payload["podcastId"] = podcast_id
+        payload["schemaVersion"] = DRAFT_SCHEMA_VERSION
+        payload["updatedAt"] = firestore.SERVER_TIMESTAMP
+        return payload
+
+    def replace(self, podcast_id, data):
+        """Start a fresh draft (e.g. a new script was generated); keeps the version counter rising."""
+        payload = self._payload(podcast_id, data)
+        payload["version"] = firestore.Increment(1)
+        payload["createdAt"] = firestore.SERVER_TIMESTAMP
+        # merge=True only to keep `version` monotonic; drop stale fields explicitly.
+        for field in DRAFT_FIELDS:
+            payload.setdefault(field, firestore.DELETE_FIELD)
+        self.ref(podcast_id).set(payload, merge=True)
+
+    def update(self, podcast_id, updates, *, expected_version=None, uow=None):
+        """
+        Merge updates into the draft. Without expected_version this is a single
+        blind write (queued on `uow` when given, so it commits with the
+        caller's other writes); with it, a transaction raises DraftConflict
+        when someone else wrote first. Returns the new version when it is
+        known, else None.
+        """
+        payload = self._payload(podcast_id, updates)
+        ref = self.ref(podcast_id)
+        if expected_version is None:
+            payload["version"] = firestore.Increment(1)
+            if uow is not None:
+                uow.set(ref, payload, merge=True)
+            else:
+                ref.set(payload, merge=True)
+            return None
+
+        transaction = self._db.transaction()
+
+        @firestore.transactional
+        def commit(transaction):
+            snap = ref.get(transaction=transaction)
+            current = int(((snap.to_dict() or {}).get("version") or 0) if snap.exists else 0)
+            if current != int(expected_version):
+                raise DraftConflict(podcast_id, expected_version, current)
+            payload["version"] = current + 1
+            transaction.set(ref, payload, merge=True)
+            return current + 1
+
+        return commit(transaction)
+
+    def delete(self, podcast_id):
+        self.ref(podcast_id).delete()
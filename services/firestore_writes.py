@@ -0,0 +1,103 @@
+FIRESTORE_BATCH_LIMIT = 500
+
+
+def _merge_maps(base, override):
+    """Combine two merge-set payloads as Firestore applies them: nested maps merge, other values replace."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_maps(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class FirestoreUnitOfWork:
+    """
+    Collect the Firestore writes of one request and commit them together.
+
+    Merge-sets that target the same document are coalesced into a single write
+    (nested maps are deep-merged as Firestore would, other values: later wins),
+    so a handler that touches the podcast doc several times still costs one
+    write. Everything is sent in one WriteBatch, which Firestore applies
+    atomically. Only units larger than the 500-write batch limit are split,
+    and those chunks are committed in order.
+
+    Use as a context manager to commit on success and drop the queued writes
+    when the block raises.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+        self._merge_index = {}
+        self.committed_writes = 0
+
+    def __len__(self):
+        return len(self._ops)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+    def set(self, ref, data, merge=False):
+        payload = dict(data or {})
+        path = ref.path
+        if merge:
+            pending = self._merge_index.get(path)
+            if pending is not None:
+                kind, pending_ref, pending_payload = self._ops[pending]
+                self._ops[pending] = (kind, pending_ref, _merge_maps(pending_payload, payload))
+                return self
+            self._ops.append(("set_merge", ref, payload))
+            self._merge_index[path] = len(self._ops) - 1
+            return self
+
+        self._ops.append(("set", ref, payload))
+        self._merge_index.pop(path, None)
+        return self
+
+    def update(self, ref, data):
+        self._ops.append(("update", ref, dict(data or {})))
+        self._merge_index.pop(ref.path, None)
+        return self
+
+    def delete(self, ref):
+        self._ops.append(("delete", ref, None))
+        self._merge_index.pop(ref.path, None)
+        return self
+
+    def discard(self):
+        self._ops = []
+        self._merge_index = {}
+
+    def commit(self):
+        """Send the queued writes and return how many were committed."""
+        ops, self._ops = self._ops, []
+        self._merge_index = {}
+        if not ops:
+            return 0
+
+        written = 0
+        for start in range(0, len(ops), FIRESTORE_BATCH_LIMIT):
+            batch = self._db.batch()
+            for kind, ref, payload in ops[start:start + FIRESTORE_BATCH_LIMIT]:
+                if kind == "set_merge":
+                    batch.set(ref, payload, merge=True)
+                elif kind == "set":
+                    batch.set(ref, payload)
+                elif kind == "update":
+                    batch.update(ref, payload)
+                else:
+                    batch.delete(ref)
+            batch.commit()
+            written += min(FIRESTORE_BATCH_LIMIT, len(ops) - start)
+
+        self.committed_writes += written
+        return written
@@ -0,0 +1,179 @@
+import base64
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+MIME_BY_FORMAT = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+    "AVIF": "image/avif",
+}
+# Decompression-bomb guard: ~40MP is far beyond any cover/avatar we accept.
+MAX_PIXELS = 40_000_000
+WEB_SAFE_FORMATS = {"PNG", "JPEG", "WEBP"}
+
+
+class ImageRejected(ValueError):
+    """The bytes are not a usable image; str(exc) is safe to show to the user."""
+
+
+def resolve_master_format(name):
+    """
+    Map a configured master format to one this Pillow build can encode.
+    AVIF needs Pillow >= 11.2 (or the pillow-avif plugin); fall back to WebP.
+    Returns "" when re-encoding is disabled.
+    """
+    fmt = str(name or "").strip().upper()
+    if not fmt or fmt in {"0", "NONE", "OFF", "ORIGINAL"}:
+        return ""
+    Image.init()
+    if fmt == "AVIF" and "AVIF" not in Image.SAVE:
+        fmt = "WEBP"
+    return fmt if fmt in Image.SAVE else ""
+
+
+class ProcessedImage:
+    """Everything one decode of an uploaded/generated image produced."""
+
+    def __init__(self, original, width, height, fmt, master=b"", master_format="", thumbs=None):
+        self.original = original
+        self.width = width
+        self.height = height
+        self.format = fmt
+        self.master = master
+        self.master_format = master_format
+        self.thumbs = thumbs or {}
+
+    @property
+    def mime_type(self):
+        return MIME_BY_FORMAT.get(self.format, "image/jpeg")
+
+    @property
+    def master_mime_type(self):
+        return MIME_BY_FORMAT.get(self.master_format, "")
+
+    def stored_bytes(self):
+        """(bytes, mime type) to persist: the re-encoded master when there is one."""
+        if self.master:
+            return self.master, self.master_mime_type
+        return self.original, self.mime_type
+
+    def thumb_b64(self, size):
+        data = self.thumbs.get(size)
+        return base64.b64encode(data).decode("utf-8") if data else ""
+
+    def info(self):
+        return {"width": self.width, "height": self.height, "format": self.format}
+
+
+def _fit(img, max_side):
+    """
+    Downscale so the longest side is max_side: a cheap integer reduce() first
+    (box filter in C), then one LANCZOS pass over the much smaller image.
+    """
+    w, h = img.size
+    longest = max(w, h)
+    if longest <= max_side:
+        return img
+    ratio = max_side / longest
+    target = (max(1, round(w * ratio)), max(1, round(h * ratio)))
+    # Leave the resampler at least 2x to work with so quality holds up.
+    factor = int(longest / max_side / 2)
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img.resize(target, Image.LANCZOS)
+
+
+def _encode(img, fmt, quality):
+    buf = BytesIO()
+    if fmt == "JPEG":
+        img.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True)
+    elif fmt == "WEBP":
+        img.save(buf, format="WEBP", quality=quality, method=4)
+    elif fmt == "AVIF":
+        img.save(buf, format="AVIF", quality=quality)
+    else:
+        img.save(buf, format=fmt, optimize=True)
+    return buf.getvalue()
+
+
+def process_image(
+    image_bytes,
+    *,
+    min_side=1,
+    master_format="",
+    master_max_side=None,
+    master_quality=82,
+    thumb_sizes=(),
+    thumb_quality=78,
+):
+    """
+    Validate and transform an image with a single decode.
+
+    The header is parsed first (format, size, pixel-count guard); then the
+    pixels are decoded exactly once. From that decoded image we build an
+    optional re-encoded master (WebP/AVIF, capped at master_max_side) and
+    JPEG thumbnails for every size in thumb_sizes, largest first so each
+    smaller thumbnail is cut from the previous one. When only thumbnails are
+    wanted, JPEG input is decoded at reduced scale via Image.draft().
+
+    The master is dropped when it would be bigger than an already web-safe
+    original at the same dimensions. Raises ImageRejected for bad input.
+    """
+    if not image_bytes:
+        raise ImageRejected("Empty file")
+
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        fmt = (img.format or "").upper()
+        width, height = img.size
+    except UnidentifiedImageError:
+        raise ImageRejected("Unsupported image format. Please upload PNG/JPG.")
+    except Exception:
+        raise ImageRejected("Invalid image file.")
+
+    if width < min_side or height < min_side:
+        raise ImageRejected(f"Image too small. Minimum is {min_side}x{min_side}px.")
+    if width * height > MAX_PIXELS:
+        raise ImageRejected("Image dimensions are too large.")
+
+    master_format = resolve_master_format(master_format)
+    thumb_sizes = sorted({int(s) for s in thumb_sizes if int(s) > 0}, reverse=True)
+
+    try:
+        if not master_format and thumb_sizes and fmt == "JPEG":
+            img.draft("RGB", (thumb_sizes[0], thumb_sizes[0]))
+        # The one full decode; a truncated/corrupt file fails here.
+        img.load()
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in img.mode or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+    except Exception:
+        raise ImageRejected("Invalid image file.")
+
+    master = b""
+    if master_format:
+        master_img = _fit(img, master_max_side) if master_max_side else img
+        master = _encode(master_img, master_format, master_quality)
+        unchanged_size = master_img.size == (width, height)
+        if unchanged_size and fmt in WEB_SAFE_FORMATS and len(master) >= len(image_bytes):
+            master, master_format = b"", ""
+
+    thumbs = {}
+    source = img
+    for size in thumb_sizes:
+        source = _fit(source, size)
+        thumbs[size] = _encode(source, "JPEG", thumb_quality)
+
+    return ProcessedImage(
+        image_bytes,
+        width,
+        height,
+        fmt,
+        master=master,
+        master_format=master_format,
+        thumbs=thumbs,
+    )
@@ -0,0 +1,70 @@
+import importlib
+import threading
+
+
+class LazyObject:
+    """
+    Stand-in for a client or module that is expensive to import/build.
+
+    The factory runs once, on the first attribute access, under a lock. Until
+    then nothing is imported. `available` (optional) answers truthiness
+    checks such as `if not r2_storage:` without building the target.
+    """
+
+    def __init__(self, factory, *, available=None, name=""):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_available", available)
+        object.__setattr__(self, "_name", name or getattr(factory, "__name__", "lazy"))
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_loaded", False)
+
+    def _resolve(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    object.__setattr__(self, "_target", self._factory())
+                    object.__setattr__(self, "_loaded", True)
+        return self._target
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __bool__(self):
+        if self._available is not None:
+            return bool(self._available())
+        return bool(self._resolve())
+
+    def __repr__(self):
+        state = "loaded" if self._loaded else "not loaded"
+        return f"<lazy {self._name} ({state})>"
+
+
+def warm(obj):
+    """Build a LazyObject's target now (no-op for anything else or unavailable targets)."""
+    if isinstance(obj, LazyObject) and (obj._available is None or obj._available()):
+        obj._resolve()
+
+
+def lazy_import(module_name, attr="", *, on_load=None):
+    """LazyObject for a module (or one attribute of it); on_load(target) runs once after import."""
+
+    def _load():
+        target = importlib.import_module(module_name)
+        if attr:
+            target = getattr(target, attr)
+        if on_load:
+            on_load(target)
+        return target
+
+    return LazyObject(_load, available=lambda: True, name=f"{module_name}.{attr}" if attr else module_name)
@@ -0,0 +1,320 @@
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# WECAST_METRICS=0 turns every timer into a no-op (decorators return the
+# function unchanged), so disabled metrics cost nothing on hot paths.
+METRICS_ENABLED = os.getenv("WECAST_METRICS", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+# Seconds; spans cache hits (ms) up to long renders (minutes).
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Frames from these modules are skipped when tagging an external call with its
+# caller: SDKs, plus our own thin wrappers (R2 helpers, the Firestore unit of
+# work), so the tag names the route or job that made the call.
+_SKIP_CALLER_PREFIXES = (
+    "google.",
+    "grpc",
+    "openai",
+    "httpx",
+    "botocore",
+    "boto3",
+    "requests",
+    "urllib3",
+    "services.metrics",
+    "services.storage",
+    "services.firestore_writes",
+    "wecast_core.storage",
+    "contextlib",
+)
+
+# External calls made while handling the current request (for slow-request logs).
+_request_calls = contextvars.ContextVar("wecast_request_calls", default=None)
+# Service whose call is being timed, so SDK-internal nested calls
+# (CollectionReference.stream -> Query.stream) are not counted twice.
+_active_service = contextvars.ContextVar("wecast_active_service", default="")
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labelvalues):
+        key = tuple(str(value) for value in labelvalues)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[index] += 1
+                    break
+            series[1] += seconds
+            series[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    In-process metrics, rendered in the Prometheus text format.
+
+    Values live in the worker process, so with several gunicorn workers each
+    scrape sees one worker; the deploy runs a single gthread worker.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text, labelnames, buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help_text, labelnames, buckets)
+            return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+HTTP_LATENCY = REGISTRY.histogram(
+    "wecast_http_request_duration_seconds",
+    "Flask request latency by endpoint.",
+    ("endpoint", "method", "status"),
+)
+EXTERNAL_LATENCY = REGISTRY.histogram(
+    "wecast_external_call_duration_seconds",
+    "Latency of Firestore, R2, OpenAI and ElevenLabs calls by calling function.",
+    ("service", "operation", "caller", "outcome"),
+)
+
+
+def caller_name(depth=2):
+    """Name of the first function up the stack that isn't SDK or metrics plumbing."""
+    frame = sys._getframe(depth)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_SKIP_CALLER_PREFIXES):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "unknown"
+
+
+def _record(service, operation, caller, outcome, elapsed):
+    EXTERNAL_LATENCY.observe(elapsed, service, operation, caller, outcome)
+    calls = _request_calls.get()
+    if calls is not None:
+        calls.append((service, operation, caller, elapsed))
+
+
+@contextmanager
+def track(service, operation, caller=""):
+    """Time one external call: `with track("r2", "put"): ...`."""
+    if not METRICS_ENABLED or _active_service.get() == service:
+        yield
+        return
+    caller = caller or caller_name(3)
+    token = _active_service.set(service)
+    outcome = "ok"
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _active_service.reset(token)
+        _record(service, operation, caller, outcome, time.perf_counter() - started)
+
+
+def timed(service, operation):
+    """Decorator form of track(); the caller tag is resolved per call."""
+
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(service, operation, caller_name(2)):
+                return func(*args, **kwargs)
+
+        wrapper.__wrapped_metrics__ = True
+        return wrapper
+
+    return decorate
+
+
+def timed_iter(service, operation):
+    """
+    Like timed() for functions returning an iterator (Firestore streams):
+    the time spent producing items is recorded once the iterator is exhausted
+    or closed, excluding the caller's own work between items.
+    """
+
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_service.get() == service:
+                return func(*args, **kwargs)
+            return _TimedIterator(func, args, kwargs, service, operation, caller_name(2))
+
+        wrapper.__wrapped_metrics__ = True
+        return wrapper
+
+    return decorate
+
+
+class _TimedIterator:
+    def __init__(self, func, args, kwargs, service, operation, caller):
+        self._service = service
+        self._operation = operation
+        self._caller = caller
+        self._elapsed = 0.0
+        self._done = False
+        self._iterator = iter(self._timed(lambda: func(*args, **kwargs)))
+
+    def _timed(self, step):
+        token = _active_service.set(self._service)
+        started = time.perf_counter()
+        outcome = ""
+        try:
+            return step()
+        except StopIteration:
+            outcome = "ok"
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self._elapsed += time.perf_counter() - started
+            _active_service.reset(token)
+            if outcome:
+                self._finish(outcome)
+
+    def _finish(self, outcome):
+        if not self._done:
+            self._done = True
+            _record(self._service, self._operation, self._caller, outcome, self._elapsed)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._timed(lambda: next(self._iterator))
+
+    def close(self):
+        close = getattr(self._iterator, "close", None)
+        if close:
+            close()
+        self._finish("ok")
+
+    def __del__(self):
+        self._finish("ok")
+
+
+def _patch(cls, attr, service, operation, decorator=timed):
+    original = getattr(cls, attr, None)
+    if original is None or getattr(original, "__wrapped_metrics__", False):
+        return
+    setattr(cls, attr, decorator(service, operation)(original))
+
+
+def instrument_firestore():
+    """Wrap document reads/writes and query streams of the Firestore client library."""
+    from google.cloud.firestore_v1 import batch, client, document, query
+
+    for attr in ("get", "set", "update", "delete", "create"):
+        _patch(document.DocumentReference, attr, "firestore", attr)
+    _patch(query.Query, "get", "firestore", "query")
+    _patch(query.Query, "stream", "firestore", "stream", timed_iter)
+    _patch(batch.WriteBatch, "commit", "firestore", "commit")
+    _patch(client.Client, "get_all", "firestore", "get_all", timed_iter)
+
+
+def instrument_openai():
+    """Wrap chat completions and image generation of the OpenAI SDK."""
+    from openai.resources.chat.completions import Completions
+    from openai.resources.images import Images
+
+    _patch(Completions, "create", "openai", "chat_completion")
+    _patch(Images, "generate", "openai", "image_generate")
+
+
+def install_request_metrics(app, *, slow_request_ms=0, log=print):
+    """
+    Record per-endpoint latency for every request. With slow_request_ms > 0,
+    requests slower than that are logged with their external-call breakdown.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_started = time.perf_counter()
+        _request_calls.set([])
+
+    @app.teardown_request
+    def _metrics_finish(exc=None):
+        started = g.pop("_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        calls = _request_calls.get() or []
+        _request_calls.set(None)
+        status = "500" if exc is not None else str(g.pop("_metrics_status", "") or "")
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_LATENCY.observe(elapsed, endpoint, request.method, status)
+
+        if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+            external = sum(call[3] for call in calls)
+            log(
+                f"Slow request: {request.method} {request.path} -> {status} in {elapsed * 1000:.0f} ms "
+                f"({len(calls)} external calls, {external * 1000:.0f} ms)"
+            )
+            for service, operation, caller, seconds in sorted(calls, key=lambda call: call[3], reverse=True)[:10]:
+                log(f"  {seconds * 1000:8.1f} ms  {service}.{operation}  in {caller}")
+
+    @app.after_request
+    def _metrics_status(response):
+        g._metrics_status = response.status_code
+        return response
@@ -0,0 +1,236 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.firestore_writes import FIRESTORE_BATCH_LIMIT
+
+
+PODCAST_SUBCOLLECTIONS = ("scripts", "speakers", "transcripts", "edits")
+PODCAST_ASSET_FIELDS = ("audioKey", "coverPath")
+R2_DELETE_BATCH_LIMIT = 1000
+# BulkWriter retries a failed delete this many times before reporting it.
+BULK_DELETE_MAX_ATTEMPTS = 5
+
+
+def _env_int(name, default):
+    try:
+        return max(1, int((os.getenv(name) or "").strip() or default))
+    except ValueError:
+        return default
+
+
+PURGE_MAX_WORKERS = _env_int("WECAST_PURGE_MAX_WORKERS", 8)
+
+
+def podcast_asset_keys(data):
+    keys = []
+    for field in PODCAST_ASSET_FIELDS:
+        key = str((data or {}).get(field) or "").strip().lstrip("/")
+        if key:
+            keys.append(key)
+    return keys
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def delete_r2_objects(client, bucket_name, keys, *, label="R2 cleanup", max_workers=None):
+    """
+    Delete R2 objects with DeleteObjects (up to 1000 keys per call).
+    Returns (deleted_count, failed_keys); never raises.
+    """
+    unique_keys = []
+    seen = set()
+    for raw in keys or []:
+        key = str(raw or "").strip().lstrip("/")
+        if key and key not in seen:
+            seen.add(key)
+            unique_keys.append(key)
+    if not unique_keys:
+        return 0, []
+    if not client or not bucket_name:
+        print(f"{label} warning: R2 client is not configured.")
+        return 0, unique_keys
+
+    def _delete_chunk(chunk):
+        try:
+            response = client.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+        except Exception as exc:
+            print(f"{label} warning: {exc}")
+            return 0, list(chunk)
+        failed = []
+        for error in (response or {}).get("Errors") or []:
+            failed.append(error.get("Key") or "")
+            print(f"{label} warning: {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+        return len(chunk) - len(failed), failed
+
+    chunks = list(_chunks(unique_keys, R2_DELETE_BATCH_LIMIT))
+    workers = min(len(chunks), max_workers or PURGE_MAX_WORKERS)
+    if workers <= 1:
+        results = [_delete_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_delete_chunk, chunks))
+
+    deleted = sum(count for count, _ in results)
+    failed_keys = [key for _, failed in results for key in failed if key]
+    return deleted, failed_keys
+
+
+def r2_object_sizes(client, bucket_name, keys, *, max_workers=None):
+    """HEAD each key on a bounded pool and return {key: ContentLength} for keys that exist."""
+    keys = [key for key in dict.fromkeys(keys or []) if key]
+    if not keys or not client or not bucket_name:
+        return {}
+
+    def _head(key):
+        try:
+            return key, int(client.head_object(Bucket=bucket_name, Key=key).get("ContentLength") or 0)
+        except Exception:
+            return key, None
+
+    with ThreadPoolExecutor(max_workers=min(len(keys), max_workers or PURGE_MAX_WORKERS)) as pool:
+        return {key: size for key, size in pool.map(_head, keys) if size is not None}
+
+
+def _subcollection_refs(ref, subcollections):
+    refs = []
+    for sub_name in subcollections:
+        try:
+            # list_documents skips reading field data; we only need references.
+            refs.extend(ref.collection(sub_name).list_documents())
+        except Exception as exc:
+            print(f"Subcollection listing failed for {ref.path}/{sub_name}: {exc}")
+    return refs
+
+
+def delete_documents(db, refs):
+    """
+    Delete document references with a BulkWriter, or batched deletes when
+    unavailable. Returns (deleted_count, failed_paths); never raises.
+    """
+    refs = list(refs or [])
+    if not refs:
+        return 0, set()
+
+    bulk_writer_factory = getattr(db, "bulk_writer", None)
+    if callable(bulk_writer_factory):
+        deleted = [0]
+        failed = set()
+        lock = threading.Lock()
+
+        def _on_result(reference, result, writer):
+            with lock:
+                deleted[0] += 1
+
+        def _on_error(failure, writer):
+            if failure.attempts < BULK_DELETE_MAX_ATTEMPTS:
+                return True
+            path = failure.operation.reference.path
+            print(f"Document delete failed for {path}: {failure.code} {failure.message}")
+            with lock:
+                failed.add(path)
+            return False
+
+        writer = bulk_writer_factory()
+        writer.on_write_result(_on_result)
+        writer.on_write_error(_on_error)
+        for ref in refs:
+            writer.delete(ref)
+        writer.close()
+        return deleted[0], failed
+
+    # Each batch is atomic: it either deletes all of its refs or none.
+    deleted = 0
+    failed = set()
+    for start in range(0, len(refs), FIRESTORE_BATCH_LIMIT):
+        chunk = refs[start:start + FIRESTORE_BATCH_LIMIT]
+        batch = db.batch()
+        for ref in chunk:
+            batch.delete(ref)
+        try:
+            batch.commit()
+            deleted += len(chunk)
+        except Exception as exc:
+            print(f"Document delete batch failed ({len(chunk)} docs): {exc}")
+            failed.update(ref.path for ref in chunk)
+    return deleted, failed
+
+
+def purge_podcasts(
+    db,
+    snapshots,
+    *,
+    r2_client=None,
+    bucket_name="",
+    extra_r2_keys=(),
+    subcollections=PODCAST_SUBCOLLECTIONS,
+    max_workers=None,
+    measure_bytes=False,
+):
+    """
+    Permanently delete podcast docs, their subcollections and their R2 assets.
+
+    Subcollections are listed concurrently on a bounded pool, every document
+    delete goes through one BulkWriter, and R2 assets are removed with bulk
+    DeleteObjects calls. A podcast whose child or own doc delete fails keeps
+    its doc and its R2 assets (listed in "failedPodcastIds") so a later run
+    can retry. Returns counters for the response/logs; with
+    measure_bytes=True the assets are HEADed first so "bytes" is filled in.
+    """
+    snapshots = [snap for snap in snapshots or [] if snap is not None]
+    workers = max(1, min(max_workers or PURGE_MAX_WORKERS, len(snapshots) or 1))
+
+    podcast_refs = [snap.reference for snap in snapshots]
+
+    if workers == 1:
+        nested = [_subcollection_refs(ref, subcollections) for ref in podcast_refs]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            nested = list(pool.map(lambda ref: _subcollection_refs(ref, subcollections), podcast_refs))
+
+    # Children first, so an interrupted purge never leaves orphaned subdocs behind.
+    child_refs = [ref for refs in nested for ref in refs]
+    deleted_docs, failed_children = delete_documents(db, child_refs)
+    failed_podcast_ids = {
+        ref.id for ref, refs in zip(podcast_refs, nested)
+        if any(child.path in failed_children for child in refs)
+    }
+    deletable_refs = [ref for ref in podcast_refs if ref.id not in failed_podcast_ids]
+    deleted_parents, failed_parents = delete_documents(db, deletable_refs)
+    deleted_docs += deleted_parents
+    failed_podcast_ids.update(ref.id for ref in deletable_refs if ref.path in failed_parents)
+
+    # Only drop assets of podcasts whose doc is really gone; a surviving doc
+    # must not point at deleted audio or covers.
+    r2_keys = list(extra_r2_keys or [])
+    for snap in snapshots:
+        if getattr(snap, "exists", False) and snap.reference.id not in failed_podcast_ids:
+            r2_keys.extend(podcast_asset_keys(snap.to_dict() or {}))
+
+    object_bytes = 0
+    if measure_bytes:
+        sizes = r2_object_sizes(r2_client, bucket_name, r2_keys, max_workers=max_workers)
+        object_bytes = sum(sizes.values())
+
+    deleted_objects, failed_keys = delete_r2_objects(
+        r2_client,
+        bucket_name,
+        r2_keys,
+        label="Podcast purge",
+        max_workers=max_workers,
+    )
+
+    return {
+        "podcasts": len(podcast_refs) - len(failed_podcast_ids),
+        "documents": deleted_docs,
+        "objects": deleted_objects,
+        "bytes": object_bytes,
+        "failedObjectKeys": failed_keys,
+        "failedPodcastIds": sorted(failed_podcast_ids),
+    }
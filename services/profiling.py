@@ -0,0 +1,277 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+
+PROFILE_HEADER = "X-WeCast-Profile"
+# Default tracemalloc endpoints: renders and cover generation hold whole
+# episodes / images in memory.
+DEFAULT_MEMORY_ENDPOINTS = ("/api/audio", "/api/podcasts/<podcast_id>/cover/generate")
+
+
+_labels = {}
+
+
+def _frame_label(code, lineno):
+    label = _labels.get((code, lineno))
+    if label is not None:
+        return label
+    filename = code.co_filename
+    for prefix in sys.path:
+        if prefix and filename.startswith(prefix):
+            filename = filename[len(prefix):].lstrip(os.sep)
+            break
+    label = _labels[(code, lineno)] = f"{code.co_name} ({filename}:{lineno})"
+    return label
+
+
+def fold_stack(frame, max_depth=200):
+    """Root-first `a;b;c` stack of a frame, as flamegraph.pl / speedscope read it."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    One daemon thread that snapshots the stacks of registered threads every
+    `interval` seconds, and sleeps while no thread is registered. Works for
+    sync/gthread workers; under gevent every greenlet shares one thread, so
+    use the cprofile engine there.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        counts = Counter()
+        with self._lock:
+            self._targets[thread_id] = counts
+            self._active.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return counts
+
+    def stop(self, thread_id):
+        with self._lock:
+            counts = self._targets.pop(thread_id, Counter())
+            if not self._targets:
+                self._active.clear()
+        return counts
+
+    def _run(self):
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                targets = list(self._targets.items())
+            frames = sys._current_frames()
+            for thread_id, counts in targets:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[fold_stack(frame)] += 1
+
+
+class _TracemallocUsers:
+    """Reference-counted tracemalloc, so overlapping memory-profiled requests share one trace."""
+
+    def __init__(self, frames=25):
+        self.frames = frames
+        self._users = 0
+        self._owned = False
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        import tracemalloc
+
+        with self._lock:
+            if self._users == 0:
+                self._owned = not tracemalloc.is_tracing()
+                if self._owned:
+                    tracemalloc.start(self.frames)
+                tracemalloc.reset_peak()
+            self._users += 1
+
+    def release(self):
+        import tracemalloc
+
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._owned:
+                tracemalloc.stop()
+                self._owned = False
+
+
+class ProfileWriter:
+    """
+    Writes profile artifacts to a local directory, or to R2 when `output` is
+    "r2:<prefix>", from a background thread so the response isn't delayed.
+    """
+
+    def __init__(self, output):
+        self.output = output
+
+    def write(self, base_name, artifacts):
+        threading.Thread(target=self._write, args=(base_name, artifacts), name="profile-writer", daemon=True).start()
+
+    def _write(self, base_name, artifacts):
+        try:
+            if self.output.startswith("r2:"):
+                from wecast_core.storage import upload_bytes_to_r2
+
+                prefix = self.output[3:].strip("/") or "profiles"
+                for suffix, data, content_type in artifacts:
+                    upload_bytes_to_r2(data, f"{prefix}/{base_name}{suffix}", content_type)
+                print(f"Profile uploaded: r2 {prefix}/{base_name}.*")
+                return
+            os.makedirs(self.output, exist_ok=True)
+            for suffix, data, _ in artifacts:
+                with open(os.path.join(self.output, base_name + suffix), "wb") as handle:
+                    handle.write(data)
+            print(f"Profile written: {os.path.join(self.output, base_name)}.*")
+        except Exception as exc:
+            print(f"Profile write failed for {base_name}: {exc}")
+
+
+def _base_name(method, rule, elapsed_ms):
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", rule).strip("_") or "unmatched"
+    return f"{stamp}_{method}_{slug}_{elapsed_ms:.0f}ms_{os.getpid()}_{threading.get_ident() % 100000}"
+
+
+def _memory_artifacts(snapshot, peak_bytes, top=40):
+    stats = snapshot.statistics("lineno")
+    lines = [f"tracemalloc peak: {peak_bytes / (1024 * 1024):.1f} MB (process-wide while this request ran)", ""]
+    for stat in stats[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+    import tempfile
+
+    with tempfile.NamedTemporaryFile(suffix=".tracemalloc", delete=False) as handle:
+        path = handle.name
+    try:
+        snapshot.dump(path)
+        with open(path, "rb") as handle:
+            raw = handle.read()
+    finally:
+        os.unlink(path)
+    return [
+        (".memory.txt", ("\n".join(lines) + "\n").encode("utf-8"), "text/plain"),
+        (".tracemalloc", raw, "application/octet-stream"),
+    ]
+
+
+def install_request_profiler(
+    app,
+    *,
+    mode="on",
+    admin_token="",
+    threshold_ms=2000,
+    engine="sample",
+    interval_ms=5,
+    output="./.wecast_profiles",
+    memory_endpoints=DEFAULT_MEMORY_ENDPOINTS,
+):
+    """
+    mode "on": profile every request and keep the ones slower than
+    threshold_ms. mode "header": profile only requests sending
+    `X-WeCast-Profile: <admin_token>`. A request with a valid header is
+    always kept. engine "sample" writes folded stacks (<name>.folded, for
+    flamegraph.pl or speedscope); "cprofile" writes pstats (<name>.prof).
+    Requests to memory_endpoints (Flask rules) also get tracemalloc output.
+    Nothing is installed unless this is called.
+    """
+    from flask import g, request
+
+    sampler = StackSampler(interval_ms / 1000.0) if engine == "sample" else None
+    cprofile_lock = threading.Lock()
+    tracemalloc_users = _TracemallocUsers()
+    writer = ProfileWriter(output)
+    memory_endpoints = frozenset(memory_endpoints or ())
+
+    @app.before_request
+    def _profile_start():
+        forced = False
+        if admin_token:
+            import secrets
+
+            supplied = request.headers.get(PROFILE_HEADER)
+            forced = bool(supplied) and secrets.compare_digest(supplied, admin_token)
+        if mode == "header" and not forced:
+            return
+
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        state = {"started": time.perf_counter(), "forced": forced, "rule": rule, "memory": rule in memory_endpoints}
+        if sampler is not None:
+            state["thread"] = threading.get_ident()
+            sampler.start(state["thread"])
+        elif cprofile_lock.acquire(blocking=False):
+            # Only one cProfile may run at a time (3.12+ enforces it); others go unprofiled.
+            import cProfile
+
+            state["cprofile"] = cProfile.Profile()
+            state["cprofile"].enable()
+        if state["memory"]:
+            tracemalloc_users.acquire()
+        g._profile = state
+
+    @app.teardown_request
+    def _profile_finish(exc=None):
+        state = g.pop("_profile", None)
+        if state is None:
+            return
+        elapsed_ms = (time.perf_counter() - state["started"]) * 1000
+        keep = state["forced"] or elapsed_ms >= threshold_ms
+
+        artifacts = []
+        meta = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": state["rule"],
+            "elapsedMs": round(elapsed_ms, 1),
+            "error": f"{type(exc).__name__}: {exc}" if exc is not None else "",
+            "engine": engine,
+            "forced": state["forced"],
+        }
+        if sampler is not None:
+            counts = sampler.stop(state["thread"])
+            if keep:
+                folded = "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+                artifacts.append((".folded", folded.encode("utf-8"), "text/plain"))
+                meta["samples"] = sum(counts.values())
+                meta["intervalMs"] = interval_ms
+        elif "cprofile" in state:
+            profiler = state["cprofile"]
+            profiler.disable()
+            cprofile_lock.release()
+            if keep:
+                import marshal
+
+                profiler.create_stats()
+                artifacts.append((".prof", marshal.dumps(profiler.stats), "application/octet-stream"))
+
+        if state["memory"]:
+            try:
+                if keep:
+                    import tracemalloc
+
+                    peak = tracemalloc.get_traced_memory()[1]
+                    meta["tracemallocPeakMb"] = round(peak / (1024 * 1024), 1)
+                    artifacts.extend(_memory_artifacts(tracemalloc.take_snapshot(), peak))
+            finally:
+                tracemalloc_users.release()
+
+        if keep and artifacts:
+            artifacts.append((".json", json.dumps(meta, indent=2).encode("utf-8"), "application/json"))
+            writer.write(_base_name(request.method, state["rule"], elapsed_ms), artifacts)
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+
+
+GC_PREFIXES = ("episodes/", "covers/", "avatars/")
+# collection -> fields holding R2 keys that must be kept.
+REFERENCE_FIELDS = {
+    "podcasts": ("audioKey", "coverPath"),
+    "users": ("avatarKey",),
+}
+DEFAULT_GRACE_HOURS = 72
+SCAN_PAGE_SIZE = 500
+
+
+def _normalize_key(value):
+    return str(value or "").strip().lstrip("/")
+
+
+def referenced_keys(db, *, page_size=SCAN_PAGE_SIZE, reference_fields=None):
+    """
+    Stream every collection in reference_fields page by page, reading only the
+    key fields, and return the set of R2 keys still referenced.
+    """
+    keys = set()
+    for collection, fields in (reference_fields or REFERENCE_FIELDS).items():
+        query = db.collection(collection).select(list(fields)).order_by("__name__").limit(page_size)
+        cursor = None
+        while True:
+            page = list((query.start_after(cursor) if cursor else query).stream())
+            for snap in page:
+                data = snap.to_dict() or {}
+                for field in fields:
+                    key = _normalize_key(data.get(field))
+                    if key:
+                        keys.add(key)
+            if len(page) < page_size:
+                break
+            cursor = page[-1]
+    return keys
+
+
+def iter_bucket_objects(client, bucket_name, prefix):
+    """Yield ListObjectsV2 entries under prefix, 1000 per page."""
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for entry in page.get("Contents") or []:
+            yield entry
+
+
+def collect_garbage(
+    db,
+    storage,
+    *,
+    prefixes=GC_PREFIXES,
+    grace_hours=DEFAULT_GRACE_HOURS,
+    dry_run=True,
+    max_delete=None,
+    now=None,
+    log=print,
+):
+    """
+    Delete R2 objects under prefixes that no Firestore doc references.
+
+    Firestore is scanned before the bucket is listed, and only objects older
+    than grace_hours are eligible, so uploads whose doc write is still in
+    flight (renders, direct uploads awaiting completion) are never removed.
+    Returns counters including the bytes reclaimed (or reclaimable on a dry run).
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=max(0, grace_hours))
+
+    keep = referenced_keys(db)
+    log(f"Referenced keys: {len(keep)}")
+
+    stats = {
+        "referenced": len(keep),
+        "scanned": 0,
+        "orphans": 0,
+        "orphanBytes": 0,
+        "recentOrphans": 0,
+        "deleted": 0,
+        "deletedBytes": 0,
+        "failedKeys": [],
+    }
+    pending = []
+    pending_bytes = {}
+
+    def _flush():
+        if not pending:
+            return
+        deleted, failed = storage.delete_many(list(pending), label="R2 GC")
+        failed_set = set(failed)
+        stats["deleted"] += deleted
+        stats["deletedBytes"] += sum(size for key, size in pending_bytes.items() if key not in failed_set)
+        stats["failedKeys"].extend(failed)
+        pending.clear()
+        pending_bytes.clear()
+
+    for prefix in prefixes:
+        for entry in iter_bucket_objects(storage.client, storage.bucket_name, prefix):
+            stats["scanned"] += 1
+            key = entry.get("Key") or ""
+            if not key or key in keep:
+                continue
+
+            size = int(entry.get("Size") or 0)
+            last_modified = entry.get("LastModified")
+            if last_modified and last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            if last_modified and last_modified > cutoff:
+                stats["recentOrphans"] += 1
+                continue
+
+            if max_delete is not None and stats["orphans"] >= max_delete:
+                continue
+            stats["orphans"] += 1
+            stats["orphanBytes"] += size
+            log(f"ORPHAN {key} size={size} lastModified={last_modified}")
+            if dry_run:
+                continue
+
+            pending.append(key)
+            pending_bytes[key] = size
+            if len(pending) >= 1000:
+                _flush()
+
+    if not dry_run:
+        _flush()
+    return stats
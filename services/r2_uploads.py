@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# R2, like S3, needs parts of at least 5 MiB (except the last) and equal-sized
+# parts, which the fixed-size reader below guarantees.
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 4
+
+
+def _part_reader(source, part_size):
+    """Yield exactly part_size bytes at a time (the last part may be shorter)."""
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(part_size)
+            if not chunk:
+                return
+            # Raw/unbuffered streams may return short reads; top the part up.
+            while len(chunk) < part_size:
+                more = source.read(part_size - len(chunk))
+                if not more:
+                    break
+                chunk += more
+            yield chunk
+        return
+
+    buffer = bytearray()
+    for piece in source:
+        if not piece:
+            continue
+        buffer.extend(piece)
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _load_state(state_path):
+    if not state_path or not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, "r", encoding="utf-8") as fh:
+            return json.load(fh) or {}
+    except Exception as exc:
+        print(f"Multipart upload state unreadable ({state_path}): {exc}")
+        return {}
+
+
+def _save_state(state_path, state):
+    if not state_path:
+        return
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(state, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def upload_stream(
+    client,
+    bucket_name,
+    object_key,
+    source,
+    *,
+    content_type="application/octet-stream",
+    part_size=DEFAULT_PART_SIZE,
+    max_workers=DEFAULT_UPLOAD_WORKERS,
+    state_path="",
+):
+    """
+    Upload a file object or an iterable of byte chunks to R2.
+
+    Payloads that fit in one part go out as a single put_object. Larger ones
+    use a multipart upload whose parts are sent on a bounded pool while the
+    source is still being read, so at most max_workers + 1 parts are held in
+    memory regardless of the episode length.
+
+    With state_path the upload id and finished parts are saved after every
+    part. Re-running with the same source and state_path resumes the upload
+    and skips parts R2 already has. Without it, a failed upload is aborted
+    so no orphaned parts are left behind.
+
+    Returns {"key", "size", "parts"}.
+    """
+    part_size = max(MIN_PART_SIZE, int(part_size or DEFAULT_PART_SIZE))
+    parts = _part_reader(source, part_size)
+
+    first = next(parts, b"")
+    second = next(parts, None)
+    if second is None:
+        client.put_object(Bucket=bucket_name, Key=object_key, Body=first, ContentType=content_type)
+        return {"key": object_key, "size": len(first), "parts": 1}
+
+    state = _load_state(state_path)
+    upload_id = ""
+    done = {}
+    if state.get("key") == object_key and state.get("partSize") == part_size and state.get("uploadId"):
+        upload_id = state["uploadId"]
+        try:
+            listed = client.list_parts(Bucket=bucket_name, Key=object_key, UploadId=upload_id)
+            done = {int(p["PartNumber"]): p["ETag"] for p in listed.get("Parts") or []}
+            print(f"Resuming multipart upload of {object_key}: {len(done)} parts already uploaded")
+        except Exception as exc:
+            print(f"Multipart upload {upload_id} cannot be resumed, starting over: {exc}")
+            upload_id = ""
+            done = {}
+    if not upload_id:
+        upload_id = client.create_multipart_upload(
+            Bucket=bucket_name,
+            Key=object_key,
+            ContentType=content_type,
+        )["UploadId"]
+        state = {"key": object_key, "uploadId": upload_id, "partSize": part_size}
+        _save_state(state_path, state)
+
+    lock = threading.Lock()
+
+    def _upload_part(part_number, data):
+        response = client.upload_part(
+            Bucket=bucket_name,
+            Key=object_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        with lock:
+            done[part_number] = response["ETag"]
+            if state_path:
+                _save_state(state_path, {**state, "parts": sorted(done)})
+        return part_number
+
+    def _all_parts():
+        yield first
+        yield second
+        yield from parts
+
+    total_size = 0
+    workers = max(1, int(max_workers or DEFAULT_UPLOAD_WORKERS))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="r2-part") as pool:
+            in_flight = set()
+            for part_number, data in enumerate(_all_parts(), start=1):
+                total_size += len(data)
+                if part_number in done:
+                    continue
+                if len(in_flight) >= workers:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                in_flight.add(pool.submit(_upload_part, part_number, data))
+            for future in in_flight:
+                future.result()
+
+        client.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=object_key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [{"PartNumber": number, "ETag": done[number]} for number in sorted(done)]
+            },
+        )
+    except Exception:
+        if not state_path:
+            try:
+                client.abort_multipart_upload(Bucket=bucket_name, Key=object_key, UploadId=upload_id)
+            except Exception as abort_exc:
+                print(f"Multipart upload abort failed for {object_key}: {abort_exc}")
+        raise
+
+    if state_path and os.path.exists(state_path):
+        os.remove(state_path)
+    return {"key": object_key, "size": total_size, "parts": len(done)}
@@ -0,0 +1,179 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from services.podcast_purge import purge_podcasts
+
+
+DEFAULT_REAPER_PAGE_SIZE = 100
+
+
+def recycle_bin_cutoff(retention_days, now=None):
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(days=max(0, int(retention_days)))
+
+
+def _coerce_datetime(value):
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str) and value.strip():
+        try:
+            parsed = datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh) or {}
+    except Exception as exc:
+        print(f"Recycle bin reaper checkpoint unreadable ({path}): {exc}")
+        return {}
+
+
+def save_checkpoint(path, payload):
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _expired_page_query(db, cutoff, page_size, cursor):
+    # Needs the composite index podcasts(status ASC, deletedAt ASC).
+    query = (
+        db.collection("podcasts")
+        .where("status", "==", "deleted")
+        .where("deletedAt", "<", cutoff)
+        .order_by("deletedAt")
+        .limit(page_size)
+    )
+    if cursor is not None:
+        query = query.start_after(cursor)
+    return query
+
+
+def reap_recycle_bin(
+    db,
+    *,
+    retention_days,
+    r2_client=None,
+    bucket_name="",
+    page_size=DEFAULT_REAPER_PAGE_SIZE,
+    max_pages=None,
+    max_episodes=None,
+    pause_seconds=0.0,
+    dry_run=False,
+    checkpoint_path="",
+    measure_bytes=True,
+    now=None,
+    log=print,
+):
+    """
+    Permanently purge episodes whose recycle-bin retention has expired.
+
+    Pages through status == "deleted" and deletedAt < cutoff, purging each page
+    in bulk (docs, subcollections, R2 assets). pause_seconds between pages acts
+    as the rate limit. With checkpoint_path the cursor and running totals are
+    saved after every page, so an interrupted or capped run resumes where it
+    stopped; the checkpoint is removed once the bin is fully drained.
+    Returns the totals dict.
+    """
+    cutoff = recycle_bin_cutoff(retention_days, now=now)
+    page_size = max(1, min(int(page_size or DEFAULT_REAPER_PAGE_SIZE), 500))
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint.get("cutoff") and checkpoint.get("dryRun") == bool(dry_run):
+        # Resuming: keep the original cutoff so totals stay consistent.
+        cutoff = _coerce_datetime(checkpoint["cutoff"]) or cutoff
+    else:
+        checkpoint = {}
+
+    totals = {
+        "cutoff": cutoff.isoformat(),
+        "dryRun": bool(dry_run),
+        "pages": int(checkpoint.get("pages") or 0),
+        "episodes": int(checkpoint.get("episodes") or 0),
+        "documents": int(checkpoint.get("documents") or 0),
+        "objects": int(checkpoint.get("objects") or 0),
+        "bytes": int(checkpoint.get("bytes") or 0),
+        "failedObjectKeys": list(checkpoint.get("failedObjectKeys") or []),
+        "lastDeletedAt": checkpoint.get("lastDeletedAt") or "",
+    }
+
+    # Deleting a page removes it from the query, so an applying run always
+    # restarts from the top; only dry runs need to walk forward with a cursor.
+    cursor_dt = _coerce_datetime(totals["lastDeletedAt"]) if dry_run else None
+    cursor = {"deletedAt": cursor_dt} if cursor_dt else None
+    pages_this_run = 0
+    finished = False
+    seen_ids = set()
+
+    while True:
+        if max_pages is not None and pages_this_run >= max_pages:
+            break
+        limit = page_size
+        if max_episodes is not None:
+            remaining = max_episodes - totals["episodes"]
+            if remaining <= 0:
+                break
+            limit = min(limit, remaining)
+
+        snapshots = list(_expired_page_query(db, cutoff, limit, cursor).stream())
+        if not snapshots:
+            finished = True
+            break
+
+        page_ids = {snap.id for snap in snapshots}
+        if not dry_run and page_ids <= seen_ids:
+            log("Recycle bin reaper stopping: the last page was not removed (see purge warnings).")
+            break
+        seen_ids |= page_ids
+
+        last_deleted_at = _coerce_datetime((snapshots[-1].to_dict() or {}).get("deletedAt"))
+        if dry_run:
+            for snap in snapshots:
+                data = snap.to_dict() or {}
+                log(f"EXPIRED {snap.id} deletedAt={data.get('deletedAt')} {data.get('title') or 'Untitled'}")
+            stats = {"podcasts": len(snapshots), "documents": 0, "objects": 0, "bytes": 0, "failedObjectKeys": []}
+            cursor = snapshots[-1]
+        else:
+            stats = purge_podcasts(
+                db,
+                snapshots,
+                r2_client=r2_client,
+                bucket_name=bucket_name,
+                measure_bytes=measure_bytes,
+            )
+
+        pages_this_run += 1
+        totals["pages"] += 1
+        totals["episodes"] += stats["podcasts"]
+        totals["documents"] += stats["documents"]
+        totals["objects"] += stats["objects"]
+        totals["bytes"] += stats["bytes"]
+        totals["failedObjectKeys"].extend(stats["failedObjectKeys"])
+        if last_deleted_at:
+            totals["lastDeletedAt"] = last_deleted_at.isoformat()
+        save_checkpoint(checkpoint_path, totals)
+        log(
+            f"Recycle bin page {totals['pages']}: episodes={stats['podcasts']} "
+            f"docs={stats['documents']} objects={stats['objects']} bytes={stats['bytes']}"
+        )
+
+        if len(snapshots) < limit:
+            finished = True
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    if finished and checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    totals["finished"] = finished
+    return totals
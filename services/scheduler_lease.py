@@ -0,0 +1,84 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+SCHEDULER_LEASES = "schedulerLeases"
+
+
+def _owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class FirestoreLease:
+    """
+    Time-limited lease at schedulerLeases/{name}, so one process across all
+    gunicorn workers and instances runs a periodic job. The holder renews it
+    on every run; when the holder dies another process takes over once the
+    lease has expired.
+    """
+
+    def __init__(self, db, name, ttl_seconds, owner=None):
+        self._db = db
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.owner = owner or _owner_id()
+
+    def acquire(self):
+        """Take or renew the lease; False when another live process holds it."""
+        from firebase_admin import firestore
+
+        ref = self._db.collection(SCHEDULER_LEASES).document(self.name)
+
+        @firestore.transactional
+        def _take(transaction):
+            snap = ref.get(transaction=transaction)
+            data = (snap.to_dict() or {}) if snap.exists else {}
+            now = datetime.now(timezone.utc)
+            expires_at = data.get("expiresAt")
+            if data.get("owner") not in (None, self.owner) and expires_at and expires_at > now:
+                return False
+            transaction.set(ref, {
+                "owner": self.owner,
+                "expiresAt": now + timedelta(seconds=self.ttl_seconds),
+                "renewedAt": now,
+            })
+            return True
+
+        try:
+            return _take(self._db.transaction())
+        except Exception as exc:
+            print(f"Scheduler lease {self.name} unavailable: {exc}")
+            return False
+
+
+class HostLock:
+    """
+    Exclusive flock on a local file, for jobs whose output lives on this
+    host's disk (each instance needs one runner, its workers only one). Held
+    until the process exits. Where flock is unavailable (Windows dev) every
+    acquire succeeds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._handle = None
+
+    def acquire(self):
+        if self._handle is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        handle = open(self.path, "a+")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
@@ -0,0 +1,220 @@
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+
+# Payloads at or above this size are zlib-compressed before they hit the store.
+COMPRESS_THRESHOLD = 1024
+DEFAULT_MAX_BYTES = 256 * 1024
+
+
+class SessionSerializer:
+    """
+    Flask's tagged JSON (handles datetime, bytes, tuples, Markup...) instead of
+    pickle, with a one-byte header: b"j" raw JSON, b"z" zlib-compressed JSON.
+    """
+
+    def __init__(self, compress_threshold=COMPRESS_THRESHOLD):
+        self.compress_threshold = compress_threshold
+        self._json = TaggedJSONSerializer()
+
+    def dumps(self, data):
+        raw = self._json.dumps(dict(data)).encode("utf-8")
+        if len(raw) >= self.compress_threshold:
+            return b"z" + zlib.compress(raw, 6)
+        return b"j" + raw
+
+    def loads(self, payload):
+        if not payload:
+            return {}
+        kind, body = payload[:1], payload[1:]
+        if kind == b"z":
+            body = zlib.decompress(body)
+        elif kind != b"j":
+            raise ValueError("unknown session payload encoding")
+        return self._json.loads(body.decode("utf-8"))
+
+
+class RedisSessionStore:
+    """Sessions as plain Redis strings; Redis key expiry is the garbage collector."""
+
+    def __init__(self, client, prefix="wecast:session:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, sid):
+        return self.client.get(self.prefix + sid)
+
+    def set(self, sid, payload, ttl_seconds):
+        self.client.set(self.prefix + sid, payload, ex=ttl_seconds)
+
+    def touch(self, sid, ttl_seconds):
+        self.client.expire(self.prefix + sid, ttl_seconds)
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def purge_expired(self):
+        return 0
+
+
+class SqliteSessionStore:
+    """
+    Single-file store for local runs and multi-worker setups on one host.
+    Expired rows are ignored on read and removed by purge_expired().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, data BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, sid, payload, ttl_seconds):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+            (sid, sqlite3.Binary(payload), time.time() + ttl_seconds),
+        )
+
+    def touch(self, sid, ttl_seconds):
+        self._conn().execute(
+            "UPDATE sessions SET expires_at = ? WHERE id = ?", (time.time() + ttl_seconds, sid)
+        )
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM sessions WHERE id = ?", (sid,))
+
+    def purge_expired(self):
+        return self._conn().execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class StoredSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid="", new=False):
+        def on_update(_):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class StoreSessionInterface(SessionInterface):
+    """
+    Server-side sessions in any store with get/set/touch/delete/purge_expired.
+
+    The cookie carries only a signed random id. Payloads larger than max_bytes
+    are passed to shrink(data) (which may drop bulky optional keys); if the
+    payload is still too large the write is skipped and the previous
+    version kept. Stores without native expiry are purged on roughly
+    gc_probability of writes.
+    """
+
+    def __init__(self, store, *, ttl_seconds, max_bytes=DEFAULT_MAX_BYTES, shrink=None, gc_probability=0.01, serializer=None):
+        self.store = store
+        self.ttl_seconds = int(ttl_seconds)
+        self.max_bytes = max_bytes
+        self.shrink = shrink
+        self.gc_probability = gc_probability
+        self.serializer = serializer or SessionSerializer()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="wecast-session", key_derivation="hmac")
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode("utf-8")
+            except BadSignature:
+                sid = ""
+            if sid:
+                try:
+                    payload = self.store.get(sid)
+                    if payload is not None:
+                        return StoredSession(self.serializer.loads(payload), sid=sid)
+                except Exception as exc:
+                    print(f"Session load failed: {exc}")
+        return StoredSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        cookie_name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(cookie_name, domain=domain, path=path)
+            return
+
+        if session.modified:
+            payload = self.serializer.dumps(session)
+            if len(payload) > self.max_bytes and self.shrink and self.shrink(session):
+                payload = self.serializer.dumps(session)
+            if len(payload) > self.max_bytes:
+                print(f"Session {session.sid[:8]} is {len(payload)} bytes (limit {self.max_bytes}); not saved")
+                return
+            self.store.set(session.sid, payload, self.ttl_seconds)
+            if self.gc_probability and random.random() < self.gc_probability:
+                try:
+                    self.store.purge_expired()
+                except Exception as exc:
+                    print(f"Session purge failed: {exc}")
+        elif not session.new:
+            # Sliding expiry for sessions that are read but not written.
+            self.store.touch(session.sid, self.ttl_seconds)
+            if not self.should_set_cookie(app, session):
+                return
+
+        response.set_cookie(
+            cookie_name,
+            self._signer(app).sign(session.sid).decode("utf-8"),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def session_store_from_env(backend):
+    """Build the store for WECAST_SESSION_BACKEND=redis|sqlite."""
+    if backend == "redis":
+        import redis
+
+        url = (os.getenv("WECAST_REDIS_URL") or os.getenv("REDIS_URL") or "").strip()
+        if not url:
+            raise RuntimeError("WECAST_SESSION_BACKEND=redis requires WECAST_REDIS_URL or REDIS_URL.")
+        return RedisSessionStore(redis.Redis.from_url(url))
+    if backend == "sqlite":
+        return SqliteSessionStore(os.getenv("WECAST_SESSION_SQLITE_PATH") or "./.flask_session.sqlite3")
+    raise RuntimeError(f"Unknown session backend: {backend}")
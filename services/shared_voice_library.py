@@ -0,0 +1,230 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+
+SHARED_VOICES_URL = "https://api.elevenlabs.io/v1/shared-voices"
+SHARED_VOICES_PAGE_SIZE = 100
+FACET_FIELDS = ("language", "locale", "accent", "age", "use_case", "category", "gender", "descriptive")
+# Fields that also appear per entry in verified_languages.
+VERIFIED_LANGUAGE_FIELDS = ("language", "locale", "accent")
+SEARCH_FIELDS = ("name", "description", "descriptive", "accent", "use_case")
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _key(value):
+    return str(value or "").strip().lower()
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(str(text or "").lower())
+
+
+def fetch_shared_voice_library(headers, *, page_size=SHARED_VOICES_PAGE_SIZE, max_pages=None, pause_seconds=0.0, log=print):
+    """
+    Page through ElevenLabs GET /v1/shared-voices and return the raw voice dicts.
+    Raises RuntimeError on an upstream error so a failed sync never replaces a good mirror.
+    """
+    voices = []
+    seen = set()
+    page = 0
+    while max_pages is None or page < max_pages:
+        r = requests.get(
+            SHARED_VOICES_URL,
+            headers=headers,
+            params=[("page", page), ("page_size", page_size)],
+            timeout=45,
+        )
+        if not r.ok:
+            raise RuntimeError(f"ElevenLabs shared-voices error {r.status_code}: {r.text[:300]}")
+        data = r.json() or {}
+        for voice in data.get("voices") or []:
+            voice_id = str(voice.get("voice_id") or "").strip()
+            if voice_id and voice_id not in seen:
+                seen.add(voice_id)
+                voices.append(voice)
+        page += 1
+        if page % 20 == 0:
+            log(f"Shared voice sync: {len(voices)} voices after {page} pages")
+        if not data.get("has_more"):
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return voices
+
+
+class SharedVoiceIndex:
+    """
+    Inverted index over a mirrored shared voice library.
+
+    Postings map (field, lowercased value) to voice positions, so filtering is
+    set intersection and facet counts are exact over the whole library.
+    normalize(raw) produces the /api/voices item returned to clients; it runs
+    once per voice at build time.
+    """
+
+    def __init__(self, raw_voices, *, normalize=None, synced_at=""):
+        self.synced_at = synced_at
+        self.items = []
+        self.postings = {field: {} for field in FACET_FIELDS}
+        self.display = {field: {} for field in FACET_FIELDS}
+        self.text_postings = {}
+
+        for position, raw in enumerate(raw_voices or []):
+            self.items.append(normalize(raw) if normalize else raw)
+            values = {field: {raw.get(field)} for field in FACET_FIELDS}
+            for verified in raw.get("verified_languages") or []:
+                if isinstance(verified, dict):
+                    for field in VERIFIED_LANGUAGE_FIELDS:
+                        values[field].add(verified.get(field))
+            for field, raw_values in values.items():
+                for raw_value in raw_values:
+                    value_key = _key(raw_value)
+                    if not value_key:
+                        continue
+                    self.postings[field].setdefault(value_key, set()).add(position)
+                    self.display[field].setdefault(value_key, str(raw_value).strip())
+
+            for field in SEARCH_FIELDS:
+                for token in _tokens(raw.get(field)):
+                    self.text_postings.setdefault(token, set()).add(position)
+
+        self._vocabulary = sorted(self.text_postings)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _search_positions(self, text):
+        positions = None
+        for term in _tokens(text):
+            matched = set()
+            # Prefix match so "nar" finds "narration" while the user is typing.
+            start = self._bisect(term)
+            for token in self._vocabulary[start:]:
+                if not token.startswith(term):
+                    break
+                matched |= self.text_postings[token]
+            positions = matched if positions is None else positions & matched
+            if not positions:
+                return set()
+        return positions
+
+    def _bisect(self, term):
+        lo, hi = 0, len(self._vocabulary)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._vocabulary[mid] < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, *, filters=None, search="", any_of=None, page=0, page_size=50):
+        """
+        filters: {field: value} matched exactly; any_of: {field: [values]} where
+        one value must match (use_cases, descriptives). Returns (items, total).
+        Results keep the upstream library order.
+        """
+        selected = None
+
+        def _narrow(positions):
+            nonlocal selected
+            selected = set(positions) if selected is None else selected & positions
+
+        for field, value in (filters or {}).items():
+            value_key = _key(value)
+            if value_key:
+                _narrow(self.postings.get(field, {}).get(value_key) or set())
+        for field, values in (any_of or {}).items():
+            keys = [_key(v) for v in values or [] if _key(v)]
+            if keys:
+                union = set()
+                for value_key in keys:
+                    union |= self.postings.get(field, {}).get(value_key) or set()
+                _narrow(union)
+        if str(search or "").strip():
+            _narrow(self._search_positions(search))
+
+        ordered = range(len(self.items)) if selected is None else sorted(selected)
+        ordered = list(ordered)
+        start = max(0, page) * page_size
+        return [self.items[pos] for pos in ordered[start:start + page_size]], len(ordered)
+
+    def facets(self):
+        """Exact value counts per facet field, keyed by the display value."""
+        out = {}
+        for field, values in self.postings.items():
+            out[field] = {
+                self.display[field][value_key]: len(positions)
+                for value_key, positions in values.items()
+            }
+        return out
+
+
+def save_mirror(path, raw_voices, synced_at=None):
+    synced_at = synced_at or datetime.now(timezone.utc).isoformat()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"syncedAt": synced_at, "voices": list(raw_voices or [])}, fh)
+    os.replace(tmp_path, path)
+    return synced_at
+
+
+def load_mirror(path):
+    """Return (raw_voices, synced_at); empty when the mirror has not been synced yet."""
+    if not path or not os.path.exists(path):
+        return [], ""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            payload = json.load(fh) or {}
+    except Exception as exc:
+        print(f"Shared voice mirror unreadable ({path}): {exc}")
+        return [], ""
+    return list(payload.get("voices") or []), str(payload.get("syncedAt") or "")
+
+
+class SharedVoiceMirror:
+    """
+    Process-wide handle on the mirror file. The index is rebuilt only when the
+    file changes on disk, so a sync run by the CLI is picked up without a restart.
+    """
+
+    def __init__(self, path, *, normalize=None):
+        self.path = path
+        self._normalize = normalize
+        self._lock = threading.Lock()
+        self._index = None
+        self._mtime = None
+
+    def get(self):
+        """Return the current SharedVoiceIndex, or None when nothing is mirrored."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        if self._index is not None and mtime == self._mtime:
+            return self._index or None
+
+        with self._lock:
+            if self._index is None or mtime != self._mtime:
+                raw_voices, synced_at = load_mirror(self.path)
+                self._index = SharedVoiceIndex(raw_voices, normalize=self._normalize, synced_at=synced_at)
+                self._mtime = mtime
+        return self._index or None
+
+    def sync(self, headers, *, max_pages=None, pause_seconds=0.0, log=print):
+        """Fetch the full library, persist it and swap in the new index. Returns the voice count."""
+        raw_voices = fetch_shared_voice_library(headers, max_pages=max_pages, pause_seconds=pause_seconds, log=log)
+        if not raw_voices:
+            raise RuntimeError("ElevenLabs returned an empty shared voice library; keeping the old mirror.")
+        save_mirror(self.path, raw_voices)
+        self.get()
+        return len(raw_voices)
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SignedUrlCache:
+    """
+    LRU cache of presigned GET URLs keyed by (object key, expires_in).
+
+    A URL signed for expires_in seconds is handed out again until it enters
+    the refresh margin (a quarter of its lifetime, at least a minute), so
+    every client still receives a URL with most of its validity left.
+    signer(object_key, expires_in) does the actual presign.
+    """
+
+    def __init__(self, signer, *, max_entries=4096, clock=time.time):
+        self._signer = signer
+        self._max_entries = max(1, int(max_entries))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _refresh_margin(expires_in):
+        return max(60, expires_in // 4)
+
+    def get(self, object_key, expires_in=3600):
+        cache_key = (object_key, int(expires_in))
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and now < entry[1]:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Sign outside the lock; a concurrent miss for the same key just signs twice.
+        url = self._signer(object_key, int(expires_in))
+        reuse_until = now + int(expires_in) - self._refresh_margin(int(expires_in))
+        with self._lock:
+            self._entries[cache_key] = (url, reuse_until)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return url
+
+    def get_many(self, object_keys, expires_in=3600):
+        """Resolve a list view in one pass: {key: url}, each distinct key signed at most once."""
+        urls = {}
+        for object_key in object_keys or []:
+            if object_key and object_key not in urls:
+                urls[object_key] = self.get(object_key, expires_in)
+        return urls
+
+    def invalidate(self, object_key):
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == object_key]:
+                del self._entries[cache_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,178 @@
+import os
+from urllib.parse import quote
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.client import Config
+from botocore.exceptions import ClientError
+
+from services.metrics import timed
+from services.podcast_purge import delete_r2_objects
+from services.r2_uploads import upload_stream
+
+
+def _env_int(name, default):
+    try:
+        return max(1, int((os.getenv(name) or "").strip() or default))
+    except ValueError:
+        return default
+
+
+# One client is shared by every request thread and pool in the process, so the
+# connection pool has to cover the widest fan-out (purge/upload pools) at once.
+R2_MAX_POOL_CONNECTIONS = _env_int("WECAST_R2_MAX_POOL_CONNECTIONS", 32)
+R2_MAX_ATTEMPTS = _env_int("WECAST_R2_MAX_ATTEMPTS", 5)
+R2_PART_SIZE = _env_int("WECAST_R2_PART_SIZE_MB", 8) * 1024 * 1024
+R2_UPLOAD_WORKERS = _env_int("WECAST_R2_UPLOAD_WORKERS", 4)
+
+
+def build_r2_client(account_id, access_key, secret_key, *, max_pool_connections=None):
+    """boto3 S3 client for R2; boto3 clients are thread-safe and meant to be shared."""
+    return boto3.client(
+        "s3",
+        endpoint_url=f"https://{account_id}.r2.cloudflarestorage.com",
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=max_pool_connections or R2_MAX_POOL_CONNECTIONS,
+            retries={"mode": "adaptive", "max_attempts": R2_MAX_ATTEMPTS},
+            connect_timeout=10,
+            read_timeout=60,
+            tcp_keepalive=True,
+        ),
+        region_name="auto",
+    )
+
+
+def transfer_config():
+    return TransferConfig(
+        multipart_threshold=R2_PART_SIZE,
+        multipart_chunksize=R2_PART_SIZE,
+        max_concurrency=R2_UPLOAD_WORKERS,
+        use_threads=True,
+    )
+
+
+class R2Storage:
+    """Bucket-bound helpers shared by the web app and the maintenance scripts."""
+
+    def __init__(self, client, bucket_name, public_base_url=""):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.public_base_url = (public_base_url or "").strip().rstrip("/")
+
+    @timed("r2", "put")
+    def upload_bytes(self, data, object_key, content_type):
+        self.client.put_object(
+            Bucket=self.bucket_name,
+            Key=object_key,
+            Body=data,
+            ContentType=content_type,
+        )
+        return object_key
+
+    @timed("r2", "put_file")
+    def upload_file(self, source, object_key, content_type):
+        """Upload a path or seekable file object; large files go multipart per transfer_config()."""
+        extra_args = {"ContentType": content_type}
+        if isinstance(source, (str, os.PathLike)):
+            self.client.upload_file(str(source), self.bucket_name, object_key, ExtraArgs=extra_args, Config=transfer_config())
+        else:
+            self.client.upload_fileobj(source, self.bucket_name, object_key, ExtraArgs=extra_args, Config=transfer_config())
+        return object_key
+
+    @timed("r2", "put_stream")
+    def upload_stream(self, source, object_key, content_type, state_path=""):
+        """Upload a non-seekable stream or chunk iterator (see services.r2_uploads)."""
+        upload_stream(
+            self.client,
+            self.bucket_name,
+            object_key,
+            source,
+            content_type=content_type,
+            part_size=R2_PART_SIZE,
+            max_workers=R2_UPLOAD_WORKERS,
+            state_path=state_path,
+        )
+        return object_key
+
+    @timed("r2", "delete")
+    def delete(self, object_key):
+        self.client.delete_object(Bucket=self.bucket_name, Key=object_key)
+
+    @timed("r2", "delete_many")
+    def delete_many(self, object_keys, *, label="R2 cleanup"):
+        """Bulk delete; returns (deleted_count, failed_keys) and never raises."""
+        return delete_r2_objects(self.client, self.bucket_name, object_keys, label=label)
+
+    @timed("r2", "presign")
+    def presign(self, object_key, expires_in=3600, **params):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": object_key, **params},
+            ExpiresIn=expires_in,
+        )
+
+    @timed("r2", "presign_put")
+    def presign_put(self, object_key, content_type, expires_in=600):
+        """URL the browser can PUT the object to directly; Content-Type is part of the signature."""
+        return self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket_name, "Key": object_key, "ContentType": content_type},
+            ExpiresIn=expires_in,
+        )
+
+    @timed("r2", "get_range")
+    def read_range(self, object_key, start, end):
+        """Bytes start..end (inclusive) of an object, for header probes."""
+        obj = self.client.get_object(Bucket=self.bucket_name, Key=object_key, Range=f"bytes={start}-{end}")
+        try:
+            return obj["Body"].read()
+        finally:
+            obj["Body"].close()
+
+    def asset_url(self, object_key, expires_in=3600):
+        normalized_key = str(object_key or "").strip().lstrip("/")
+        if not normalized_key:
+            return ""
+        if self.public_base_url:
+            return f"{self.public_base_url}/{quote(normalized_key, safe='/')}"
+        return self.presign(normalized_key, expires_in=expires_in)
+
+    @timed("r2", "head")
+    def head(self, object_key):
+        """head_object metadata, or None when the object does not exist."""
+        try:
+            return self.client.head_object(Bucket=self.bucket_name, Key=object_key)
+        except ClientError as exc:
+            status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status == 404 or (exc.response.get("Error") or {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                return None
+            raise
+
+    def exists(self, object_key):
+        return bool(object_key) and self.head(object_key) is not None
+
+
+def storage_from_env(required=True):
+    """
+    Build R2Storage from R2_ACCOUNT_ID / R2_ACCESS_KEY_ID / R2_SECRET_ACCESS_KEY /
+    R2_BUCKET_NAME (and optional R2_PUBLIC_BASE_URL). Returns None when the
+    variables are missing and required is False.
+    """
+    account_id = (os.getenv("R2_ACCOUNT_ID") or "").strip()
+    access_key = (os.getenv("R2_ACCESS_KEY_ID") or "").strip()
+    secret_key = (os.getenv("R2_SECRET_ACCESS_KEY") or "").strip()
+    bucket_name = (os.getenv("R2_BUCKET_NAME") or "").strip()
+
+    if not all([account_id, access_key, secret_key, bucket_name]):
+        if required:
+            raise RuntimeError("Missing R2 environment variables.")
+        return None
+
+    return R2Storage(
+        build_r2_client(account_id, access_key, secret_key),
+        bucket_name,
+        public_base_url=os.getenv("R2_PUBLIC_BASE_URL") or "",
+    )
@@ -0,0 +1,256 @@
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+
+_current_span = contextvars.ContextVar("wecast_current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, name, trace_id, parent_id="", attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = ""
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "durationMs": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Nested spans for one request or job, handed to the exporters as a whole
+    trace when its root span ends. With no exporters span() does nothing.
+    """
+
+    def __init__(self, exporters=()):
+        self.exporters = list(exporters)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.exporters)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        if not self.exporters:
+            yield NOOP_SPAN
+            return
+        parent = _current_span.get()
+        span = Span(name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else "", attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.error = f"{type(exc).__name__}: {exc}"[:500]
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self._finish(span, is_root=parent is None)
+
+    def _finish(self, span, is_root):
+        with self._lock:
+            spans = self._pending.setdefault(span.trace_id, [])
+            spans.append(span)
+            if not is_root:
+                return
+            spans = self._pending.pop(span.trace_id)
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as exc:
+                print(f"Trace export failed ({type(exporter).__name__}): {exc}")
+
+
+def current_span():
+    """The active span, or a no-op stand-in, for adding attributes from deep inside a call."""
+    return _current_span.get() or NOOP_SPAN
+
+
+class JsonLinesExporter:
+    """One JSON object per span, appended to a local file for offline analysis."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans):
+        lines = "".join(json.dumps(span.to_dict(), default=str, ensure_ascii=False) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class OtlpHttpExporter:
+    """
+    OTLP/HTTP JSON exporter (POST {endpoint}/v1/traces), readable by an
+    OpenTelemetry Collector, Jaeger, Tempo, Honeycomb... Sends from a
+    background thread so a slow collector never delays a response.
+    """
+
+    def __init__(self, endpoint, *, headers=None, service_name="wecast", timeout=10, max_queue=256):
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else endpoint + "/v1/traces"
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.service_name = service_name
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def export(self, spans):
+        try:
+            self._queue.put_nowait(self.payload(spans))
+        except queue.Full:
+            print("Trace export queue full; dropping trace.")
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        import requests
+
+        while True:
+            payload = self._queue.get()
+            try:
+                response = requests.post(self.url, data=json.dumps(payload), headers=self.headers, timeout=self.timeout)
+                if response.status_code >= 300:
+                    print(f"OTLP export rejected: {response.status_code} {response.text[:200]}")
+            except Exception as exc:
+                print(f"OTLP export failed: {exc}")
+
+    def payload(self, spans):
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "wecast"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }],
+        }
+
+
+def _otlp_span(span):
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.status == "error" else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _parse_otlp_headers(raw):
+    headers = {}
+    for item in (raw or "").split(","):
+        key, _, value = item.partition("=")
+        if key.strip() and value.strip():
+            headers[key.strip()] = value.strip()
+    return headers
+
+
+def tracer_from_env():
+    """
+    WECAST_TRACE_EXPORTERS is a comma list of "jsonl" and/or "otlp".
+    jsonl writes to WECAST_TRACE_JSONL_PATH; otlp posts to
+    OTEL_EXPORTER_OTLP_ENDPOINT with OTEL_EXPORTER_OTLP_HEADERS.
+    """
+    names = {name.strip().lower() for name in (os.getenv("WECAST_TRACE_EXPORTERS") or "").split(",") if name.strip()}
+    exporters = []
+    if "jsonl" in names:
+        exporters.append(JsonLinesExporter(os.getenv("WECAST_TRACE_JSONL_PATH") or "./.wecast_traces.jsonl"))
+    if "otlp" in names:
+        endpoint = (os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or "").strip()
+        if endpoint:
+            exporters.append(OtlpHttpExporter(
+                endpoint,
+                headers=_parse_otlp_headers(os.getenv("OTEL_EXPORTER_OTLP_HEADERS")),
+                service_name=(os.getenv("OTEL_SERVICE_NAME") or "wecast").strip(),
+            ))
+        else:
+            print("WECAST_TRACE_EXPORTERS includes otlp but OTEL_EXPORTER_OTLP_ENDPOINT is not set.")
+    return Tracer(exporters)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Process-wide tracer, configured from the environment on first use."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = tracer_from_env()
+    return _tracer
+
+
+def span(name, **attributes):
+    """`with span("encode", format="mp3") as s: ...` on the process-wide tracer."""
+    return get_tracer().span(name, **attributes)
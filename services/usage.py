@@ -0,0 +1,334 @@
+import atexit
+import contextvars
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+# List prices in USD. OpenAI models are per 1M tokens (matched by longest
+# prefix, so dated snapshots like gpt-4o-2024-08-06 resolve); images are per
+# generation by size. WECAST_USAGE_PRICES (JSON, same shape) overrides entries.
+DEFAULT_PRICES = {
+    "elevenlabs": {"usdPer1kChars": 0.30},
+    "openai": {
+        "gpt-4o": {"input": 2.50, "output": 10.00},
+        "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+        "gpt-3.5-turbo": {"input": 0.50, "output": 1.50},
+    },
+    "images": {
+        "gpt-image-1": {"1024x1024": 0.042, "1024x1536": 0.063, "1536x1024": 0.063},
+    },
+}
+
+USAGE_PODCASTS = "usagePodcasts"
+USAGE_USERS = "usageUsers"
+USAGE_DAYS = "usageDaily"
+
+# Who the current request's paid calls belong to; reset per request.
+_scope = contextvars.ContextVar("wecast_usage_scope", default=None)
+
+
+def _merge_prices(base, override):
+    merged = dict(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_prices(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def prices_from_env():
+    raw = (os.getenv("WECAST_USAGE_PRICES") or "").strip()
+    if not raw:
+        return DEFAULT_PRICES
+    try:
+        return _merge_prices(DEFAULT_PRICES, json.loads(raw))
+    except ValueError as exc:
+        print(f"Ignoring invalid WECAST_USAGE_PRICES: {exc}")
+        return DEFAULT_PRICES
+
+
+def _model_prices(table, model):
+    model = (model or "").strip()
+    matches = [name for name in table if model == name or model.startswith(name + "-")]
+    return table[max(matches, key=len)] if matches else None
+
+
+def _doc_id(value):
+    return str(value or "").strip().replace("/", "_")
+
+
+class UsageMeter:
+    """
+    Billable usage (ElevenLabs characters, OpenAI tokens, image generations)
+    and the spend avoided by cache hits, rolled up per podcast, per user and
+    per UTC day.
+
+    Calls only add to in-memory totals; a background thread writes them as
+    Increment merges in one Firestore batch every `flush_seconds`, or sooner
+    once `flush_events` calls are pending. A failed flush keeps its totals for
+    the next attempt. `get_db` is called on every flush, so the meter writes
+    to whatever Firestore client the app holds at that moment.
+    """
+
+    def __init__(self, get_db, *, prices=None, flush_seconds=30, flush_events=50, resolve_user=None):
+        self._get_db = get_db
+        self.prices = prices or DEFAULT_PRICES
+        self.flush_seconds = flush_seconds
+        self.flush_events = flush_events
+        self.resolve_user = resolve_user
+        self._pending = {}
+        self._pending_events = 0
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    # ---------------- costs ----------------
+    def tts_cost(self, characters):
+        return characters / 1000.0 * float(self.prices["elevenlabs"].get("usdPer1kChars") or 0)
+
+    def chat_cost(self, model, prompt_tokens, completion_tokens):
+        price = _model_prices(self.prices["openai"], model)
+        if not price:
+            return 0.0
+        return (prompt_tokens * float(price.get("input") or 0) + completion_tokens * float(price.get("output") or 0)) / 1e6
+
+    def image_cost(self, model, size, count=1):
+        price = _model_prices(self.prices["images"], model) or {}
+        return count * float(price.get(size) or 0)
+
+    # ---------------- recording ----------------
+    def _attribution(self):
+        scope = _scope.get()
+        user_id = scope["userId"] if scope else ""
+        if not user_id and self.resolve_user is not None:
+            try:
+                from flask import has_request_context
+
+                if has_request_context():
+                    user_id = self.resolve_user() or ""
+                    if scope is not None:
+                        scope["userId"] = user_id
+            except Exception:
+                user_id = ""
+        return scope, user_id, scope["podcastId"] if scope else ""
+
+    def record(self, operation, counters, cost=0.0, *, saved=False):
+        """
+        Add one call's counters (e.g. {"ttsCharacters": 812, "ttsRequests": 1})
+        and its cost. With saved=True the cost is spend a cache hit avoided.
+        """
+        counters = dict(counters)
+        counters["savedCostUsd" if saved else "costUsd"] = cost
+        scope, user_id, podcast_id = self._attribution()
+        targets = [(USAGE_DAYS, datetime.now(timezone.utc).date().isoformat(), {})]
+        if user_id:
+            targets.append((USAGE_USERS, _doc_id(user_id), {"userId": user_id}))
+        if podcast_id:
+            targets.append((USAGE_PODCASTS, _doc_id(podcast_id), {"podcastId": podcast_id, "userId": user_id}))
+        elif scope is not None:
+            # Charged before the podcast exists (script generation); added to
+            # the podcast rollup once bind_usage() learns its id.
+            scope["unassigned"].append((operation, counters, saved))
+        self._add(targets, operation, counters, saved)
+
+    def _add(self, targets, operation, counters, saved):
+        with self._lock:
+            for collection, doc_id, meta in targets:
+                entry = self._pending.setdefault((collection, doc_id), {"counters": {}, "operations": {}, "meta": {}})
+                for field, value in counters.items():
+                    entry["counters"][field] = entry["counters"].get(field, 0) + value
+                op = entry["operations"].setdefault(operation, {"calls": 0, "costUsd": 0.0, "savedCostUsd": 0.0})
+                op["calls"] += 1
+                op["savedCostUsd" if saved else "costUsd"] += counters["savedCostUsd" if saved else "costUsd"]
+                entry["meta"].update({key: value for key, value in meta.items() if value})
+            self._pending_events += 1
+            due = self._pending_events >= self.flush_events
+        self._ensure_flusher()
+        if due:
+            self._wake.set()
+
+    def assign_podcast(self, scope, podcast_id):
+        events, scope["unassigned"] = scope["unassigned"], []
+        target = [(USAGE_PODCASTS, _doc_id(podcast_id), {"podcastId": podcast_id, "userId": scope["userId"]})]
+        for operation, counters, saved in events:
+            self._add(target, operation, counters, saved)
+
+    # ---------------- flushing ----------------
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write pending totals now; returns the number of rollup docs written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_events = 0
+        if not pending:
+            return 0
+
+        from firebase_admin import firestore
+        from services.firestore_writes import FirestoreUnitOfWork
+
+        try:
+            db = self._get_db()
+            uow = FirestoreUnitOfWork(db)
+            for (collection, doc_id), entry in pending.items():
+                payload = {field: firestore.Increment(value) for field, value in entry["counters"].items() if value}
+                payload["byOperation"] = {
+                    operation: {field: firestore.Increment(value) for field, value in totals.items() if value}
+                    for operation, totals in entry["operations"].items()
+                }
+                payload.update(entry["meta"])
+                payload["updatedAt"] = firestore.SERVER_TIMESTAMP
+                uow.set(db.collection(collection).document(doc_id), payload, merge=True)
+            return uow.commit()
+        except Exception as exc:
+            print(f"Usage flush failed ({len(pending)} rollups kept for retry): {exc}")
+            with self._lock:
+                for key, entry in pending.items():
+                    current = self._pending.setdefault(key, {"counters": {}, "operations": {}, "meta": {}})
+                    for field, value in entry["counters"].items():
+                        current["counters"][field] = current["counters"].get(field, 0) + value
+                    for operation, totals in entry["operations"].items():
+                        op = current["operations"].setdefault(operation, {"calls": 0, "costUsd": 0.0, "savedCostUsd": 0.0})
+                        for field, value in totals.items():
+                            op[field] += value
+                    current["meta"] = {**entry["meta"], **current["meta"]}
+            return 0
+
+
+_meter = None
+
+
+def configure_usage(get_db, **options):
+    """Install the process-wide meter; until then every record_* call is a no-op."""
+    global _meter
+    _meter = UsageMeter(get_db, **options)
+    atexit.register(_meter.flush)
+    return _meter
+
+
+def get_meter():
+    return _meter
+
+
+def install_usage_scope(app):
+    """Start every request with no attribution; handlers fill it via bind_usage()."""
+
+    @app.before_request
+    def _usage_scope_start():
+        _scope.set(None)
+
+
+def bind_usage(*, user_id="", podcast_id=""):
+    """Attribute the rest of this request's paid calls to a user and/or podcast."""
+    if _meter is None:
+        return
+    scope = _scope.get()
+    if scope is None:
+        scope = {"userId": "", "podcastId": "", "unassigned": []}
+        _scope.set(scope)
+    if user_id:
+        scope["userId"] = user_id
+    if podcast_id and podcast_id != scope["podcastId"]:
+        scope["podcastId"] = podcast_id
+        if scope["unassigned"]:
+            _meter.assign_podcast(scope, podcast_id)
+
+
+def record_tts(characters, *, operation="tts"):
+    """ElevenLabs bills every character of the text sent."""
+    meter = _meter
+    if meter is None or characters <= 0:
+        return
+    meter.record(operation, {"ttsCharacters": characters, "ttsRequests": 1}, meter.tts_cost(characters))
+
+
+def record_chat(response, *, operation):
+    """Prompt/completion tokens from a chat.completions response."""
+    meter = _meter
+    usage = getattr(response, "usage", None)
+    if meter is None or usage is None:
+        return
+    prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+    completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+    model = getattr(response, "model", "") or ""
+    meter.record(
+        operation,
+        {"chatCalls": 1, "promptTokens": prompt_tokens, "completionTokens": completion_tokens},
+        meter.chat_cost(model, prompt_tokens, completion_tokens),
+    )
+
+
+def record_image(model, size, *, operation="cover", count=1):
+    meter = _meter
+    if meter is None:
+        return
+    meter.record(operation, {"imageGenerations": count}, meter.image_cost(model, size, count))
+
+
+def record_tts_cache_hit(characters, *, operation):
+    """A cached clip served instead of synthesizing `characters` again."""
+    meter = _meter
+    if meter is None or characters <= 0:
+        return
+    meter.record(
+        operation,
+        {"cacheHits": 1, "savedTtsCharacters": characters},
+        meter.tts_cost(characters),
+        saved=True,
+    )
+
+
+def _rollup(snapshot):
+    data = snapshot.to_dict() or {}
+    data["id"] = snapshot.id
+    updated = data.get("updatedAt")
+    if hasattr(updated, "isoformat"):
+        data["updatedAt"] = updated.isoformat()
+    return data
+
+
+def usage_report(db, *, podcast_id="", user_id="", days=30, limit=20):
+    """What the admin endpoint returns: one rollup, or daily totals and top spenders."""
+    if podcast_id:
+        snap = db.collection(USAGE_PODCASTS).document(_doc_id(podcast_id)).get()
+        return {"podcast": _rollup(snap) if snap.exists else None}
+    if user_id:
+        snap = db.collection(USAGE_USERS).document(_doc_id(user_id)).get()
+        return {"user": _rollup(snap) if snap.exists else None}
+
+    today = datetime.now(timezone.utc).date()
+    day_refs = [db.collection(USAGE_DAYS).document((today - timedelta(days=offset)).isoformat()) for offset in range(days)]
+    daily = [_rollup(snap) for snap in db.get_all(day_refs) if snap.exists]
+    daily.sort(key=lambda row: row["id"])
+
+    def top(collection):
+        query = db.collection(collection).order_by("costUsd", direction="DESCENDING").limit(limit)
+        return [_rollup(snap) for snap in query.stream()]
+
+    totals = {}
+    for row in daily:
+        for field in ("costUsd", "savedCostUsd", "ttsCharacters", "promptTokens", "completionTokens", "imageGenerations", "cacheHits"):
+            totals[field] = totals.get(field, 0) + (row.get(field) or 0)
+    return {
+        "days": days,
+        "totals": totals,
+        "daily": daily,
+        "topUsers": top(USAGE_USERS),
+        "topPodcasts": top(USAGE_PODCASTS),
+    }
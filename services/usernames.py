@@ -0,0 +1,19 @@
+USERNAME_MAX_LENGTH = 60
+
+
+def username_reservation_problem(username):
+    """
+    Why a username cannot be reserved, or "" when it can. Shared by the app's
+    signup/profile flows and scripts/backfill_username_index.py, so both
+    accept the same reservation ids.
+    """
+    cleaned = (username or "").strip()
+    if not cleaned:
+        return "Username is required."
+    if len(cleaned) > USERNAME_MAX_LENGTH:
+        return f"Username must be {USERNAME_MAX_LENGTH} characters or fewer."
+    if "/" in cleaned or "\\" in cleaned:
+        return "Username cannot contain slashes."
+    if any(ord(ch) < 32 or ord(ch) == 127 for ch in cleaned):
+        return "Username contains unsupported characters."
+    return ""
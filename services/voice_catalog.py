@@ -0,0 +1,127 @@
+import hashlib
+import json
+import threading
+import time
+
+
+def _index_key(value):
+    return str(value or "").strip().lower()
+
+
+class VoiceCatalogSnapshot:
+    """Immutable view of one catalog load: normalized items plus lookup indexes."""
+
+    def __init__(self, items, loaded_at):
+        self.items = list(items or [])
+        self.loaded_at = loaded_at
+        self.by_gender = {}
+        self.by_language = {}
+        self.by_accent = {}
+
+        for position, item in enumerate(self.items):
+            gender = _index_key(item.get("gender"))
+            if gender:
+                self.by_gender.setdefault(gender, []).append(position)
+
+            languages = {_index_key(lang) for lang in item.get("languages") or []}
+            accents = set()
+            for profile in item.get("languageAccents") or []:
+                languages.add(_index_key(profile.get("language")))
+                accents.add(_index_key(profile.get("accent")))
+            accents.add(_index_key((item.get("labels") or {}).get("accent")))
+            for lang in languages - {""}:
+                self.by_language.setdefault(lang, []).append(position)
+            for accent in accents - {""}:
+                self.by_accent.setdefault(accent, []).append(position)
+
+        digest = hashlib.sha1(
+            json.dumps(self.items, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        self.etag = digest[:20]
+
+    def filter(self, *, gender="", language="", accent=""):
+        """Return items matching every given filter, in catalog order."""
+        selected = None
+        for index, value in (
+            (self.by_gender, gender),
+            (self.by_language, language),
+            (self.by_accent, accent),
+        ):
+            key = _index_key(value)
+            if not key:
+                continue
+            positions = set(index.get(key) or ())
+            selected = positions if selected is None else selected & positions
+        if selected is None:
+            return self.items
+        return [self.items[pos] for pos in sorted(selected)]
+
+
+class VoiceCatalog:
+    """
+    In-process voice catalog with a TTL.
+
+    loader() returns the already-normalized /api/voices items; it runs at most
+    once per TTL (or after invalidate()) no matter how many requests arrive
+    together. watch() wires a Firestore on_snapshot listener to invalidate(),
+    so edits to the source collection show up without waiting for the TTL.
+    """
+
+    def __init__(self, loader, ttl_seconds=300, name="voices"):
+        self._loader = loader
+        self._ttl_seconds = max(0, int(ttl_seconds or 0))
+        self._name = name
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._watch = None
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() < self._expires_at:
+                return snapshot
+            generation = self._generation
+            snapshot = VoiceCatalogSnapshot(self._loader(), time.time())
+            # An invalidation that raced the load keeps the result for this
+            # caller but forces the next request to reload.
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self._ttl_seconds
+            return snapshot
+
+    def invalidate(self):
+        self._generation += 1
+        self._expires_at = 0.0
+
+    def watch(self, query):
+        """Invalidate the catalog whenever query changes. Safe to call repeatedly."""
+        if self._watch is not None:
+            return
+        state = {"initial": True}
+
+        def _on_snapshot(_docs, _changes, _read_time):
+            # The first callback replays the current state; nothing changed yet.
+            if state["initial"]:
+                state["initial"] = False
+                return
+            print(f"Voice catalog '{self._name}' invalidated by Firestore change.")
+            self.invalidate()
+
+        try:
+            self._watch = query.on_snapshot(_on_snapshot)
+        except Exception as exc:
+            print(f"Voice catalog '{self._name}' watch unavailable, relying on TTL: {exc}")
+
+    def close(self):
+        if self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception:
+                pass
+            self._watch = None
@@ -3,7 +3,7 @@ import React, { useEffect, useRef, useState } from "react";
 import { createPortal } from "react-dom";
 import { LogOut, Check, AlertCircle, AlertTriangle, Save, RefreshCcw, Bell, PlayCircle, Palette, Trash2, Mail } from "lucide-react";
 import { useTranslation } from "react-i18next";
-import { API_BASE, getAuthHeaders } from "../utils/api";
+import { API_BASE, getAuthHeaders, uploadImageDirect } from "../utils/api";
 import { DEFAULT_ACCOUNT_PREFERENCES, loadAccountPreferences, saveAccountPreferences } from "../utils/accountPreferences";
 
 const getPortalTarget = () => {
@@ -375,13 +375,26 @@ export default function Account() {
         }
       }
       
+      // Send the avatar straight to storage; fall back to the form upload when unavailable.
+      let uploadedAvatarUrl = "";
+      let avatarForForm = avatarFile;
+      if (avatarFile) {
+        try {
+          const uploaded = await uploadImageDirect("avatar", avatarFile);
+          uploadedAvatarUrl = uploaded?.avatarUrl || "";
+          avatarForForm = null;
+        } catch (directError) {
+          if (directError?.code !== "direct_upload_unavailable") throw directError;
+        }
+      }
+
       // Prepare FormData for API call
       const formData = new FormData();
       formData.append('displayName', profile.displayName);
       formData.append('bio', profile.bio);
       
-      if (avatarFile) {
-        formData.append('avatar', avatarFile);
+      if (avatarForForm) {
+        formData.append('avatar', avatarForForm);
       }
 
       const res = await fetch(`${API_BASE}/api/profile/update`, {
@@ -410,7 +423,7 @@ export default function Account() {
         displayName: data.displayName || data.username || profile.displayName,
         email: data.email || profile.email,
         bio: data.bio ?? profile.bio,
-        avatarUrl: data.avatarUrl || profile.avatarUrl,
+        avatarUrl: data.avatarUrl || uploadedAvatarUrl || profile.avatarUrl,
       };
 
       const userToStore = {
@@ -988,6 +988,7 @@ useEffect(() => {
                 body: JSON.stringify({
                     voiceId,
                     text: "Hi, this is a WeCast sample.",
+                    responseType: "url",
                 }),
             });
 
@@ -999,8 +1000,7 @@ useEffect(() => {
                 return;
             }
 
-            const blob = await res.blob();
-            const url = URL.createObjectURL(blob);
+            const { url } = await res.json();
             voicePreviewCacheRef.current.set(voiceId, url);
             const audio = new Audio(url);
             voicePreviewRef.current = audio;
@@ -3071,6 +3071,7 @@ const exportScript = async (format = "pdf") => {
                                                     credentials: "include",
                                                     headers: getAuthHeaders({ "Content-Type": "application/json" }),
                                                     body: JSON.stringify({
+                                                        podcastId: currentPodcastId || undefined,
                                                         introMusic: null,
                                                         bodyMusic: null,
                                                         outroMusic: null,
@@ -3103,7 +3104,12 @@ const exportScript = async (format = "pdf") => {
                                                 method: "POST",
                                                 credentials: "include",
                                                 headers: getAuthHeaders({ "Content-Type": "application/json" }),
-                                                body: JSON.stringify({ introMusic, bodyMusic, outroMusic }),
+                                                body: JSON.stringify({
+                                                    podcastId: currentPodcastId || undefined,
+                                                    introMusic,
+                                                    bodyMusic,
+                                                    outroMusic,
+                                                }),
                                             });
                                             setStep(6);
                                         }}
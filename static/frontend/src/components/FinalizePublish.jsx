@@ -13,7 +13,7 @@ import {
   PencilLine,
 } from "lucide-react";
 import { useTranslation } from "react-i18next";
-import { apiFetch, getStoredAuthToken } from "../utils/api";
+import { apiFetch, getStoredAuthToken, uploadImageDirect } from "../utils/api";
 
 function coverPayloadHasImage(data) {
   if (!data || data.ok === false) return false;
@@ -354,13 +354,18 @@ export default function FinalizePublish() {
         return;
       }
 
-      const fd = new FormData();
-      fd.append("file", file);
-
-      const resp = await apiFetch(`/api/podcasts/${podcastId}/cover/upload`, {
-        method: "POST",
-        body: fd,
-      });
+      let resp;
+      try {
+        resp = await uploadImageDirect("cover", file, { podcastId });
+      } catch (directError) {
+        if (directError?.code !== "direct_upload_unavailable") throw directError;
+        const fd = new FormData();
+        fd.append("file", file);
+        resp = await apiFetch(`/api/podcasts/${podcastId}/cover/upload`, {
+          method: "POST",
+          body: fd,
+        });
+      }
 
       if (!coverPayloadHasImage(resp)) {
         setNotice(resp?.error || "Cover upload did not return image data.");
@@ -1153,6 +1153,7 @@ useEffect(() => {
         body: JSON.stringify({
           voiceId,
           text: "Hi, this is a WeCast sample.",
+          responseType: "url",
         }),
       });
 
@@ -1163,8 +1164,7 @@ useEffect(() => {
         return;
       }
 
-      const blob = await res.blob();
-      const url = URL.createObjectURL(blob);
+      const { url } = await res.json();
       const audio = new Audio(url);
       voicePreviewRef.current = audio;
       voicePreviewCacheRef.current.set(voiceId, url);
@@ -1597,7 +1597,7 @@ const finalizeChanges = async () => {
             "Content-Type": "application/json",
             ...getAuthHeaders(),
           },
-          body: JSON.stringify({ introMusic, bodyMusic, outroMusic }),
+          body: JSON.stringify({ podcastId, introMusic, bodyMusic, outroMusic }),
         });
       } catch (musicErr) {
         console.warn("Failed to sync music before audio generation", musicErr);
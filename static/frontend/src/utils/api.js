@@ -121,3 +121,34 @@ export async function apiFetch(path, options = {}) {
 
   return data;
 }
+
+/**
+ * Upload a cover/avatar image straight to storage with a presigned PUT, then
+ * let the API verify and attach it. Throws with code "direct_upload_unavailable"
+ * when the backend has no storage configured so callers can fall back.
+ */
+export async function uploadImageDirect(kind, file, extra = {}) {
+  const contentType = (file?.type || "").toLowerCase();
+  const presign = await apiFetch("/api/uploads/presign", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ kind, contentType, size: file?.size || 0, ...extra }),
+  });
+
+  const put = await fetch(presign.uploadUrl, {
+    method: presign.method || "PUT",
+    headers: presign.headers || { "Content-Type": contentType },
+    body: file,
+  });
+  if (!put.ok) {
+    const err = new Error("Image upload failed");
+    err.status = put.status;
+    throw err;
+  }
+
+  return apiFetch("/api/uploads/complete", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ kind, objectKey: presign.objectKey, ...extra }),
+  });
+}
@@ -0,0 +1,9 @@
+"""
+Request-independent WeCast logic: script parsing, word timelines, chapters,
+TTS rendering and R2 storage.
+
+Nothing here touches Flask, the session or app.py globals, so workers,
+scripts and benchmarks can import it directly (including from process
+pools). Modules are imported individually to keep start-up cheap, e.g.
+``from wecast_core.chapters import build_chapters``.
+"""
@@ -0,0 +1,148 @@
+"""Player chapters from a word timeline, optionally proposed by an OpenAI chat model."""
+import json
+import re
+
+from services.usage import record_chat
+from wecast_core.script import is_arabic
+from wecast_core.timeline import find_anchor_start_sec
+
+
+def fallback_time_split_chapters(word_timeline, language: str = "en"):
+    if not word_timeline:
+        return []
+
+    duration = float(word_timeline[-1]["end"])
+    cuts = [0.0, duration * 0.22, duration * 0.45, duration * 0.7, duration * 0.88]
+
+    if language == "ar":
+        titles = [
+            "\u0627\u0644\u0645\u0642\u062f\u0645\u0629",
+            "\u0627\u0644\u062e\u0644\u0641\u064a\u0629",
+            "\u0623\u0647\u0645 \u0627\u0644\u0646\u0642\u0627\u0634\u0627\u062a",
+            "\u0646\u0642\u0627\u0637 \u062a\u062d\u0648\u0644",
+            "\u0627\u0644\u062e\u0627\u062a\u0645\u0629",
+        ]
+    else:
+        titles = ["Opening", "Background", "Key Discussion", "Turning Points", "Wrap-Up"]
+    out = [{"title": t, "startSec": float(c)} for t, c in zip(titles, cuts)]
+    return out
+
+
+def sanitize_chapter_titles(chapters, language: str = "en"):
+    items = list(chapters or [])
+    if language != "ar" or not items:
+        return items
+
+    fallback_titles = [c["title"] for c in fallback_time_split_chapters(
+        [{"end": float(idx + 1)} for idx in range(max(len(items), 5))], language="ar"
+    )]
+
+    sanitized = []
+    for idx, chapter in enumerate(items):
+        title = str((chapter or {}).get("title") or "").strip()
+        start_sec = float((chapter or {}).get("startSec") or 0.0)
+        looks_broken = (
+            not title
+            or re.fullmatch(r"[\?\u061F\s]+", title) is not None
+            or ("?" in title and not is_arabic(title))
+        )
+        sanitized.append({
+            "title": fallback_titles[idx] if looks_broken and idx < len(fallback_titles) else title,
+            "startSec": start_sec,
+        })
+
+    return sanitized
+
+
+def generate_chapters_from_transcript(transcript_text: str, language: str = "en", *, client):
+    """Ask the chat model for titled anchors; `client` is an OpenAI client."""
+    if language == "ar":
+        user_prompt = f"""
+Split this podcast transcript into podcast chapters for a player.
+Return 5 to 7 chapters.
+For each chapter:
+- title: short (2-6 words) in Arabic.
+- anchor: a short phrase (4-12 words) that appears in the transcript and starts that section (must be nearly exact text). Keep the anchor in the transcript's original language.
+
+Return JSON only:
+{{"chapters":[{{"title":"...","anchor":"..."}}, ...]}}
+
+Transcript:
+\"\"\"{transcript_text[:12000]}\"\"\"
+"""
+    else:
+        user_prompt = f"""
+Split this podcast transcript into podcast chapters for a player.
+Return 5 to 7 chapters.
+For each chapter:
+- title: short (2-6 words)
+- anchor: a short phrase (4-12 words) that appears in the transcript and starts that section (must be nearly exact text)
+
+Return JSON only:
+{{"chapters":[{{"title":"...","anchor":"..."}}, ...]}}
+
+Transcript:
+\"\"\"{transcript_text[:12000]}\"\"\"
+"""
+
+    resp = client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "Return strict JSON only. No markdown."},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.3,
+    )
+    record_chat(resp, operation="chapters")
+
+    raw = (resp.choices[0].message.content or "").strip()
+    # naive JSON parse
+    try:
+        data = json.loads(raw)
+        return data.get("chapters") or []
+    except Exception:
+        return []
+
+
+def build_chapters(word_timeline, transcript_text, language="en", client=None):
+    """
+    Chapters anchored to the word timeline. Without an OpenAI `client` (offline
+    jobs, benchmarks) this goes straight to the deterministic time split.
+    """
+    proposed = []
+    if client is not None:
+        try:
+            proposed = generate_chapters_from_transcript(transcript_text, language=language, client=client)
+        except Exception as exc:
+            print(f"Chapter generation failed, using fallback: {exc}")
+            proposed = []
+
+    chapters = []
+    used = set()
+
+    for ch in proposed:
+        title = (ch.get("title") or "").strip()
+        anchor = (ch.get("anchor") or "").strip()
+        if not title or not anchor:
+            continue
+
+        start = find_anchor_start_sec(word_timeline, anchor)
+        if start is None:
+            continue
+
+        # avoid duplicates / too-close chapters
+        key = round(start, 2)
+        if key in used:
+            continue
+        used.add(key)
+
+        chapters.append({"title": title, "startSec": start})
+
+    chapters.sort(key=lambda x: x["startSec"])
+
+    # Guardrails: must be actual chapters‌
+    # If fewer than 5 chapters, fallback to deterministic time split
+    if len(chapters) < 5:
+        chapters = fallback_time_split_chapters(word_timeline, language=language)
+
+    return sanitize_chapter_titles(chapters, language=language)
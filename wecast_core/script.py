@@ -0,0 +1,179 @@
+"""Script parsing and validation: turning a generated script into TTS segments."""
+import re
+
+
+def is_music_tag(text: str) -> bool:
+    stripped = str(text or "").strip().lower()
+    return stripped in {"[music]", "[موسيقى]", "[فاصل موسيقي]"}
+
+
+def is_section_header(text: str) -> bool:
+    stripped = str(text or "").strip()
+    return bool(re.match(r"^(INTRO|BODY|OUTRO|مقدمة|النص|الخاتمة)\s*:?$", stripped, re.IGNORECASE))
+
+
+def is_arabic(text: str) -> bool:
+    """
+    Detect if text is *mostly* Arabic.
+    Returns True only if a reasonable percentage of letters are Arabic.
+    """
+    if not text:
+        return False
+
+    arabic_letters = 0
+    total_letters = 0
+
+    for c in text:
+        if c.isalpha():
+            total_letters += 1
+            if "\u0600" <= c <= "\u06FF" or "\u0750" <= c <= "\u08FF":
+                arabic_letters += 1
+
+    if total_letters == 0:
+        return False
+
+    return (arabic_letters / total_letters) >= 0.30
+
+
+def detect_language(description: str) -> str:
+    return "ar" if is_arabic(description) else "en"
+
+
+def validate_roles(style: str, speakers_info: list):
+    roles = [s["role"] for s in speakers_info]
+
+    if style == "Interview":
+        return (
+            roles in [["host", "guest"], ["host", "host", "guest"]],
+            "For 'Interview' style, valid setups: 1 host â†’ 1 guest or 2 hosts â†’ 1 guest.",
+        )
+
+    if style == "Storytelling":
+        return (
+            roles in [["host"], ["host", "guest"], ["host", "guest", "guest"]],
+            "For 'Storytelling' style, valid setups: 1 host solo, 1 host â†’ 1 guest, or 1 host â†’ 2 guests.",
+        )
+
+    if style == "Educational":
+        return (
+            roles in [["host"], ["host", "guest"], ["host", "guest", "guest"]],
+            "For 'Educational' style, valid setups: 1 host solo, 1 host â†’ 1 guest, or 1 host â†’ 2 guests.",
+        )
+
+    if style == "Conversational":
+        return (
+            roles in [["host", "host"], ["host", "host", "host"]],
+            "For 'Conversational', use 2â€“3 hosts (no guests).",
+        )
+
+    return (True, "")
+
+
+def clean_script_for_tts(script: str) -> str:
+    """
+    Create a clean text version for TTS:
+    - Remove speaker labels
+    - Remove formatting leftovers (ga:, fe:, -, bullet points, unicode spaces)
+    - Remove tags and markdown
+    - Keep only natural spoken text
+    """
+    cleaned_lines = []
+
+    for raw in script.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        if line.startswith("#"):
+            continue
+
+        if is_section_header(line):
+            continue
+
+        if re.match(r"^([^:ï¼ڑ]+)[:ï¼ڑ]\s*(intro|body|outro|مقدمة|النص|الخاتمة)\s*$", line, re.IGNORECASE):
+            continue
+
+        if re.fullmatch(r"\[[^\]]+\]", line):
+            if not is_music_tag(line):
+                continue
+
+        line = re.sub(r"\[[^\]]*]", "", line)
+
+        line = re.sub(r"[\u200B-\u200D\uFEFF]", "", line)
+
+        if re.fullmatch(r"[-_=*~â€¢آ·\u2022]{2,}", line):
+            continue
+
+        line = re.sub(r"^[A-Za-z0-9]{1,10}\s*[:ï¼ڑ]\s*", "", line)
+
+        line = re.sub(r"^[^\w]+", "", line)
+        line = re.sub(r"\s{2,}", " ", line).strip()
+
+        if line:
+            cleaned_lines.append(line)
+
+    return "\n".join(cleaned_lines)
+
+
+def build_speaker_voice_map(speakers_info):
+    """
+    Build a mapping: speaker_name -> voiceId
+    plus a default voice (host voice if available).
+    """
+    speakers_info = speakers_info or []
+
+    mapping = {}
+    host_voice = None
+    any_voice = None
+
+    for s in speakers_info:
+        name = (s.get("name") or "").strip()
+        vid = (s.get("voiceId") or "").strip()
+        if not name or not vid:
+            continue
+
+        mapping[name] = vid
+        if not any_voice:
+            any_voice = vid
+        if s.get("role") == "host" and not host_voice:
+            host_voice = vid
+
+    default_voice = host_voice or any_voice or "21m00Tcm4TlvDq8ikWAM"
+    return mapping, default_voice
+
+
+def parse_script_into_segments(script: str):
+    """
+    Turn the script into segments: [(speaker_name, text), ...]
+    - ignore markdown headings (#..)
+    - ignore INTRO/BODY/OUTRO headers
+    - ignore separator lines (----)
+    - lines without label keep the previous speaker
+    - Literal parser: KEEP speaker labels exactly as written.
+    - Only treat '[music]' as a special segment.
+    """
+    segments = []
+    last_speaker = None
+    for raw in script.splitlines():
+        stripped = raw.strip()
+        if not stripped:
+            continue
+
+        if is_music_tag(stripped):
+            segments.append(("__music__", None))
+            continue
+
+        if ":" in stripped:
+            speaker, text = stripped.split(":", 1)
+            speaker = speaker.strip()
+            text = text.strip()
+
+            if text:
+                segments.append((speaker, text))
+                last_speaker = speaker
+            continue
+
+        if last_speaker:
+            segments.append((last_speaker, stripped))
+
+    return segments
@@ -0,0 +1,37 @@
+"""Process-wide R2 storage handle for code running outside the Flask app."""
+import threading
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage(required=True):
+    """
+    The shared R2Storage built from the R2_* environment (see
+    services.storage.storage_from_env). Returns None when R2 isn't configured
+    and required is False. The web app and offline jobs reuse one client
+    and connection pool per process.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                from services.storage import storage_from_env
+
+                _storage = storage_from_env(required=False)
+    if _storage is None and required:
+        raise RuntimeError("R2 client is not configured.")
+    return _storage
+
+
+def upload_bytes_to_r2(file_bytes: bytes, object_key: str, content_type: str):
+    return get_storage().upload_bytes(file_bytes, object_key, content_type)
+
+
+def upload_stream_to_r2(source, object_key: str, content_type: str, state_path: str = ""):
+    """Upload a file object or byte-chunk iterator with parallel multipart parts."""
+    return get_storage().upload_stream(source, object_key, content_type, state_path=state_path)
+
+
+def generate_r2_signed_url(object_key: str, expires_in: int = 3600):
+    return get_storage().presign(object_key, expires_in=expires_in)
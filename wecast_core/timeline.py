@@ -0,0 +1,90 @@
+"""Word timelines: character timestamps -> words, anchors and transcript text."""
+import re
+
+
+def chars_to_words(text: str, ch_starts: list, ch_ends: list):
+    """
+    Convert character-level timestamps to word-level.
+    Returns list of dicts: {w, start, end}
+    """
+    words = []
+    if not text:
+        return words
+
+    n = min(len(text), len(ch_starts), len(ch_ends))
+    i = 0
+
+    while i < n:
+        if text[i].isspace():
+            i += 1
+            continue
+
+        start_i = i
+        start_t = ch_starts[i]
+
+        while i < n and not text[i].isspace():
+            i += 1
+
+        end_i = i - 1
+        end_t = ch_ends[end_i]
+
+        token = text[start_i:i].strip()
+        if token:
+            words.append({"w": token, "start": float(start_t), "end": float(end_t)})
+
+    return words
+
+
+def norm_token(s: str) -> str:
+    s = (s or "").lower().strip()
+    s = re.sub(r"[^\w\u0600-\u06FF]+", "", s)  # keep arabic letters too
+    return s
+
+
+def timeline_tokens(word_timeline):
+    return [norm_token(w.get("w", "")) for w in word_timeline]
+
+
+def find_anchor_start_sec(word_timeline, anchor: str):
+    tokens = timeline_tokens(word_timeline)
+    anchor_tokens = [norm_token(t) for t in anchor.split() if norm_token(t)]
+    if len(anchor_tokens) < 2:
+        return None
+
+    n = len(tokens)
+    m = len(anchor_tokens)
+
+    for i in range(0, n - m + 1):
+        if tokens[i:i+m] == anchor_tokens:
+            return float(word_timeline[i]["start"])
+    return None
+
+
+def build_transcript_text_with_speakers(words):
+    """
+    Build a readable transcript with speaker labels in-line.
+    Example:
+      Bob: Hello there ...
+      Alice: Hi Bob ...
+    """
+    if not words:
+        return ""
+
+    parts = []
+    last_speaker = None
+
+    for w in words:
+        token = (w.get("w") or "").strip()
+        if not token:
+            continue
+
+        speaker = (w.get("speaker") or "").strip()
+        if speaker and speaker != last_speaker:
+            if parts:
+                parts.append("\n")
+            parts.append(f"{speaker}: ")
+            last_speaker = speaker
+
+        parts.append(token + " ")
+
+    return "".join(parts).strip()
@@ -0,0 +1,149 @@
+"""ElevenLabs TTS with timestamps and the segment-by-segment episode render."""
+import base64
+import os
+from io import BytesIO
+
+from services.metrics import timed
+from services.tracing import current_span, span
+from services.usage import record_tts
+from wecast_core.script import clean_script_for_tts, is_arabic
+from wecast_core.timeline import chars_to_words
+
+
+DEFAULT_TTS_MODEL_ID = "eleven_multilingual_v2"
+LEAD_IN_MS = 500
+
+
+@timed("elevenlabs", "tts_with_timestamps")
+def eleven_tts_with_timestamps(text: str, voice_id: str, model_id: str = DEFAULT_TTS_MODEL_ID, api_key=None):
+    """
+    Returns: (audio_bytes, word_timings_for_this_segment)
+    word timings are relative to segment start (0.0)
+    api_key defaults to ELEVENLABS_API_KEY from the environment.
+    """
+    import requests
+
+    if api_key is None:
+        api_key = (os.getenv("ELEVENLABS_API_KEY") or "").strip()
+    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/with-timestamps"
+    headers = {
+        "xi-api-key": api_key,
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+    body = {
+        "text": text,
+        "model_id": model_id,
+        "output_format": "mp3_44100_128",
+    }
+
+    r = requests.post(url, headers=headers, json=body, timeout=120)
+    current_span().set(httpStatus=r.status_code, responseBytes=len(r.content))
+    if not r.ok:
+        raise RuntimeError(f"ElevenLabs error {r.status_code}: {r.text[:300]}")
+    record_tts(len(text))
+
+    data = r.json()
+    audio_b64 = data.get("audio_base64")
+    if not audio_b64:
+        raise RuntimeError("Missing audio_base64 in ElevenLabs response.")
+
+    audio_bytes = base64.b64decode(audio_b64)
+
+    alignment = data.get("alignment") or {}
+    ch_starts = alignment.get("character_start_times_seconds") or []
+    ch_ends = alignment.get("character_end_times_seconds") or []
+
+    # Convert char timings to words using the exact same text we sent
+    words = chars_to_words(text, ch_starts, ch_ends)
+
+    return audio_bytes, words
+
+
+def _pick_music(music, music_index):
+    intro, body, outro = (tuple(music or ()) + ("", "", ""))[:3]
+    if music_index == 0:
+        return intro
+    if music_index in (1, 2):
+        return body
+    return outro
+
+
+def render_segments(
+    segments,
+    speaker_to_voice,
+    default_voice,
+    *,
+    music=(),
+    music_dir=os.path.join("static", "music"),
+    tts=eleven_tts_with_timestamps,
+    model_id=DEFAULT_TTS_MODEL_ID,
+    audio_segment=None,
+):
+    """
+    Synthesize parsed script segments into one AudioSegment.
+
+    segments come from parse_script_into_segments(); music is the
+    (intro, body, outro) file names under music_dir used for successive
+    [music] tags. tts(text=..., voice_id=..., model_id=...) must return
+    (mp3_bytes, words), so tests and benchmarks can pass a stub.
+    Returns (audio, word_timeline) with word times on the final timeline,
+    including the 500ms lead-in; returns (None, []) when nothing was
+    rendered. TTS errors propagate to the caller.
+    """
+    if audio_segment is None:
+        from pydub import AudioSegment as audio_segment
+
+    music_index = 0
+    audio_parts = []
+    word_timeline = []
+    timeline_offset = LEAD_IN_MS / 1000.0
+
+    for index, (speaker, text) in enumerate(segments):
+        if speaker.strip().lower() == "__music__":
+            selected_music = _pick_music(music, music_index)
+            music_index += 1
+            if selected_music:
+                music_path = os.path.join(music_dir, selected_music)
+                if os.path.exists(music_path):
+                    with span("decode", segment=index, source="music", file=selected_music):
+                        music_clip = audio_segment.from_mp3(music_path)
+                    audio_parts.append(music_clip)
+                    timeline_offset += len(music_clip) / 1000.0
+            continue
+
+        tts_text = text.strip() if is_arabic(text) else clean_script_for_tts(text)
+        if not tts_text.strip():
+            continue
+
+        voice_id = speaker_to_voice.get(speaker, default_voice)
+        with span("tts", segment=index, speaker=speaker, voice=voice_id, model=model_id, chars=len(tts_text)) as tts_span:
+            audio_bytes, segment_words = tts(
+                text=tts_text,
+                voice_id=voice_id,
+                model_id=model_id,
+            )
+            tts_span.set(words=len(segment_words), audioBytes=len(audio_bytes))
+        with span("decode", segment=index, source="tts", bytes=len(audio_bytes)):
+            speech_segment = audio_segment.from_file(BytesIO(audio_bytes), format="mp3")
+        audio_parts.append(speech_segment)
+
+        # shift segment words to the global timeline
+        for w in segment_words:
+            word_timeline.append({
+                "w": w["w"],
+                "start": w["start"] + timeline_offset,
+                "end": w["end"] + timeline_offset,
+                "speaker": speaker,
+            })
+        timeline_offset += len(speech_segment) / 1000.0
+
+    if not audio_parts:
+        return None, []
+
+    with span("stitch", parts=len(audio_parts)) as stitch_span:
+        final_audio = audio_segment.silent(duration=LEAD_IN_MS)
+        for item in audio_parts:
+            final_audio += item
+        stitch_span.set(durationSec=round(len(final_audio) / 1000.0, 3))
+    return final_audio, word_timeline